@@ -0,0 +1,25 @@
+"""Create the (connection_id, id) / (session_id, id) indexes used by paginated message history.
+
+Base.metadata.create_all() only creates indexes for new tables, so existing
+databases need this one-off run.
+"""
+from sqlalchemy import create_engine
+
+from app.models.message import Message
+from config.config import settings
+
+
+def add_message_indexes():
+    engine = create_engine(settings.database_url)
+    for index in Message.__table__.indexes:
+        if index.name not in ("ix_messages_connection_id_id", "ix_messages_session_id_id"):
+            continue
+        try:
+            index.create(bind=engine, checkfirst=True)
+            print(f"Index '{index.name}' ensured.")
+        except Exception as e:
+            print(f"Error creating index '{index.name}': {e}")
+
+
+if __name__ == "__main__":
+    add_message_indexes()
@@ -0,0 +1,38 @@
+"""Add user_notifications.dedupe_key, used to create queued notifications once.
+
+Base.metadata.create_all() never alters existing tables, so existing
+databases need this one-off run. Safe to re-run: a present column is skipped.
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.models.user_notification import UserNotification
+from config.config import settings
+
+
+def add_notification_dedupe_key():
+    engine = create_engine(settings.database_url)
+    table = UserNotification.__table__
+    column = table.c.dedupe_key
+    existing = {c["name"] for c in inspect(engine).get_columns(table.name)}
+    if column.name in existing:
+        print(f"Column '{column.name}' already exists.")
+        return
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                    f"{column.type.compile(dialect=engine.dialect)}"
+                )
+            )
+            # The column's unique index (ALTER TABLE can't add UNIQUE on SQLite)
+            for index in table.indexes:
+                if column.name in index.columns:
+                    index.create(connection)
+        print(f"Column '{column.name}' added.")
+    except Exception as e:
+        print(f"Error adding column '{column.name}': {e}")
+
+
+if __name__ == "__main__":
+    add_notification_dedupe_key()
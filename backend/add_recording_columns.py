@@ -0,0 +1,37 @@
+"""Add the meeting_recordings columns introduced after the table was first created.
+
+Base.metadata.create_all() never alters existing tables, so existing
+databases need this one-off run. Safe to re-run: present columns are skipped.
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.models.meeting_recording import MeetingRecording
+from config.config import settings
+
+COLUMNS = ["status", "duration_seconds", "size_bytes", "width", "height"]
+
+
+def add_recording_columns():
+    engine = create_engine(settings.database_url)
+    table = MeetingRecording.__table__
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    for name in COLUMNS:
+        if name in existing:
+            print(f"Column '{name}' already exists.")
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=engine.dialect)}"
+        if column.default is not None:
+            # Enum columns store member names
+            default = getattr(column.default.arg, "name", column.default.arg)
+            ddl += f" NOT NULL DEFAULT '{default}'"
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(ddl))
+            print(f"Column '{name}' added.")
+        except Exception as e:
+            print(f"Error adding column '{name}': {e}")
+
+
+if __name__ == "__main__":
+    add_recording_columns()
@@ -3,11 +3,14 @@ from fastapi import APIRouter
 from app.api import (
     attendance_api,
     auth_api,
+    chat_api,
     dashboard_api,
+    job_api,
     message_api,
     notification_api,
     profile_api,
     recording_api,
+    recording_ingest_api,
     recommendation_api,
     resource_api,
     session_api,
@@ -29,6 +32,9 @@ api_router.include_router(dashboard_api.router)
 api_router.include_router(notification_api.router)
 api_router.include_router(profile_api.router)
 api_router.include_router(signaling_api.router)
+api_router.include_router(chat_api.router)
+api_router.include_router(recording_ingest_api.router)
+api_router.include_router(job_api.router)
 # Admin
 # from app.api import admin_api
 # api_router.include_router(admin_api.router, prefix="/admin", tags=["Admin"])
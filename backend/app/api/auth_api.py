@@ -88,7 +88,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account does not exist")
     
     # Verify password
-    if not auth_service.verify_password(payload.password, user.password):
+    if not auth_service.verify_login_password(db, user, payload.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         
     access_token = auth_service.create_access_token(
@@ -0,0 +1,76 @@
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+
+from app import SessionLocal
+from app.services import auth_service, connection_service, message_service, realtime_service, session_service
+
+router = APIRouter()
+
+
+def _authorize(token: Optional[str], *, session_id: int = None, connection_id: int = None) -> None:
+    db = SessionLocal()
+    try:
+        user = auth_service.get_user_from_token(db, token or "")
+        if connection_id is not None:
+            connection_service.ensure_participant(db, connection_id=connection_id, user=user)
+        else:
+            session = session_service.get_session(db, session_id)
+            session_service.ensure_session_access(db, session, user)
+    finally:
+        db.close()
+
+
+def _missed_messages(since_id: int, *, session_id: int = None, connection_id: int = None) -> Tuple[list, bool]:
+    """At most one page of what arrived after ``since_id``, and whether more did."""
+    db = SessionLocal()
+    try:
+        page = message_service.list_messages(
+            db,
+            session_id=session_id,
+            connection_id=connection_id,
+            since_id=since_id,
+            limit=message_service.MAX_MESSAGE_PAGE,
+        )
+        # A full page may have stopped short of the newest message
+        more = len(page) == message_service.MAX_MESSAGE_PAGE
+        return [message_service.serialize_message(message) for message in page], more
+    finally:
+        db.close()
+
+
+async def _serve(websocket: WebSocket, room: str, since_id: Optional[int], **scope) -> None:
+    try:
+        await run_in_threadpool(_authorize, websocket.query_params.get("token"), **scope)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+
+    await websocket.accept()
+    subscriber = await realtime_service.hub.subscribe(websocket, room)
+    try:
+        missed, more = [], False
+        if since_id is not None:
+            # A client that fell far behind reloads over REST instead of getting everything here
+            missed, more = await run_in_threadpool(_missed_messages, since_id, **scope)
+        realtime_service.hub.resync(subscriber, missed, more=more)
+        while True:
+            # Clients only listen; anything they send (e.g. keep-alives) is ignored.
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await realtime_service.hub.unsubscribe(subscriber, room)
+
+
+@router.websocket("/ws/chat/connection/{connection_id}")
+async def connection_chat_socket(websocket: WebSocket, connection_id: int, since_id: Optional[int] = None):
+    room = realtime_service.connection_room(connection_id)
+    await _serve(websocket, room, since_id, connection_id=connection_id)
+
+
+@router.websocket("/ws/chat/session/{session_id}")
+async def session_chat_socket(websocket: WebSocket, session_id: int, since_id: Optional[int] = None):
+    room = realtime_service.session_room(session_id)
+    await _serve(websocket, room, since_id, session_id=session_id)
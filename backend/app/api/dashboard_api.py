@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app import get_db
@@ -19,8 +19,19 @@ def get_dashboard_overview(
 @router.get("/search")
 def search_dashboard(
     q: str,
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
-    return dashboard_service.search_general(db, query=q)
+    return dashboard_service.search_general(db, query=q, limit=limit, offset=offset)
 
+
+@router.get("/autocomplete")
+def autocomplete(
+    q: str,
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    return dashboard_service.autocomplete(db, prefix=q, limit=limit)
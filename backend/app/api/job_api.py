@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app import get_db
+from app.models.job import JobStatus
+from app.models.user import User
+from app.services import auth_service, job_service
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobStatsOut(BaseModel):
+    totals: Dict[str, int]
+    by_kind: Dict[str, Dict[str, int]]
+    oldest_due_seconds: float
+    workers: int
+
+
+@router.get("/", response_model=List[JobOut])
+def list_my_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    return [JobOut.model_validate(job) for job in job_service.list_jobs(db, user=current_user, limit=20)]
+
+
+@router.get("/stats", response_model=JobStatsOut)
+def get_job_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    auth_service.ensure_admin(current_user)
+    return job_service.queue_stats(db)
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    return JobOut.model_validate(job_service.get_job(db, job_id, current_user))
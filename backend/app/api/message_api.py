@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, constr
 from sqlalchemy.orm import Session
 
@@ -31,12 +31,17 @@ class MessageOut(BaseModel):
 @router.get("/{session_id}/messages", response_model=List[MessageOut])
 def list_messages(
     session_id: int,
+    since_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(message_service.DEFAULT_MESSAGE_PAGE, ge=1, le=message_service.MAX_MESSAGE_PAGE),
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     session = session_service.get_session(db, session_id)
     session_service.ensure_session_access(db, session, current_user)
-    return message_service.list_messages(db, session_id=session_id)
+    return message_service.list_messages(
+        db, session_id=session_id, since_id=since_id, before_id=before_id, limit=limit
+    )
 
 
 @router.post("/{session_id}/messages", response_model=MessageOut)
@@ -59,12 +64,17 @@ def send_message(
 @router.get("/connection/{connection_id}", response_model=List[MessageOut])
 def list_connection_messages(
     connection_id: int,
+    since_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(message_service.DEFAULT_MESSAGE_PAGE, ge=1, le=message_service.MAX_MESSAGE_PAGE),
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     from app.services import connection_service
     connection_service.ensure_participant(db, connection_id=connection_id, user=current_user)
-    return message_service.list_messages(db, connection_id=connection_id)
+    return message_service.list_messages(
+        db, connection_id=connection_id, since_id=since_id, before_id=before_id, limit=limit
+    )
 
 
 @router.post("/connection/{connection_id}", response_model=MessageOut)
@@ -4,15 +4,16 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, status, File, UploadFile, HTTPException
 from pydantic import BaseModel, EmailStr, constr
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import os
-import shutil
 import uuid
+from pathlib import Path
 
 from app import get_db
 from app.models.user import User, UserRole
 from app.models.user_profile import ProfileVisibility
 from app.models.user_skill import UserSkill
-from app.services import auth_service, profile_service, skill_service
+from app.services import auth_service, profile_service, skill_service, upload_service
 from config.config import settings
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
@@ -227,12 +228,7 @@ async def upload_avatar(
             detail="File must be an image",
         )
 
-    # Validate file size (optional, can be done via middleware or here if reading chunks)
-    # For simplicity, we trust standard upload limits for now
-
-    # Create storage directory if not exists
     upload_dir = os.path.join(settings.uploads_dir, "avatars")
-    os.makedirs(upload_dir, exist_ok=True)
 
     # Generate unique filename
     extension = os.path.splitext(file.filename)[1]
@@ -242,15 +238,14 @@ async def upload_avatar(
     filename = f"{current_user.id}_{uuid.uuid4().hex[:8]}{extension}"
     file_path = os.path.join(upload_dir, filename)
 
-    # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Could not save file: {str(e)}",
-        )
+    # Save file in a worker thread; the size limit is enforced while writing
+    await run_in_threadpool(
+        upload_service.store_upload,
+        file,
+        Path(file_path),
+        max_bytes=settings.max_avatar_upload_mb * 1024 * 1024,
+        failure_detail="Could not save file",
+    )
 
     # Construct public URL
     # Assuming frontend is serving 'uploads/' under /uploads/ or /assets/
@@ -53,9 +53,8 @@ def get_location_recommendations(
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
-    other_users = db.query(User).filter(User.id != current_user.id).all()
     print(f"DEBUG: Recommendation request for User: {current_user.name} (ID: {current_user.id}, Loc: {current_user.location})")
-    results = recommendation_service.recommend_users_by_location(current_user, other_users)
+    results = recommendation_service.recommend_users_by_location(db, current_user)
     print(f"DEBUG: Found {len(results['local'])} local matches")
     return results
 
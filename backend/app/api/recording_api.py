@@ -1,12 +1,12 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app import get_db
 from app.models.user import User
-from app.services import auth_service, recording_service, session_service
+from app.services import auth_service, media_service, recording_service, session_service, upload_service
 
 router = APIRouter()
 
@@ -16,20 +16,25 @@ class RecordingResponse(BaseModel):
     recording_url: Optional[str]
 
 
-@router.post("/{session_id}/recordings", response_model=RecordingResponse)
+@router.post(
+    "/{session_id}/recordings",
+    response_model=RecordingResponse,
+    openapi_extra=upload_service.FILE_UPLOAD_OPENAPI,
+)
 async def upload_recording(
     session_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     session = session_service.get_session(db, session_id)
     session_service.ensure_session_access(db, session, current_user)
 
-    filename, _ = recording_service.save_recording_file(file)
+    # Access is checked before the body is read, so rejected uploads cost nothing
+    filename, _ = await recording_service.receive_recording_file(request)
     public_url = f"/recordings/{filename}"
-    recording_service.attach_recording(db, session, public_url)
-    return RecordingResponse(session_id=session.id, recording_url=public_url)
+    recording_service.attach_recording(db, session, public_url, owner_id=current_user.id)
+    return RecordingResponse(session_id=session.id, recording_url=media_service.sign_url(public_url))
 
 
 @router.get("/{session_id}/recordings", response_model=RecordingResponse)
@@ -42,4 +47,4 @@ async def get_recording(
     session_service.ensure_session_access(db, session, current_user)
     if not session.recording_url:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No recording available")
-    return RecordingResponse(session_id=session.id, recording_url=session.recording_url)
+    return RecordingResponse(session_id=session.id, recording_url=media_service.sign_url(session.recording_url))
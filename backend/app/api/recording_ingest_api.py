@@ -0,0 +1,101 @@
+import json
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, WebSocket, status
+from starlette.concurrency import run_in_threadpool
+
+from app import SessionLocal
+from app.services import auth_service, connection_service, media_service, recording_ingest_service
+from config.config import settings
+
+router = APIRouter()
+
+# Close code for resuming a recording that is already complete (4000-4999 are application codes)
+RECORDING_COMPLETE_CLOSE_CODE = 4410
+
+
+def _open(
+    token: Optional[str], connection_id: int, recording_id: Optional[int]
+) -> Tuple[int, recording_ingest_service.LiveRecording]:
+    """Authorize once, then start a recording (or reopen ``recording_id``) and lock its file."""
+    db = SessionLocal()
+    try:
+        user = auth_service.get_user_from_token(db, token or "")
+        connection_service.ensure_participant(db, connection_id=connection_id, user=user)
+        if recording_id is None:
+            record = recording_ingest_service.start_recording(db, connection_id=connection_id)
+        else:
+            record = recording_ingest_service.resume_recording(db, connection_id=connection_id, recording_id=recording_id)
+        return record.id, recording_ingest_service.open_file(db, record)
+    finally:
+        db.close()
+
+
+def _complete(recording_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        record = recording_ingest_service.complete_recording(db, recording_id)
+        return {"type": "saved", "id": record.id, "file_path": media_service.sign_url(record.file_path)}
+    finally:
+        db.close()
+
+
+def _is_stop(text: Optional[str]) -> bool:
+    try:
+        return json.loads(text or "{}").get("type") == "stop"
+    except (ValueError, AttributeError):
+        return False
+
+
+@router.websocket("/ws/meeting/{connection_id}/recording")
+async def recording_ingest_socket(
+    websocket: WebSocket, connection_id: int, token: Optional[str] = None, recording_id: Optional[int] = None
+):
+    """Live recording: binary frames are MediaRecorder chunks, appended in order.
+
+    The server answers ``ready`` (with the recording id and the bytes it
+    has) and then an ``ack`` per chunk. A client that reconnects with
+    ``recording_id`` resends whatever lies past that offset; if the
+    recording was completed meanwhile, the socket is closed with
+    RECORDING_COMPLETE_CLOSE_CODE. ``{"type":
+    "stop"}`` closes the recording and is answered with ``saved``.
+    """
+    try:
+        recording_id, live = await run_in_threadpool(_open, token, connection_id, recording_id)
+    except HTTPException as exc:
+        # 409: the previous socket of this recording still holds it; the page retries
+        if exc.status_code == 409:
+            code = status.WS_1013_TRY_AGAIN_LATER
+        elif exc.status_code == 410:
+            code = RECORDING_COMPLETE_CLOSE_CODE
+        else:
+            code = status.WS_1008_POLICY_VIOLATION
+        await websocket.close(code=code, reason=str(exc.detail))
+        return
+
+    max_bytes = settings.max_recording_upload_mb * 1024 * 1024
+    stopped = False
+    try:
+        await websocket.accept()
+        await websocket.send_json({"type": "ready", "recording_id": recording_id, "offset": live.size})
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            chunk = message.get("bytes")
+            if chunk is not None:
+                if live.size + len(chunk) > max_bytes:
+                    await websocket.close(code=status.WS_1009_MESSAGE_TOO_BIG, reason="Recording exceeds the upload limit")
+                    break
+                offset = await run_in_threadpool(live.append, chunk)
+                await websocket.send_json({"type": "ack", "offset": offset})
+            elif _is_stop(message.get("text")):
+                stopped = True
+                break
+    finally:
+        # A dropped socket leaves the recording open for the page to resume
+        await run_in_threadpool(live.close)
+
+    if stopped:
+        await websocket.send_json(await run_in_threadpool(_complete, recording_id))
+        await websocket.close()
@@ -4,10 +4,11 @@ from typing import List
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import get_db
 from app.models.user import User
-from app.services import auth_service, resource_service, session_service
+from app.services import auth_service, media_service, resource_service, session_service
 
 router = APIRouter()
 
@@ -24,6 +25,12 @@ class ResourceOut(BaseModel):
         from_attributes = True
 
 
+def _serialize_resource(resource) -> ResourceOut:
+    out = ResourceOut.model_validate(resource)
+    out.file_url = media_service.sign_url(resource.file_url, download_name=resource.file_name)
+    return out
+
+
 @router.post("/{session_id}/resources", response_model=ResourceOut)
 async def upload_resource(
     session_id: int,
@@ -35,16 +42,15 @@ async def upload_resource(
     auth_service.ensure_mentor(current_user)
     if session.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Only the session mentor can upload resources")
-    filename, _ = resource_service.save_resource_file(file)
-    public_url = f"/resources/{filename}"
+    stored = await run_in_threadpool(resource_service.save_resource_file, file)
     resource = resource_service.create_resource(
         db,
         session_id=session.id,
         uploader_id=current_user.id,
         file_name=file.filename,
-        file_url=public_url,
+        stored=stored,
     )
-    return resource
+    return _serialize_resource(resource)
 
 
 @router.get("/{session_id}/resources", response_model=List[ResourceOut])
@@ -55,4 +61,4 @@ async def list_resources(
 ):
     session = session_service.get_session(db, session_id)
     session_service.ensure_session_access(db, session, current_user)
-    return resource_service.list_resources(db, session.id)
+    return [_serialize_resource(resource) for resource in resource_service.list_resources(db, session.id)]
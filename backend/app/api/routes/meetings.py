@@ -1,13 +1,23 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app import get_db
+from app.models.meeting_recording import RecordingStatus
 from app.models.user import User
-from app.services import auth_service, connection_service, meeting_service
+from app.services import (
+    auth_service,
+    connection_service,
+    media_service,
+    meeting_service,
+    recording_upload_service,
+    upload_service,
+)
+from config.config import settings
 
 router = APIRouter(prefix="/meeting", tags=["Meetings"])
 
@@ -16,6 +26,11 @@ class MeetingRecordingOut(BaseModel):
     id: int
     connection_id: int
     file_path: str
+    status: RecordingStatus
+    duration_seconds: Optional[float] = None
+    size_bytes: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
     created_at: datetime
 
     class Config:
@@ -41,38 +56,156 @@ class MeetingRecordingCreated(BaseModel):
     id: int
 
 
+class RecordingUploadCreate(BaseModel):
+    connection_id: int
+    content_type: str = "video/webm"
+    total_size: Optional[int] = None
+
+
+class RecordingUploadOut(BaseModel):
+    upload_id: str
+    connection_id: int
+    offset: int
+    next_chunk: int
+    total_size: Optional[int]
+    chunk_size: int
+
+
+def _serialize_upload(upload) -> RecordingUploadOut:
+    return RecordingUploadOut(
+        upload_id=upload.id,
+        connection_id=upload.connection_id,
+        offset=upload.received_bytes,
+        next_chunk=upload.next_chunk,
+        total_size=upload.total_size,
+        chunk_size=settings.recording_upload_chunk_mb * 1024 * 1024,
+    )
+
+
+# Media links are signed here, after the participant check; the file mounts verify them
+def _serialize_recording(record) -> MeetingRecordingOut:
+    recording = MeetingRecordingOut.model_validate(record)
+    recording.file_path = media_service.sign_url(record.file_path)
+    return recording
+
+
+def _serialize_document(doc) -> MeetingDocumentOut:
+    document = MeetingDocumentOut.model_validate(doc)
+    document.file_path = media_service.sign_url(doc.file_path, download_name=doc.file_name)
+    return document
+
+
 
-@router.post("/upload/{connection_id}", response_model=MeetingRecordingCreated, status_code=201)
+@router.post(
+    "/upload/{connection_id}",
+    response_model=MeetingRecordingCreated,
+    status_code=201,
+    openapi_extra=upload_service.FILE_UPLOAD_OPENAPI,
+)
 async def upload_meeting_recording(
     connection_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     connection_service.ensure_participant(db, connection_id=connection_id, user=current_user)
-    relative_path = meeting_service.save_video_file(file, connection_id=connection_id)
-    record = meeting_service.create_record(db, connection_id=connection_id, file_path=relative_path)
-    return MeetingRecordingCreated(message="saved", file_path=record.file_path, id=record.id)
+    relative_path = await meeting_service.receive_video_file(request, connection_id=connection_id)
+    record = meeting_service.create_record(
+        db, connection_id=connection_id, file_path=relative_path, owner_id=current_user.id
+    )
+    return MeetingRecordingCreated(message="saved", file_path=media_service.sign_url(record.file_path), id=record.id)
+
+
+# Resumable recording uploads: create, PUT numbered chunks at their offsets
+# (GET the upload to learn where to resume), then finalize into a recording.
+
+
+@router.post("/uploads", response_model=RecordingUploadOut, status_code=201)
+def create_recording_upload(
+    payload: RecordingUploadCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    connection_service.ensure_participant(db, connection_id=payload.connection_id, user=current_user)
+    upload = recording_upload_service.create_upload(
+        db,
+        connection_id=payload.connection_id,
+        uploader=current_user,
+        content_type=payload.content_type,
+        total_size=payload.total_size,
+    )
+    return _serialize_upload(upload)
+
 
+@router.get("/uploads/{upload_id}", response_model=RecordingUploadOut)
+def get_recording_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    return _serialize_upload(recording_upload_service.get_upload(db, upload_id, current_user))
 
-@router.post("/documents/{connection_id}", response_model=MeetingDocumentOut, status_code=201)
+
+@router.put("/uploads/{upload_id}/chunks/{index}", response_model=RecordingUploadOut)
+async def put_recording_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    upload = await run_in_threadpool(recording_upload_service.get_upload, db, upload_id, current_user)
+    upload = await recording_upload_service.receive_chunk(db, upload, index=index, offset=offset, request=request)
+    return _serialize_upload(upload)
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=MeetingRecordingCreated, status_code=201)
+def finalize_recording_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    upload = recording_upload_service.get_upload(db, upload_id, current_user)
+    record = recording_upload_service.finalize_upload(db, upload)
+    return MeetingRecordingCreated(message="saved", file_path=media_service.sign_url(record.file_path), id=record.id)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+def abort_recording_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(auth_service.get_current_user),
+):
+    upload = recording_upload_service.get_upload(db, upload_id, current_user)
+    recording_upload_service.abort_upload(db, upload)
+
+
+@router.post(
+    "/documents/{connection_id}",
+    response_model=MeetingDocumentOut,
+    status_code=201,
+    openapi_extra=upload_service.FILE_UPLOAD_OPENAPI,
+)
 async def upload_meeting_document(
     connection_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(auth_service.get_current_user),
 ):
     connection_service.ensure_participant(db, connection_id=connection_id, user=current_user)
-    original_name, relative_path = meeting_service.save_document_file(file, connection_id=connection_id)
+    original_name, stored, content_type = await meeting_service.receive_document_file(
+        request, connection_id=connection_id
+    )
     doc = meeting_service.create_document_record(
         db, 
         connection_id=connection_id, 
         uploader_id=current_user.id,
-        file_path=relative_path,
+        stored=stored,
         file_name=original_name,
-        file_type=file.content_type or "application/octet-stream"
+        file_type=content_type
     )
-    return doc
+    return _serialize_document(doc)
 
 
 @router.get("/recordings/{connection_id}", response_model=List[MeetingRecordingOut])
@@ -82,7 +215,7 @@ def list_meeting_recordings(
     current_user: User = Depends(auth_service.get_current_user),
 ):
     connection_service.ensure_participant(db, connection_id=connection_id, user=current_user)
-    return meeting_service.list_recordings(db, connection_id=connection_id)
+    return [_serialize_recording(record) for record in meeting_service.list_recordings(db, connection_id=connection_id)]
 
 
 @router.get("/documents/{connection_id}", response_model=List[MeetingDocumentOut])
@@ -92,9 +225,11 @@ def list_meeting_documents(
     current_user: User = Depends(auth_service.get_current_user),
 ):
     print(f"DEBUG: List documents for connection_id={connection_id}")
+    # The links returned grant access to the files, so only participants may list them
+    connection_service.ensure_participant(db, connection_id=connection_id, user=current_user)
     docs = meeting_service.list_documents(db, connection_id=connection_id)
     print(f"DEBUG: Found {len(docs)} documents")
-    return docs
+    return [_serialize_document(doc) for doc in docs]
 
 
 @router.delete("/documents/{document_id}", status_code=204)
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app import get_db
 from app.models.user import User
-from app.services import auth_service, session_service
+from app.services import auth_service, media_service, session_service
 
 router = APIRouter()
 
@@ -99,7 +99,7 @@ def list_my_sessions(
                 time=session.time,
                 location=session.location,
                 created_by=session.created_by,
-                recording_url=session.recording_url,
+                recording_url=media_service.sign_url(session.recording_url),
                 start_time=session.start_time,
                 role=entry["role"],
             )
@@ -111,7 +111,10 @@ def list_my_sessions(
 def get_session(session_id: int, db: Session = Depends(get_db), current_user: User = Depends(auth_service.get_current_user)):
     session = session_service.get_session(db, session_id)
     session_service.ensure_session_access(db, session, current_user)
-    return session
+    # Only callers who passed the access check get a playable recording link
+    out = SessionOut.model_validate(session)
+    out.recording_url = media_service.sign_url(session.recording_url)
+    return out
 
 
 @router.post("/{session_id}/join", response_model=AttendanceOut)
@@ -1,48 +1,73 @@
-from typing import Dict, List
+from typing import Optional
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
 
-router = APIRouter()
-
-
-class ConnectionManager:
-    def __init__(self):
-        # Maps connection_id -> List[WebSocket]
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+from app import SessionLocal
+from app.models.user import User
+from app.services import auth_service, connection_service, session_service
+from app.services.signaling_service import JSON_RELAY, manager
 
-    async def connect(self, websocket: WebSocket, connection_id: str):
-        await websocket.accept()
-        if connection_id not in self.active_connections:
-            self.active_connections[connection_id] = []
-        self.active_connections[connection_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, connection_id: str):
-        if connection_id in self.active_connections:
-            if websocket in self.active_connections[connection_id]:
-                self.active_connections[connection_id].remove(websocket)
-            if not self.active_connections[connection_id]:
-                del self.active_connections[connection_id]
-
-    async def broadcast(self, message: dict, connection_id: str, sender: WebSocket):
-        if connection_id in self.active_connections:
-            for connection in self.active_connections[connection_id]:
-                if connection != sender:
-                    await connection.send_json(message)
+router = APIRouter()
 
 
-manager = ConnectionManager()
+def _authorize(token: Optional[str], kind: str, room_id: str) -> str:
+    """Validate the token and room membership once; returns the room key."""
+    try:
+        target_id = int(room_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown meeting room")
+    db = SessionLocal()
+    try:
+        user = auth_service.get_user_from_token(db, token or "")
+        if kind == "session":
+            session = session_service.get_session(db, target_id)
+            session_service.ensure_session_access(db, session, user)
+            return f"session:{target_id}"
+        connection_service.ensure_participant(db, connection_id=target_id, user=user)
+        return str(target_id)
+    finally:
+        db.close()
 
 
 @router.websocket("/ws/meeting/{connection_id}")
-async def websocket_endpoint(websocket: WebSocket, connection_id: str):
-    await manager.connect(websocket, connection_id)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    connection_id: str,
+    token: Optional[str] = None,
+    kind: str = "connection",
+    relay: str = JSON_RELAY,
+    batch_ms: int = 0,
+):
+    try:
+        room = await run_in_threadpool(_authorize, token, kind, connection_id)
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+
+    # Authorized for the socket's lifetime: frames below are relayed without auth or DB work
+    peer = await manager.connect(websocket, room, relay=relay, batch_ms=batch_ms)
     try:
         while True:
+            if peer.opaque:
+                # Relay the raw frame to other participants without decoding it
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", status.WS_1000_NORMAL_CLOSURE))
+                data = frame.get("text")
+                await manager.receive_opaque(data if data is not None else frame["bytes"], room, peer)
+                continue
             data = await websocket.receive_json()
-            # Relay the message to other participants in the room
-            await manager.broadcast(data, connection_id, websocket)
+            # Relay the message to other participants in the room (heartbeats stop here)
+            await manager.receive(data, room, peer)
     except WebSocketDisconnect:
-        manager.disconnect(websocket, connection_id)
+        await manager.disconnect(peer, room)
     except Exception as e:
         print(f"Error in websocket: {e}")
-        manager.disconnect(websocket, connection_id)
+        await manager.disconnect(peer, room)
+
+
+@router.get("/signaling/stats", tags=["Signaling"])
+async def signaling_stats(current_user: User = Depends(auth_service.get_current_user)):
+    """Queue depth and drop counters for this worker's meeting sockets."""
+    return manager.snapshot()
@@ -4,11 +4,19 @@ from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 
-from app import Base, engine
+from app import Base, SessionLocal, engine
 from app.api import api_router
 from app.api.recommendation_api import router as recommendation_router
+from app.services import (
+    autocomplete_service,
+    geo_index_service,
+    job_service,
+    realtime_service,
+    search_index_service,
+    skill_index_service,
+)
+from app.services.media_service import MediaFiles
 from config.config import settings
 
 logging.basicConfig(level=logging.INFO)
@@ -38,16 +46,35 @@ else:
         allow_methods=["*"],
     )
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"INCOMING REQUEST: {request.method} {request.url.path}")
-    try:
-        response = await call_next(request)
-        logger.info(f"REQUEST PROCESSED: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"REQUEST FAILED: {str(e)}")
-        raise
+class RequestLogMiddleware:
+    """Logs each request and its status.
+
+    Plain ASGI rather than @app.middleware("http"): that wrapper re-streams
+    every response body and rejects zero-copy file transfers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        logger.info(f"INCOMING REQUEST: {scope['method']} {scope['path']}")
+
+        async def send_logged(message):
+            if message["type"] == "http.response.start":
+                logger.info(f"REQUEST PROCESSED: {message['status']}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_logged)
+        except Exception as e:
+            logger.error(f"REQUEST FAILED: {str(e)}")
+            raise
+
+
+app.add_middleware(RequestLogMiddleware)
 
 import os
 
@@ -55,11 +82,35 @@ import os
 for dir_path in [settings.recordings_dir, settings.resources_dir, settings.videos_dir, settings.uploads_dir]:
     os.makedirs(dir_path, exist_ok=True)
 
-# Static file mounts for shared media
-app.mount("/recordings", StaticFiles(directory=settings.recordings_dir), name="recordings")
-app.mount("/resources", StaticFiles(directory=settings.resources_dir), name="resources")
-app.mount("/videos", StaticFiles(directory=settings.videos_dir), name="videos")
-app.mount("/uploads", StaticFiles(directory=settings.uploads_dir), name="uploads")
+# Static file mounts for shared media (byte ranges for seeking, ETags, cache headers).
+# The patterns match the write-once names the upload services generate. Session and
+# meeting media need the signed links the listing endpoints hand out; avatars are public.
+app.mount(
+    "/recordings",
+    MediaFiles(directory=settings.recordings_dir, immutable=r"rec_[0-9a-f]{16}(\.\w+)?", signed_prefix="recordings"),
+    name="recordings",
+)
+app.mount(
+    "/resources",
+    MediaFiles(
+        directory=settings.resources_dir,
+        immutable=r"blobs/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?|res_[0-9a-f]{16}(\.\w+)?|\d{14}_\d+_[0-9a-f]{8}_.+",
+        signed_prefix="resources",
+    ),
+    name="resources",
+)
+# Live recordings grow until they are stopped or abandoned
+app.mount(
+    "/videos",
+    MediaFiles(
+        directory=settings.videos_dir,
+        immutable=r"\d{14}_\d+_[0-9a-f]{8}\.webm",
+        settle_seconds=settings.recording_ingest_resume_seconds,
+        signed_prefix="videos",
+    ),
+    name="videos",
+)
+app.mount("/uploads", MediaFiles(directory=settings.uploads_dir, immutable=r"avatars/\d+_[0-9a-f]{8}(\.\w+)?"), name="uploads")
 
 # Global exception handler to ensure CORS headers are always sent
 # This catches unhandled exceptions (not HTTPExceptions which are handled by FastAPI)
@@ -105,6 +156,34 @@ def on_startup() -> None:
     except Exception as e:
         logger.error(f"Failed to create database tables: {str(e)}", exc_info=True)
 
+    # Warm in-memory indexes so the first requests don't pay for building them
+    try:
+        with SessionLocal() as db:
+            geo_index_service.ensure_fresh(db)
+            skill_index_service.ensure_fresh(db)
+            search_index_service.warm(db)
+            autocomplete_service.ensure_fresh(db)
+    except Exception as e:
+        logger.error(f"Failed to warm in-memory indexes: {str(e)}", exc_info=True)
+
+    job_service.start_workers()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    job_service.stop_workers()
+
+
+@app.on_event("startup")
+async def start_chat_hub() -> None:
+    # Messages saved by this worker reach chat sockets on the others through the broker
+    await realtime_service.hub.start()
+
+
+@app.on_event("shutdown")
+async def stop_chat_hub() -> None:
+    await realtime_service.hub.stop()
+
 
 @app.get("/health", tags=["System"])
 def health_check():
@@ -1,7 +1,10 @@
 from app import Base  # noqa: F401
 from app.models.attendance import Attendance  # noqa: F401
+from app.models.blob import Blob  # noqa: F401
 from app.models.connection import Connection  # noqa: F401
+from app.models.job import Job  # noqa: F401
 from app.models.meeting_recording import MeetingRecording  # noqa: F401
+from app.models.recording_upload import RecordingUpload  # noqa: F401
 from app.models.message import Message  # noqa: F401
 from app.models.resource import Resource  # noqa: F401
 from app.models.session import Session  # noqa: F401
@@ -20,7 +23,10 @@ __all__ = [
     "Resource",
     "Connection",
     "MeetingRecording",
+    "RecordingUpload",
+    "Job",
     "MeetingDocument",
+    "Blob",
     "UserSkill",
     "UserProfile",
     "UserNotification",
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+
+from app import Base
+
+
+class Blob(Base):
+    """An uploaded file stored once under its SHA-256 and shared by every record pointing at it."""
+
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    extension = Column(String(16), nullable=False, default="")  # of the first upload, e.g. ".pdf"
+    size_bytes = Column(BigInteger, nullable=False)
+    # Resources and meeting documents pointing here; the file is deleted when it drops to 0
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
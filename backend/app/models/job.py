@@ -0,0 +1,35 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
+
+from app import Base
+
+
+class JobStatus(str, PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"  # claimed by a worker until run_after, its visibility timeout
+    DONE = "done"
+    FAILED = "failed"  # out of attempts
+
+
+class Job(Base):
+    """A unit of background work, run at least once by a job_service worker."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(64), nullable=False, index=True)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    # Queued: earliest start. Running: when the claim lapses and another worker may take it.
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String(128), nullable=True)
+    last_error = Column(Text, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,17 +1,29 @@
 from datetime import datetime
+from enum import Enum as PyEnum
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import BigInteger, Column, DateTime, Enum, Float, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from app import Base
 
 
+class RecordingStatus(str, PyEnum):
+    RECORDING = "recording"  # still being streamed in from the meeting page
+    COMPLETE = "complete"
+
+
 class MeetingRecording(Base):
     __tablename__ = "meeting_recordings"
 
     id = Column(Integer, primary_key=True, index=True)
     connection_id = Column(Integer, ForeignKey("connections.id", ondelete="CASCADE"), nullable=False, index=True)
     file_path = Column(String(512), nullable=False)
+    status = Column(Enum(RecordingStatus), default=RecordingStatus.COMPLETE, nullable=False)
+    # Read from the file when it is indexed; empty until then or if it is not WebM
+    duration_seconds = Column(Float, nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     connection = relationship("Connection", back_populates="recordings")
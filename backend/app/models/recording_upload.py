@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+
+from app import Base
+
+
+class RecordingUpload(Base):
+    """An unfinished resumable upload of a meeting recording."""
+
+    __tablename__ = "recording_uploads"
+
+    id = Column(String(32), primary_key=True)
+    connection_id = Column(Integer, ForeignKey("connections.id", ondelete="CASCADE"), nullable=False, index=True)
+    uploader_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    content_type = Column(String(100), nullable=False)
+    total_size = Column(BigInteger, nullable=True)
+    received_bytes = Column(BigInteger, default=0, nullable=False)
+    next_chunk = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
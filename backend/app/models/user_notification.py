@@ -26,6 +26,8 @@ class UserNotification(Base):
     extra_data = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     read_at = Column(DateTime, nullable=True)
+    # Set by queued notifications so a redelivered job doesn't create a duplicate
+    dedupe_key = Column(String(32), nullable=True, unique=True, index=True)
 
     user = relationship("User", back_populates="notifications")
 
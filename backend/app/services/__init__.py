@@ -1,14 +1,25 @@
 from app.services import (
     attendance_service,
     auth_service,
+    autocomplete_service,
+    blob_service,
+    broker_service,
     connection_service,
     dashboard_service,
+    geo_index_service,
+    job_service,
     meeting_service,
     message_service,
     notification_service,
+    realtime_service,
+    recording_ingest_service,
     recording_service,
+    recording_upload_service,
     resource_service,
+    search_index_service,
     session_service,
+    signaling_service,
+    skill_index_service,
     skill_service,
 )
 
@@ -24,5 +35,16 @@ __all__ = [
     "skill_service",
     "connection_service",
     "meeting_service",
+    "realtime_service",
+    "geo_index_service",
+    "skill_index_service",
+    "search_index_service",
+    "autocomplete_service",
+    "broker_service",
+    "signaling_service",
+    "recording_upload_service",
+    "recording_ingest_service",
+    "job_service",
+    "blob_service",
 ]
 
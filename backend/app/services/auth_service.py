@@ -1,6 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
 import re
+import threading
+import time
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
@@ -8,26 +11,86 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app import get_db
 from app.models.user import User, UserRole
 from app.models.user_profile import UserProfile
+from app.services import (
+    autocomplete_service,
+    geo_index_service,
+    job_service,
+    search_index_service,
+    skill_index_service,
+    snapshot_service,
+)
+from app.services.cache_service import TTLCache
 from config.config import settings
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost,
+    argon2__parallelism=settings.argon2_parallelism,
+)
 MAX_PASSWORD_LENGTH = 256
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# token -> user id, so repeat requests skip the JWT signature check
+_token_cache = TTLCache(max_entries=settings.auth_cache_max_entries, ttl_seconds=settings.auth_cache_ttl_seconds)
+# user id -> detached User snapshot, so repeat requests skip the users lookup
+_user_cache = TTLCache(max_entries=settings.auth_cache_max_entries, ttl_seconds=settings.auth_cache_ttl_seconds)
+
+
+# argon2-cffi releases the GIL, so a thread pool gives real parallelism here.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="argon2")
+# Running + queued hashing jobs; beyond this callers get an immediate 503 instead of waiting.
+_hash_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_queue_depth)
+
+
+def _run_hashing(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        logger.warning("Password hashing pool saturated, rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": str(settings.password_hash_retry_after_seconds)},
+        )
+    try:
+        future = _hash_executor.submit(func, *args)
+    except RuntimeError:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future.result()
+
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_login_password(db: Session, user: User, password: str) -> bool:
+    """Verify a login and transparently rehash when the argon2 parameters have changed."""
+    valid, new_hash = _run_hashing(pwd_context.verify_and_update, password, user.password)
+    if not valid:
+        return False
+    if new_hash:
+        user.password = new_hash
+        try:
+            db.commit()
+            invalidate_user_cache(user.id)
+        except SQLAlchemyError as exc:
+            # The login itself succeeded; the upgrade is retried on the next one
+            logger.error(f"Failed to upgrade password hash: {str(exc)}")
+            db.rollback()
+    return True
 
 
 def _validate_registration_data(
@@ -117,6 +180,9 @@ def create_user(
         logger.info(f"Commit successful, refreshing user...")
         db.refresh(user)
         logger.info(f"User created with ID: {user.id}")
+        geo_index_service.track_user(user)
+        search_index_service.track_user(user)
+        autocomplete_service.track_user(user.name)
 
         if skills:
             from app.services import skill_service
@@ -149,6 +215,7 @@ def change_password(db: Session, user: User, current_password: str, new_password
     user.password = get_password_hash(new_password)
     try:
         db.commit()
+        invalidate_user_cache(user.id)
     except Exception as e:
         logger.error(f"Failed to change password: {str(e)}", exc_info=True)
         db.rollback()
@@ -171,6 +238,7 @@ def change_email(db: Session, user: User, current_password: str, new_email: str)
     user.email = new_email.lower()
     try:
         db.commit()
+        invalidate_user_cache(user.id)
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
@@ -184,9 +252,18 @@ def delete_account(db: Session, user: User, password: str) -> None:
     if not verify_password(password, user.password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect password for confirmation")
     
+    user_id = user.id
     try:
         db.delete(user)
+        # Their resources and documents go with them, without releasing their blobs
+        job_service.enqueue(db, "blobs.collect", {})
         db.commit()
+        invalidate_user_cache(user_id)
+        geo_index_service.forget_user(user_id)
+        skill_index_service.forget_user(user_id)
+        snapshot_service.forget_user(user_id)
+        search_index_service.forget_user(user_id)
+        autocomplete_service.mark_stale()
     except Exception as e:
         logger.error(f"Failed to delete account: {str(e)}", exc_info=True)
         db.rollback()
@@ -204,6 +281,7 @@ def reset_password(db: Session, email: str, new_password: str) -> bool:
     user.password = get_password_hash(new_password)
     try:
         db.commit()
+        invalidate_user_cache(user.id)
         return True
     except Exception as e:
         logger.error(f"Failed to reset password: {str(e)}", exc_info=True)
@@ -215,7 +293,7 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email.lower())
     if not user:
         return None
-    if not verify_password(password, user.password):
+    if not verify_login_password(db, user, password):
         return None
     return user
 
@@ -227,26 +305,58 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def invalidate_user_cache(user_id: int) -> None:
+    _user_cache.pop(user_id)
+    _token_cache.discard_where(lambda _token, cached_id: cached_id == user_id)
+
+
+def _cache_user(user: User) -> None:
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    _user_cache.set(user.id, snapshot)
+
+
+def get_user_from_token(db: Session, token: str) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: Optional[str] = payload.get("sub")
-        if user_id is None:
+    user_id = _token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            subject: Optional[str] = payload.get("sub")
+            if subject is None:
+                raise credentials_exception
+            user_id = int(subject)
+        except (JWTError, ValueError):
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        # Never keep a token past its own expiry
+        expires_in = payload.get("exp", 0) - time.time()
+        _token_cache.set(token, user_id, ttl_seconds=expires_in)
 
-    user = db.get(User, int(user_id))
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        # Attach a copy to this request's session without a round trip
+        return db.merge(snapshot, load=False)
+
+    user = db.get(User, user_id)
     if user is None:
         raise credentials_exception
+    _cache_user(user)
     return user
 
 
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    return get_user_from_token(db, token)
+
+
 def ensure_mentor(user: User) -> None:
     if not user.is_mentor():
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only mentors can perform this action")
+
+
+def ensure_admin(user: User) -> None:
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can perform this action")
@@ -0,0 +1,184 @@
+import bisect
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.attendance import Attendance
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.models.user_skill import UserSkill
+from app.services.cache_service import RefreshGate
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+SKILLS = "skills"
+USERS = "users"
+SESSIONS = "sessions"
+KINDS = (SKILLS, USERS, SESSIONS)
+
+MEMO_ENTRIES = 4096
+
+
+def _normalize(label: str) -> str:
+    return " ".join(label.lower().split())
+
+
+class PrefixIndex:
+    """Sorted array of completion keys answering prefix queries with ``bisect``.
+
+    Each label is indexed under every word start ("Ada Lovelace" under "ada
+    lovelace" and "lovelace"), so typing any word of it completes the label.
+    Completions are ranked by a popularity count; answers for a prefix are
+    memoized until the next write, so short popular prefixes stay cheap.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []  # (key, normalized label), sorted
+        self._counts: Dict[str, int] = {}
+        self._labels: Dict[str, str] = {}
+        self._memo: Dict[Tuple[str, int], List[Dict[str, object]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    @staticmethod
+    def _word_keys(normalized: str) -> List[str]:
+        words = normalized.split(" ")
+        return [" ".join(words[position:]) for position in range(len(words))]
+
+    def add(self, label: Optional[str], amount: int = 1) -> None:
+        normalized = _normalize(label or "")
+        if not normalized:
+            return
+        self._memo.clear()
+        if normalized not in self._counts:
+            self._counts[normalized] = 0
+            self._labels[normalized] = label.strip()
+            for key in self._word_keys(normalized):
+                bisect.insort(self._keys, (key, normalized))
+        self._counts[normalized] += amount
+
+    def remove(self, label: Optional[str], amount: int = 1) -> None:
+        normalized = _normalize(label or "")
+        count = self._counts.get(normalized)
+        if count is None:
+            return
+        self._memo.clear()
+        if count > amount:
+            self._counts[normalized] = count - amount
+            return
+        del self._counts[normalized]
+        del self._labels[normalized]
+        for key in self._word_keys(normalized):
+            position = bisect.bisect_left(self._keys, (key, normalized))
+            if position < len(self._keys) and self._keys[position] == (key, normalized):
+                del self._keys[position]
+
+    def complete(self, prefix: str, limit: int) -> List[Dict[str, object]]:
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        cached = self._memo.get((prefix, limit))
+        if cached is not None:
+            return cached
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        matches = {normalized for _, normalized in self._keys[start:end]}
+        best = heapq.nsmallest(limit, matches, key=lambda normalized: (-self._counts[normalized], normalized))
+        result = [{"label": self._labels[normalized], "count": self._counts[normalized]} for normalized in best]
+        if len(self._memo) >= MEMO_ENTRIES:
+            self._memo.clear()
+        self._memo[(prefix, limit)] = result
+        return result
+
+
+class Autocomplete:
+    def __init__(self):
+        self.kinds: Dict[str, PrefixIndex] = {kind: PrefixIndex() for kind in KINDS}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, label: Optional[str], amount: int = 1) -> None:
+        with self._lock:
+            self.kinds[kind].add(label, amount)
+
+    def remove(self, kind: str, label: Optional[str], amount: int = 1) -> None:
+        with self._lock:
+            self.kinds[kind].remove(label, amount)
+
+    def complete(self, prefix: str, *, limit: int) -> Dict[str, List[Dict[str, object]]]:
+        with self._lock:
+            return {kind: index.complete(prefix, limit) for kind, index in self.kinds.items()}
+
+    def replace(self, kinds: Dict[str, PrefixIndex]) -> None:
+        with self._lock:
+            self.kinds = kinds
+
+
+completions = Autocomplete()
+_refresh = RefreshGate()
+
+
+def rebuild(db: Session) -> None:
+    """Popularity: users holding a skill, users with a name, and 1 + attendees per session."""
+    kinds = {kind: PrefixIndex() for kind in KINDS}
+    for name, count in db.query(UserSkill.name, func.count(UserSkill.id)).group_by(UserSkill.name).all():
+        kinds[SKILLS].add(name, count)
+    for name, count in db.query(User.name, func.count(User.id)).group_by(User.name).all():
+        kinds[USERS].add(name, count)
+    attendees = (
+        db.query(Attendance.session_id, func.count(Attendance.id).label("attendees"))
+        .group_by(Attendance.session_id)
+        .subquery()
+    )
+    rows = (
+        db.query(SessionModel.title, func.coalesce(attendees.c.attendees, 0))
+        .outerjoin(attendees, attendees.c.session_id == SessionModel.id)
+        .all()
+    )
+    for title, count in rows:
+        kinds[SESSIONS].add(title, 1 + count)
+    completions.replace(kinds)
+    _refresh.mark_built()
+    logger.info(
+        "Autocomplete rebuilt: " + ", ".join(f"{len(index)} {kind}" for kind, index in kinds.items())
+    )
+
+
+def ensure_fresh(db: Session) -> Autocomplete:
+    """Build on first use and periodically re-sync; deletions also force a rebuild."""
+    _refresh.refresh(settings.autocomplete_refresh_seconds, lambda: rebuild(db))
+    return completions
+
+
+def mark_stale() -> None:
+    """Cascading deletes remove skills and sessions we can't cheaply enumerate; rebuild on next use."""
+    _refresh.mark_stale()
+
+
+def track_user(name: str, previous_name: Optional[str] = None) -> None:
+    if previous_name == name:
+        return
+    if previous_name is not None:
+        completions.remove(USERS, previous_name)
+    completions.add(USERS, name)
+
+
+def track_skill(name: str) -> None:
+    completions.add(SKILLS, name)
+
+
+def forget_skill(name: str) -> None:
+    completions.remove(SKILLS, name)
+
+
+def track_session(title: str) -> None:
+    completions.add(SESSIONS, title)
+
+
+def track_attendee(title: str) -> None:
+    completions.add(SESSIONS, title)
@@ -0,0 +1,213 @@
+import logging
+import os
+import re
+import secrets
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.blob import Blob
+from app.models.meeting_document import MeetingDocument
+from app.models.resource import Resource
+from app.services import job_service, upload_service
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Blobs live in resources_dir, so the /resources mount serves them
+BLOBS_DIR = "blobs"
+# In-progress uploads; hidden, so never served
+STAGING_DIR = ".incoming"
+# Staging files and unrecorded blob files older than this are left over from crashes
+ABANDONED_SECONDS = 24 * 3600
+# Garbage collection also runs this often, besides after account deletions
+COLLECT_INTERVAL_SECONDS = 6 * 3600
+
+_BLOB_PATH = re.compile(rf"{BLOBS_DIR}/[0-9a-f]{{2}}/([0-9a-f]{{64}})(\.\w{{1,15}})?$")
+_EXTENSION = re.compile(r"\.\w{1,15}")
+
+
+def _root() -> Path:
+    return Path(settings.resources_dir) / BLOBS_DIR
+
+
+def staging_path(filename: str) -> Path:
+    """Where to stream an upload before ``adopt`` files it under its hash; keeps the extension."""
+    extension = Path(filename).suffix.lower()
+    if not _EXTENSION.fullmatch(extension):
+        extension = ""
+    return _root() / STAGING_DIR / f"{secrets.token_hex(8)}{extension}"
+
+
+def relative_path(sha256: str, extension: str) -> str:
+    """The blob's path relative to resources_dir (and the /resources mount)."""
+    return f"{BLOBS_DIR}/{sha256[:2]}/{sha256}{extension}"
+
+
+def sha256_of(file_path: Optional[str]) -> Optional[str]:
+    """The hash a stored ``file_path``/``file_url`` points at, or None for files from before the blob store."""
+    match = _BLOB_PATH.search(file_path or "")
+    return match.group(1) if match else None
+
+
+def adopt(db: Session, stored: upload_service.StoredUpload, *, failure_detail: str) -> str:
+    """Count one more reference to the blob with ``stored``'s bytes; returns its path (see ``relative_path``).
+
+    ``stored`` is a file at a ``staging_path``: it becomes the blob, or is
+    removed if the blob already exists. This runs in the caller's
+    transaction, which must add the referencing record and commit (or roll
+    back) straight away: until then it holds the blob's row, so a
+    concurrent ``release`` cannot take the file away.
+    """
+    sha256 = stored.sha256
+    try:
+        for _ in range(3):
+            counted = (
+                db.query(Blob)
+                .filter(Blob.sha256 == sha256)
+                .update({Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False)
+            )
+            if counted:
+                break
+            try:
+                with db.begin_nested():
+                    db.add(Blob(sha256=sha256, extension=stored.path.suffix, size_bytes=stored.size, ref_count=1))
+                break
+            except IntegrityError:
+                # Another upload of the same bytes created it first
+                continue
+        else:
+            raise SQLAlchemyError(f"Could not reference blob {sha256}")
+        blob = db.get(Blob, sha256)
+        path = Path(settings.resources_dir) / relative_path(sha256, blob.extension)
+        if path.exists():
+            stored.path.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(stored.path, path)
+            # Its age now tells the garbage collector when it was adopted
+            os.utime(path)
+    except (OSError, SQLAlchemyError) as exc:
+        db.rollback()
+        stored.path.unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=failure_detail) from exc
+    return relative_path(sha256, blob.extension)
+
+
+class BlobRemoval:
+    """A blob file ``release`` has set aside: delete it once the transaction commits, or put it back."""
+
+    def __init__(self, path: Path, parked: Path):
+        self.path = path
+        self.parked = parked
+
+    def commit(self) -> None:
+        self.parked.unlink(missing_ok=True)
+
+    def rollback(self) -> None:
+        if self.parked.exists():
+            os.replace(self.parked, self.path)
+
+
+def release(db: Session, file_path: str) -> Optional[BlobRemoval]:
+    """Drop one reference to the blob ``file_path`` points at, in the caller's transaction.
+
+    When it was the last one, the row is deleted and the file renamed
+    aside while the row is still held, so no upload can find the blob
+    half-deleted; the caller then commits and calls ``commit()`` on the
+    returned removal (or rolls back and calls ``rollback()``).
+    """
+    sha256 = sha256_of(file_path)
+    if sha256 is None:
+        return None
+    db.query(Blob).filter(Blob.sha256 == sha256).update({Blob.ref_count: Blob.ref_count - 1}, synchronize_session=False)
+    return _remove_if_unreferenced(db, sha256, Path(file_path).name, ref_count=0)
+
+
+def _remove_if_unreferenced(db: Session, sha256: str, filename: str, *, ref_count: int) -> Optional[BlobRemoval]:
+    removed = (
+        db.query(Blob)
+        .filter(Blob.sha256 == sha256, Blob.ref_count <= ref_count)
+        .delete(synchronize_session=False)
+    )
+    if not removed:
+        return None
+    path = _root() / sha256[:2] / filename
+    parked = path.with_name(f".{filename}.{secrets.token_hex(4)}.deleted")
+    try:
+        os.replace(path, parked)
+    except FileNotFoundError:
+        return None
+    return BlobRemoval(path, parked)
+
+
+job_service.every("blobs.collect", COLLECT_INTERVAL_SECONDS)
+
+
+@job_service.handler("blobs.collect")
+def collect_garbage(db: Session, payload: Optional[dict] = None) -> int:
+    """Delete blobs nothing points at any more; returns how many.
+
+    Reference counts only ever run high, when referencing rows go without
+    ``release`` (database cascades on account deletion). Counts are
+    corrected with compare-and-set updates, so an upload or delete racing
+    with the sweep wins and the blob is looked at again next time.
+    """
+    seen = {
+        sha256: (extension, ref_count)
+        for sha256, extension, ref_count in db.query(Blob.sha256, Blob.extension, Blob.ref_count)
+    }
+    references = Counter()
+    for (file_path,) in db.query(Resource.file_url).union_all(db.query(MeetingDocument.file_path)):
+        sha256 = sha256_of(file_path)
+        if sha256 is not None:
+            references[sha256] += 1
+
+    removals = []
+    for sha256, (extension, ref_count) in seen.items():
+        if references[sha256] == ref_count:
+            continue
+        if references[sha256]:
+            db.query(Blob).filter(Blob.sha256 == sha256, Blob.ref_count == ref_count).update(
+                {Blob.ref_count: references[sha256]}, synchronize_session=False
+            )
+            db.commit()
+            continue
+        removal = _remove_if_unreferenced(db, sha256, f"{sha256}{extension}", ref_count=ref_count)
+        try:
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            if removal is not None:
+                removal.rollback()
+            raise
+        if removal is not None:
+            removal.commit()
+            removals.append(sha256)
+
+    _remove_abandoned_files(db)
+    if removals:
+        logger.info(f"Deleted {len(removals)} unreferenced blobs")
+    return len(removals)
+
+
+def _remove_abandoned_files(db: Session) -> None:
+    root = _root()
+    if not root.is_dir():
+        return
+    cutoff = time.time() - ABANDONED_SECONDS
+    known = {sha256 for (sha256,) in db.query(Blob.sha256)}
+    for path in root.glob("*/*"):
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            # Interrupted uploads, and blob files whose row was rolled back
+            if path.parent.name == STAGING_DIR or path.name.startswith(".") or path.name[:64] not in known:
+                path.unlink()
+        except OSError:
+            continue
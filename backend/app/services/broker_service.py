@@ -0,0 +1,263 @@
+"""Room brokers that carry signaling and chat messages between workers.
+
+Each worker keeps its own sockets; a broker forwards what one worker's peers
+send to the other workers that have sockets in the same room.
+
+``memory``  single worker, every peer of a room is local: nothing to forward.
+``unix``    workers share a Unix-socket bus. The first worker to take the
+            bus lock serves it, the others connect to it; if that worker
+            exits, the rest elect a new one and re-register their rooms.
+            POSIX only (flock and Unix sockets).
+
+Payloads are decoded messages (dicts) or, from opaque-relay clients, raw
+text or binary frames; binary frames travel base64-encoded on the bus.
+"""
+import asyncio
+import base64
+import collections
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Union
+
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+Payload = Union[dict, str, bytes]
+Deliver = Callable[[str, Payload], Awaitable[None]]
+
+# SDP offers are a few KB; leave room for large candidate batches
+MAX_FRAME_BYTES = 1024 * 1024
+# A peer that falls this far behind on the bus is disconnected and reconnects
+MAX_PEER_BACKLOG_BYTES = 4 * 1024 * 1024
+# Frames kept while the bus is being (re)established
+MAX_OUTBOX_FRAMES = 1000
+RECONNECT_DELAY_SECONDS = 0.5
+
+
+class RoomBroker:
+    """Broker interface; on its own it is the in-process (``memory``) backend."""
+
+    def __init__(self):
+        self.deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+
+    async def stop(self) -> None:
+        pass
+
+    async def subscribe(self, room: str) -> None:
+        pass
+
+    async def unsubscribe(self, room: str) -> None:
+        pass
+
+    async def publish(self, room: str, payload: Payload) -> None:
+        pass
+
+
+def _encode(frame: dict) -> bytes:
+    return json.dumps(frame, separators=(",", ":")).encode() + b"\n"
+
+
+class UnixSocketBroker(RoomBroker):
+    """Cross-process broker over a Unix-socket bus served by one elected worker."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.rooms: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._outbox: Deque[bytes] = collections.deque(maxlen=MAX_OUTBOX_FRAMES)
+        # Only used while this worker serves the bus
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._peers: Dict[str, Set[asyncio.StreamWriter]] = {}
+
+    @property
+    def is_leader(self) -> bool:
+        return self._server is not None
+
+    async def start(self, deliver: Deliver) -> None:
+        self.deliver = deliver
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._step_down()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def subscribe(self, room: str) -> None:
+        self.rooms.add(room)
+        self._send({"op": "sub", "room": room})
+
+    async def unsubscribe(self, room: str) -> None:
+        self.rooms.discard(room)
+        self._send({"op": "unsub", "room": room})
+
+    async def publish(self, room: str, payload: Payload) -> None:
+        if isinstance(payload, bytes):
+            self._send({"op": "pub", "room": room, "binary": base64.b64encode(payload).decode()})
+        else:
+            self._send({"op": "pub", "room": room, "payload": payload})
+
+    # -- local side -----------------------------------------------------
+
+    def _send(self, frame: dict) -> None:
+        if self.is_leader:
+            if frame["op"] == "pub":
+                self._forward(frame["room"], _encode(frame), origin=None)
+            return
+        data = _encode(frame)
+        if self._writer is None or self._writer.is_closing():
+            # Subscriptions are replayed on reconnect; only messages need parking
+            if frame["op"] == "pub":
+                self._outbox.append(data)
+            return
+        if self._writer.transport.get_write_buffer_size() > MAX_PEER_BACKLOG_BYTES:
+            logger.warning("Signaling bus backlog too large, reconnecting")
+            self._writer.close()
+            return
+        self._writer.write(data)
+
+    async def _deliver(self, frame: dict) -> None:
+        room = frame.get("room")
+        if room in self.rooms and self.deliver is not None:
+            try:
+                if "binary" in frame:
+                    await self.deliver(room, base64.b64decode(frame["binary"]))
+                else:
+                    await self.deliver(room, frame["payload"])
+            except Exception as exc:
+                logger.warning(f"Signaling delivery failed in {room}: {exc}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._try_lead():
+                    await asyncio.Event().wait()  # serve until cancelled
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Signaling bus error: {exc}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _follow(self) -> None:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_FRAME_BYTES)
+        except OSError:
+            return
+        self._writer = writer
+        for room in self.rooms:
+            writer.write(_encode({"op": "sub", "room": room}))
+        while self._outbox:
+            writer.write(self._outbox.popleft())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await self._deliver(json.loads(line))
+        finally:
+            self._writer = None
+            writer.close()
+
+    # -- bus side (leader only) -----------------------------------------
+
+    async def _try_lead(self) -> bool:
+        import fcntl  # POSIX only, so imported here rather than for every broker
+
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        try:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # left behind by a previous leader
+            self._server = await asyncio.start_unix_server(self._serve_peer, self.path, limit=MAX_FRAME_BYTES)
+        except OSError:
+            await self._step_down()
+            raise
+        while self._outbox:
+            frame = json.loads(self._outbox.popleft())
+            self._forward(frame["room"], _encode(frame), origin=None)
+        logger.info(f"Serving signaling bus on {self.path} (pid {os.getpid()})")
+        return True
+
+    async def _step_down(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for writers in self._peers.values():
+            for writer in writers:
+                writer.close()
+        self._peers.clear()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _forward(self, room: str, data: bytes, *, origin: Optional[asyncio.StreamWriter]) -> None:
+        for writer in list(self._peers.get(room, ())):
+            if writer is origin:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_PEER_BACKLOG_BYTES:
+                logger.warning("Dropping slow signaling bus peer")
+                writer.close()
+                continue
+            writer.write(data)
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                frame = json.loads(line)
+                op, room = frame.get("op"), frame.get("room")
+                if op == "sub":
+                    self._peers.setdefault(room, set()).add(writer)
+                elif op == "unsub":
+                    self._discard_peer(room, writer)
+                elif op == "pub":
+                    self._forward(room, line, origin=writer)
+                    await self._deliver(frame)
+        except (ConnectionError, ValueError) as exc:
+            logger.warning(f"Signaling bus peer failed: {exc}")
+        finally:
+            for room in list(self._peers):
+                self._discard_peer(room, writer)
+            writer.close()
+
+    def _discard_peer(self, room: str, writer: asyncio.StreamWriter) -> None:
+        writers = self._peers.get(room)
+        if writers is None:
+            return
+        writers.discard(writer)
+        if not writers:
+            del self._peers[room]
+
+
+def create_broker(path: Optional[str] = None) -> RoomBroker:
+    """The configured broker; ``path`` picks the bus (defaults to the signaling one)."""
+    if settings.signaling_broker == "unix":
+        try:
+            import fcntl  # noqa: F401
+        except ImportError:
+            raise RuntimeError(
+                'signaling_broker = "unix" needs a POSIX platform (flock and Unix sockets); '
+                'use "memory" with a single worker instead'
+            ) from None
+        return UnixSocketBroker(path or settings.signaling_bus_path)
+    return RoomBroker()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, TypeVar
+
+
+Built = TypeVar("Built")
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl_seconds``.
+
+    Sync endpoints run in Starlette's threadpool, so every operation takes a lock.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, *, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        with self._lock:
+            stale = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RefreshGate:
+    """Single-flight periodic rebuilds for an in-memory index.
+
+    The first build makes every caller wait for it, since there is nothing
+    to serve yet. After that, once the index is older than ``max_age`` one
+    caller rebuilds it while the others return straight away and keep
+    serving the current index.
+    """
+
+    def __init__(self) -> None:
+        self.built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def mark_built(self, at: Optional[float] = None) -> None:
+        self.built_at = time.monotonic() if at is None else at
+
+    def mark_stale(self) -> None:
+        """Rebuild on next use, still serving the current index meanwhile."""
+        if self.built_at is not None:
+            self.built_at = float("-inf")
+
+    def _is_stale(self, max_age: float) -> bool:
+        return self.built_at is None or time.monotonic() - self.built_at > max_age
+
+    def refresh(self, max_age: float, rebuild: Callable[[], None]) -> None:
+        if not self._is_stale(max_age):
+            return
+        if self.built_at is None:
+            with self._lock:
+                if self.built_at is None:
+                    rebuild()
+            return
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already rebuilding
+            return
+        try:
+            if self._is_stale(max_age):
+                rebuild()
+        finally:
+            self._lock.release()
+
+
+class ChangeLog:
+    """Writes an index takes while it is being rebuilt, replayed onto the rebuilt copy.
+
+    A rebuild reads its source without holding the index's lock, so writes
+    keep landing on the old copy meanwhile and would be lost at the swap.
+    Mutators ``record`` how to redo themselves (under ``lock``); the redo
+    must be idempotent, since the rebuilt copy may already include it.
+    """
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self._lock = lock
+        self._changes: Optional[List[Callable[[], None]]] = None
+
+    def record(self, change: Callable[[], None]) -> None:
+        if self._changes is not None:
+            self._changes.append(change)
+
+    def rebuild(self, build: Callable[[], Built], swap: Callable[[Built], None]) -> None:
+        """Run ``build()`` unlocked, then ``swap`` in its result and replay what was recorded meanwhile."""
+        with self._lock:
+            self._changes = []
+        try:
+            built = build()
+        except BaseException:
+            with self._lock:
+                self._changes = None
+            raise
+        with self._lock:
+            swap(built)
+            for change in self._changes:
+                change()
+            self._changes = None
@@ -7,7 +7,24 @@ from sqlalchemy.orm import Session
 from app.models.connection import Connection, ConnectionStatus
 from app.models.user import User
 from app.models.user_notification import NotificationType
-from app.services import notification_service
+from app.services import notification_service, snapshot_service
+from app.services.cache_service import TTLCache
+from config.config import settings
+
+# connection_id -> (sender_id, receiver_id) of accepted connections. Only accepted
+# connections are cached: they never change state again, so no other worker's
+# write can make an entry wrong, and pending ones are always re-read.
+_memberships = TTLCache(
+    max_entries=settings.membership_cache_max_entries,
+    ttl_seconds=settings.membership_cache_ttl_seconds,
+)
+
+
+def _remember_membership(connection: Connection) -> None:
+    if connection.status == ConnectionStatus.ACCEPTED:
+        _memberships.set(connection.id, (connection.sender_id, connection.receiver_id))
+    else:
+        _memberships.pop(connection.id)
 
 
 def _get_connection_or_404(db: Session, connection_id: int) -> Connection:
@@ -52,12 +69,11 @@ def create_request(db: Session, *, sender: User, receiver_id: int) -> Connection
     connection = Connection(sender_id=sender.id, receiver_id=receiver_id, status=ConnectionStatus.PENDING)
     try:
         db.add(connection)
-        db.commit()
-        db.refresh(connection)
+        db.flush()
 
         # Notify Receiver
         import json
-        notification_service.create_notification(
+        notification_service.enqueue_notification(
             db,
             user_id=receiver_id,
             title="New Connection Request",
@@ -66,6 +82,9 @@ def create_request(db: Session, *, sender: User, receiver_id: int) -> Connection
             extra_data=json.dumps({"connection_id": connection.id, "action": "connection_request"}),
         )
 
+        db.commit()
+        db.refresh(connection)
+        snapshot_service.connections_changed([sender.id, receiver_id])
         return connection
     except SQLAlchemyError as exc:
         db.rollback()
@@ -81,11 +100,8 @@ def accept_request(db: Session, *, connection_id: int, receiver: User) -> Connec
 
     connection.status = ConnectionStatus.ACCEPTED
     try:
-        db.commit()
-        db.refresh(connection)
-
         # Notify Sender
-        notification_service.create_notification(
+        notification_service.enqueue_notification(
             db,
             user_id=connection.sender_id,
             title="Connection Accepted",
@@ -93,6 +109,10 @@ def accept_request(db: Session, *, connection_id: int, receiver: User) -> Connec
             type=NotificationType.GENERAL,
         )
 
+        db.commit()
+        db.refresh(connection)
+        _remember_membership(connection)
+        snapshot_service.connections_changed([connection.sender_id, connection.receiver_id])
         return connection
     except SQLAlchemyError as exc:
         db.rollback()
@@ -109,6 +129,8 @@ def reject_request(db: Session, *, connection_id: int, receiver: User) -> None:
     try:
         db.delete(connection)
         db.commit()
+        _memberships.pop(connection_id)
+        snapshot_service.connections_changed([connection.sender_id, connection.receiver_id])
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to reject connection") from exc
@@ -144,12 +166,18 @@ def get_sender_redirect(db: Session, *, sender: User) -> Optional[Connection]:
     )
 
 
-def ensure_participant(db: Session, *, connection_id: int, user: User) -> Connection:
-    connection = _get_connection_or_404(db, connection_id)
-    if user.id not in (connection.sender_id, connection.receiver_id):
+def ensure_participant(db: Session, *, connection_id: int, user: User) -> None:
+    """Check ``user`` is a party to the accepted connection, from the membership cache when possible."""
+    members = _memberships.get(connection_id)
+    if members is None:
+        connection = _get_connection_or_404(db, connection_id)
+        if user.id not in (connection.sender_id, connection.receiver_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed on this connection")
+        if connection.status != ConnectionStatus.ACCEPTED:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Connection not yet accepted")
+        _remember_membership(connection)
+        return
+    if user.id not in members:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed on this connection")
-    if connection.status != ConnectionStatus.ACCEPTED:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Connection not yet accepted")
-    return connection
 
 
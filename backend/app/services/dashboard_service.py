@@ -1,115 +1,174 @@
 from collections import Counter
-from datetime import datetime
-from typing import Dict, List
-from sqlalchemy import or_
+from functools import cached_property
+from typing import Dict, List, Optional
 
 from app.models.session import Session as SessionModel
 from app.models.user import User
+from app.models.user_profile import UserProfile
 from app.models.user_skill import UserSkill
-from app.services import notification_service, profile_service, recommendation_service, session_service, skill_service
+from app.services import (
+    autocomplete_service,
+    notification_service,
+    profile_service,
+    recommendation_service,
+    search_index_service,
+    session_service,
+    skill_service,
+    snapshot_service,
+)
+
+
+class _OverviewInputs:
+    """Loads what the sections being rebuilt need, each at most once per request.
+
+    On a fully cached dashboard none of these run, so a repeat load issues no
+    session or user scans at all.
+    """
+
+    def __init__(self, db, user: User):
+        self.db = db
+        self.user = user
+
+    def section(self, name: str, build):
+        return snapshot_service.snapshots.get_or_build(self.user.id, name, build)
+
+    @cached_property
+    def skills(self) -> List[UserSkill]:
+        return skill_service.list_skills(self.db, user=self.user)
+
+    @cached_property
+    def catalog(self) -> Dict:
+        return snapshot_service.snapshots.get_or_build(
+            None, snapshot_service.CATALOG, lambda: _build_catalog(self.db)
+        )
 
+    @cached_property
+    def trending(self) -> List[Dict]:
+        return self.section(
+            snapshot_service.TRENDING_SKILLS, lambda: _build_trending_skills(self.catalog, self.skills)
+        )
 
-def get_dashboard_overview(db, *, user: User) -> Dict:
-    profile = profile_service.get_profile(db, user)
-    skills = skill_service.list_skills(db, user=user)
-    sessions = session_service.list_sessions(db)
-    created_sessions = session_service.list_sessions_created_by_user(db, user)
-    joined_sessions = session_service.list_sessions_joined_by_user(db, user)
-    notifications = notification_service.list_notifications(db, user=user, limit=50)
+    @cached_property
+    def communities(self) -> List[Dict]:
+        return self.section(snapshot_service.COMMUNITIES, lambda: _build_communities(self.db, self.user))
 
-    joined_session_ids = {session.id for session in created_sessions}
-    for session in joined_sessions:
-        joined_session_ids.add(session.id)
 
-    recommendations = _build_recommendations(user, sessions)
-    trending_skills = _build_trending_skills(sessions, skills)
-    upcoming_sessions = _build_upcoming_sessions(sessions)
-    communities = _serialize_communities(
-        [s for s in sessions if s.id in joined_session_ids],
-        owned_ids={session.id for session in created_sessions},
-    )
-    feed_items = _build_feed_items(communities, user)
-
-    today = datetime.utcnow()
-    # Get User Recommendations (People)
-    # Eager load skills if not already to optimize
-    other_users = db.query(User).filter(User.id != user.id).all()
-    user_skill_names = [s.name for s in skills]
-    user_recs = recommendation_service.recommend_users_by_location(
-        db, user, other_users, user_skills=user_skill_names
-    )
+def get_dashboard_overview(db, *, user: User) -> Dict:
+    inputs = _OverviewInputs(db, user)
+    section = inputs.section
 
     overview = {
-        "user": {
-            "name": user.name,
-            "location": user.location,
-            "role": user.role,
-            "avatar_url": user.avatar_url,
-            "profile_completion": _calculate_profile_completion(user, profile, skills),
-        },
-        "skills": {
-            "quick_links": _build_quick_links(skills, trending_skills),
-            "personal": [_serialize_skill(skill) for skill in skills],
-        },
-        "recommendations": recommendations[:3],
-        "users_near_you": user_recs["combined"][:5],  # Priority: Local -> Global
-        "trending_skills": trending_skills,
-        "upcoming_sessions": upcoming_sessions[:4],
-        "communities": communities[:4],
-        "notifications": [_serialize_notification(notification) for notification in notifications],
-        "feed": feed_items[:4],
-        "stats": {
-            "total_sessions": len(sessions),
-            "joined_sessions": len(joined_session_ids),
-            "skills_count": len(skills),
-        },
+        "user": section(
+            snapshot_service.USER,
+            lambda: {
+                "name": user.name,
+                "location": user.location,
+                "role": user.role,
+                "avatar_url": user.avatar_url,
+                "profile_completion": _calculate_profile_completion(
+                    user, profile_service.get_profile(db, user), inputs.skills
+                ),
+            },
+        ),
+        "skills": section(
+            snapshot_service.SKILLS,
+            lambda: {
+                "quick_links": _build_quick_links(inputs.skills, inputs.trending),
+                "personal": [_serialize_skill(skill) for skill in inputs.skills],
+            },
+        ),
+        "recommendations": section(
+            snapshot_service.RECOMMENDATIONS, lambda: _build_recommendations(user, inputs.catalog)
+        ),
+        # People from the geo and skill indexes. Priority: Local -> Global
+        "users_near_you": section(
+            snapshot_service.USERS_NEAR_YOU,
+            lambda: recommendation_service.recommend_users_by_location(
+                db, user, user_skills=[skill.name for skill in inputs.skills], limit=5
+            )["combined"],
+        ),
+        "trending_skills": inputs.trending,
+        "upcoming_sessions": section(
+            snapshot_service.UPCOMING_SESSIONS, lambda: inputs.catalog["upcoming"][:4]
+        ),
+        "communities": inputs.communities[:4],
+        "notifications": section(
+            snapshot_service.NOTIFICATIONS,
+            lambda: [
+                _serialize_notification(notification)
+                for notification in notification_service.list_notifications(db, user=user, limit=50)
+            ],
+        ),
+        "feed": section(snapshot_service.FEED, lambda: _build_feed_items(inputs.communities, user)[:4]),
+        "stats": section(
+            snapshot_service.STATS,
+            lambda: {
+                "total_sessions": inputs.catalog["total"],
+                "joined_sessions": len(inputs.communities),
+                "skills_count": len(inputs.skills),
+            },
+        ),
     }
     return overview
 
 
-def search_general(db, *, query: str) -> Dict:
+def search_general(db, *, query: str, limit: int = 10, offset: int = 0) -> Dict:
+    """Rank users, skills and sessions for ``query`` from the BM25 search index.
+
+    ``limit``/``offset`` page each of the three lists; ``total`` gives the
+    number of matches per list. Only the rows on the page are loaded.
+    """
     query = query.strip().lower()
     if not query:
-        return {"users": [], "skills": [], "sessions": []}
-
-    # 1. Search Users (Name or Location)
-    # Note: SQLite LIKE is case-insensitive for ASCII, but we use ilike for Postgres compatibility if needed, 
-    # though here standard like with lower input covers basics.
-    users = db.query(User).filter(
-        or_(
-            User.name.ilike(f"%{query}%"),
-            User.location.ilike(f"%{query}%")
-        )
-    ).limit(10).all()
-
-    # 2. Search Skills
-    # Join with User to show who possesses the skill
-    skills_query = db.query(UserSkill).join(User).filter(
-        UserSkill.name.ilike(f"%{query}%")
-    ).limit(10).all()
-
-    # 3. Search Sessions
-    sessions = db.query(SessionModel).filter(
-        or_(
-            SessionModel.title.ilike(f"%{query}%"),
-            SessionModel.description.ilike(f"%{query}%")
-        )
-    ).limit(10).all()
+        return {"users": [], "skills": [], "sessions": [], "total": {"users": 0, "skills": 0, "sessions": 0}}
 
+    index = search_index_service.ensure_fresh(db)
+    user_ids, user_total = index.search(search_index_service.USERS, query, offset=offset, limit=limit)
+    skill_ids, skill_total = index.search(search_index_service.SKILLS, query, offset=offset, limit=limit)
+    session_ids, session_total = index.search(search_index_service.SESSIONS, query, offset=offset, limit=limit)
+
+    skills = (
+        {skill.id: skill for skill in db.query(UserSkill).filter(UserSkill.id.in_(skill_ids)).all()}
+        if skill_ids
+        else {}
+    )
+    people_ids = set(user_ids) | {skill.user_id for skill in skills.values()}
+    people = {user.id: user for user in db.query(User).filter(User.id.in_(people_ids)).all()} if people_ids else {}
+    avatars = (
+        dict(db.query(UserProfile.user_id, UserProfile.avatar_url).filter(UserProfile.user_id.in_(people_ids)).all())
+        if people_ids
+        else {}
+    )
+    sessions = (
+        {session.id: session for session in db.query(SessionModel).filter(SessionModel.id.in_(session_ids)).all()}
+        if session_ids
+        else {}
+    )
+
+    # Rows deleted by another worker may linger in the index until its next refresh
     results = {
-        "users": [_serialize_user_search(u) for u in users],
+        "users": [
+            _serialize_user_search(people[user_id], avatars.get(user_id)) for user_id in user_ids if user_id in people
+        ],
         "skills": [
             {
-                "skill": s.name, 
-                "user": _serialize_user_search(s.user),
-                "level": s.level
-            } for s in skills_query
+                "skill": skill.name,
+                "user": _serialize_user_search(people[skill.user_id], avatars.get(skill.user_id)),
+                "level": skill.level,
+            }
+            for skill in (skills.get(skill_id) for skill_id in skill_ids)
+            if skill is not None and skill.user_id in people
         ],
-        "sessions": [_serialize_session(s) for s in sessions]
+        "sessions": [_serialize_session(sessions[session_id]) for session_id in session_ids if session_id in sessions],
+        "total": {"users": user_total, "skills": skill_total, "sessions": session_total},
     }
     return results
 
 
+def autocomplete(db, *, prefix: str, limit: int = 8) -> Dict:
+    """Typeahead completions per kind, most popular first, served from memory."""
+    return autocomplete_service.ensure_fresh(db).complete(prefix, limit=limit)
+
 
 def _build_quick_links(skills: List[UserSkill], trending: List[Dict]) -> List[str]:
     # Use a set to track seen skills to avoid duplicates
@@ -136,33 +195,51 @@ def _build_quick_links(skills: List[UserSkill], trending: List[Dict]) -> List[st
     return quick_links or ["AI", "Web Development", "Design"]
 
 
-def _build_recommendations(user: User, sessions: List[SessionModel]) -> List[Dict]:
-    payload = [
-        {"session_id": session.id, "title": session.title, "location": session.location}
+def _build_catalog(db) -> Dict:
+    """Everything the session-derived sections need, shared by all users."""
+    sessions = session_service.list_sessions(db)
+    entries = [
+        {
+            "session": _serialize_session(session),
+            "category": _categorize_session(session)["label"],
+            "location": session.location,
+        }
         for session in sessions
     ]
-    recommendations = recommendation_service.recommend_sessions(user.location, payload)
-    session_lookup = {session.id: session for session in sessions}
+    upcoming = sorted(sessions, key=lambda s: (s.date, s.time))[:4]
+    return {
+        "sessions": entries,
+        "category_counts": Counter(entry["category"] for entry in entries),
+        "upcoming": [_serialize_session(session) for session in upcoming],
+        "total": len(sessions),
+    }
+
+
+def _build_recommendations(user: User, catalog: Dict) -> List[Dict]:
+    payload = [
+        {"session_id": entry["session"]["id"], "title": entry["session"]["title"], "location": entry["location"]}
+        for entry in catalog["sessions"]
+    ]
+    # Only the top three are shown on the dashboard
+    recommendations = recommendation_service.recommend_sessions(user.location, payload, limit=3)
+    entry_lookup = {entry["session"]["id"]: entry for entry in catalog["sessions"]}
     results: List[Dict] = []
     for recommendation in recommendations:
-        session = session_lookup.get(recommendation["session_id"])
-        if not session:
+        entry = entry_lookup.get(recommendation["session_id"])
+        if not entry:
             continue
         results.append(
             {
-                **_serialize_session(session),
+                **entry["session"],
                 "match_score": recommendation["similarity_score"],
-                "category": _categorize_session(session)["label"],
+                "category": entry["category"],
             }
         )
     return results
 
 
-def _build_trending_skills(sessions: List[SessionModel], user_skills: List[UserSkill]) -> List[Dict]:
-    counter = Counter()
-    for session in sessions:
-        category = _categorize_session(session)
-        counter[category["label"]] += 1
+def _build_trending_skills(catalog: Dict, user_skills: List[UserSkill]) -> List[Dict]:
+    counter = Counter(catalog["category_counts"])
     for skill in user_skills:
         counter[skill.name] += 1
     trending = [{"label": label, "count": count} for label, count in counter.most_common(10)]
@@ -175,12 +252,14 @@ def _build_trending_skills(sessions: List[SessionModel], user_skills: List[UserS
     ]
 
 
-def _build_upcoming_sessions(sessions: List[SessionModel]) -> List[Dict]:
-    future_sessions = sorted(
-        sessions,
-        key=lambda s: (s.date, s.time),
+def _build_communities(db, user: User) -> List[Dict]:
+    created_sessions = session_service.list_sessions_created_by_user(db, user)
+    joined_sessions = session_service.list_sessions_joined_by_user(db, user)
+    sessions = {session.id: session for session in created_sessions + joined_sessions}
+    return _serialize_communities(
+        sorted(sessions.values(), key=lambda s: (s.date, s.time)),
+        owned_ids={session.id for session in created_sessions},
     )
-    return [_serialize_session(session) for session in future_sessions]
 
 
 def _build_feed_items(communities: List[Dict], user: User) -> List[Dict]:
@@ -278,12 +357,12 @@ def _calculate_profile_completion(user: User, profile, skills: List[UserSkill])
     return completed / total_sections
 
 
-def _serialize_user_search(user: User) -> Dict:
+def _serialize_user_search(user: User, avatar_url: Optional[str] = None) -> Dict:
     return {
         "id": user.id,
         "name": user.name,
         "location": user.location,
-        "avatar_url": user.avatar_url,
+        "avatar_url": avatar_url,
         "role": user.role,
     }
 
@@ -0,0 +1,237 @@
+import heapq
+import logging
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.services.cache_service import ChangeLog, RefreshGate
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+Cell = Tuple[int, int]
+Row = Tuple[int, Optional[float], Optional[float]]
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = (
+        math.sin((lat2_rad - lat1_rad) / 2) ** 2
+        + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin((lon2_rad - lon1_rad) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGridIndex:
+    """Equal-angle lat/lon grid answering "k nearest within radius R" queries.
+
+    Points are bucketed into ``cell_deg`` x ``cell_deg`` cells. A query walks
+    rings of cells outward from the query cell and stops as soon as a ring's
+    lower-bound distance exceeds the radius or the current k-th best, so it only
+    touches the users around the query point instead of every user.
+
+    Coordinates are also kept in a contiguous array indexed by user id, so
+    scoring can gather a whole candidate list with one fancy index.
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self.rows = int(math.ceil(180 / cell_deg))
+        self.cols = int(math.ceil(360 / cell_deg))
+        self._cells: Dict[Cell, Set[int]] = {}
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._coords = np.full((0, 2), np.nan)
+        self._lock = threading.Lock()
+        self._changes = ChangeLog(self._lock)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        row = min(int((lat + 90) // self.cell_deg), self.rows - 1)
+        col = int(((lon + 180) % 360) // self.cell_deg) % self.cols
+        return row, col
+
+    def _discard(self, user_id: int) -> None:
+        previous = self._points.pop(user_id, None)
+        if previous is None:
+            return
+        self._coords[user_id] = np.nan
+        cell = self._cell(*previous)
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(user_id)
+            if not members:
+                del self._cells[cell]
+
+    def _upsert(self, user_id: int, lat: Optional[float], lon: Optional[float]) -> None:
+        self._discard(user_id)
+        if lat is None or lon is None:
+            return
+        self._points[user_id] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), set()).add(user_id)
+        if user_id >= len(self._coords):
+            # Grow geometrically so registrations stay amortized O(1)
+            grown = np.full((max(user_id + 1, 2 * len(self._coords)), 2), np.nan)
+            grown[: len(self._coords)] = self._coords
+            self._coords = grown
+        self._coords[user_id] = (lat, lon)
+
+    def upsert(self, user_id: int, lat: Optional[float], lon: Optional[float]) -> None:
+        with self._lock:
+            self._upsert(user_id, lat, lon)
+            self._changes.record(lambda: self._upsert(user_id, lat, lon))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._discard(user_id)
+            self._changes.record(lambda: self._discard(user_id))
+
+    def rebuild(self, load: Callable[[], Iterable[Row]]) -> None:
+        """Replace the contents with ``load()``'s rows, keeping writes made while it runs."""
+        self._changes.rebuild(lambda: self._build(load()), self._swap)
+
+    def _build(self, rows: Iterable[Row]):
+        cells: Dict[Cell, Set[int]] = {}
+        points: Dict[int, Tuple[float, float]] = {}
+        for user_id, lat, lon in rows:
+            if lat is None or lon is None:
+                continue
+            points[user_id] = (lat, lon)
+            cells.setdefault(self._cell(lat, lon), set()).add(user_id)
+        coords = np.full((max(points, default=-1) + 1, 2), np.nan)
+        if points:
+            coords[np.fromiter(points, dtype=np.int64, count=len(points))] = list(points.values())
+        return cells, points, coords
+
+    def _swap(self, built) -> None:
+        self._cells, self._points, self._coords = built
+
+    def position(self, user_id: int) -> Optional[Tuple[float, float]]:
+        return self._points.get(user_id)
+
+    def coordinates(self, user_ids: np.ndarray) -> np.ndarray:
+        """(lat, lon) rows for ``user_ids``, NaN for users without a position."""
+        found = np.full((user_ids.size, 2), np.nan)
+        with self._lock:
+            inside = user_ids < len(self._coords)
+            found[inside] = self._coords[user_ids[inside]]
+        return found
+
+    def _ring_lower_bound(self, lat: float, ring: int) -> float:
+        """Smallest possible distance (km) from the query to any cell in ``ring``."""
+        if ring <= 1:
+            return 0.0
+        gap = math.radians((ring - 1) * self.cell_deg)
+        # Cells with a row offset of ``ring`` differ in latitude by at least ``gap``
+        lat_bound = gap * EARTH_RADIUS_KM
+        # Cells with a column offset of ``ring`` differ in longitude by at least ``gap``;
+        # hav(d) >= cos(lat1) * cos(lat2) * hav(dlon) with lat2 bounded by the ring extent.
+        far_lat = min(90.0, abs(lat) + (ring + 1) * self.cell_deg)
+        scale = math.cos(math.radians(lat)) * math.cos(math.radians(far_lat))
+        hav = scale * math.sin(min(gap, math.pi) / 2) ** 2
+        lon_bound = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(max(0.0, hav))))
+        return min(lat_bound, lon_bound)
+
+    def _ring_cells(self, row: int, col: int, ring: int) -> List[Cell]:
+        if ring == 0:
+            return [(row, col)]
+        cells = []
+        for d_row in range(-ring, ring + 1):
+            r = row + d_row
+            if r < 0 or r >= self.rows:
+                continue
+            if abs(d_row) == ring:
+                offsets = range(-ring, ring + 1)
+            else:
+                offsets = (-ring, ring)
+            for d_col in offsets:
+                cells.append((r, (col + d_col) % self.cols))
+        return cells
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        *,
+        k: int,
+        radius_km: Optional[float] = None,
+        exclude: Iterable[int] = (),
+    ) -> List[Tuple[float, int]]:
+        """Return up to ``k`` ``(distance_km, user_id)`` pairs, closest first."""
+        excluded = set(exclude)
+        best: List[Tuple[float, int]] = []  # max-heap via negated distances
+        visited: Set[Cell] = set()
+        max_ring = max(self.rows, self.cols // 2) + 1
+
+        def consider(cell: Cell) -> None:
+            for user_id in self._cells.get(cell, ()):
+                if user_id in excluded:
+                    continue
+                distance = _haversine(lat, lon, *self._points[user_id])
+                if radius_km is not None and distance > radius_km:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, user_id))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, user_id))
+
+        if k <= 0:
+            return []
+        with self._lock:
+            row, col = self._cell(lat, lon)
+            for ring in range(max_ring + 1):
+                bound = self._ring_lower_bound(lat, ring)
+                if radius_km is not None and bound > radius_km:
+                    break
+                if len(best) == k and bound > -best[0][0]:
+                    break
+                ring_cells = self._ring_cells(row, col, ring)
+                if len(ring_cells) > len(self._cells):
+                    # Sparse grid: cheaper to look at the occupied cells left than to walk empty ones
+                    for cell in list(self._cells):
+                        if cell not in visited:
+                            consider(cell)
+                    break
+                for cell in ring_cells:
+                    if cell in visited:
+                        continue
+                    visited.add(cell)
+                    consider(cell)
+        return sorted((-negated, user_id) for negated, user_id in best)
+
+
+user_locations = GeoGridIndex(cell_deg=settings.geo_index_cell_degrees)
+_refresh = RefreshGate()
+
+
+def rebuild(db: Session) -> None:
+    user_locations.rebuild(
+        lambda: db.query(User.id, User.latitude, User.longitude).filter(User.latitude.isnot(None)).all()
+    )
+    _refresh.mark_built()
+    logger.info(f"Geo index rebuilt with {len(user_locations)} located users")
+
+
+def ensure_fresh(db: Session) -> GeoGridIndex:
+    """Build the index on first use and periodically re-sync it.
+
+    Writes made by this process are applied incrementally; the periodic rebuild
+    picks up registrations and profile edits handled by other workers.
+    """
+    _refresh.refresh(settings.geo_index_refresh_seconds, lambda: rebuild(db))
+    return user_locations
+
+
+def track_user(user: User) -> None:
+    user_locations.upsert(user.id, user.latitude, user.longitude)
+
+
+def forget_user(user_id: int) -> None:
+    user_locations.remove(user_id)
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import SessionLocal
+from app.models.job import Job, JobStatus
+from app.models.user import User, UserRole
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Candidates looked at per claim; others may win some of them
+CLAIM_BATCH = 8
+# Finished jobs are purged at most this often (by idle workers)
+PURGE_INTERVAL_SECONDS = 3600
+# Periodic jobs are topped up at most this often (by idle workers)
+SCHEDULE_INTERVAL_SECONDS = 60
+
+Handler = Callable[[Session, dict], None]
+
+_handlers: Dict[str, Handler] = {}
+_periodic: Dict[str, int] = {}
+_wakeup = threading.Event()
+_stopping = threading.Event()
+_workers: List[threading.Thread] = []
+_last_purged: Optional[float] = None
+_last_scheduled: Optional[float] = None
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register ``func(db, payload)`` to run jobs of ``kind``.
+
+    Jobs run at least once: a worker that stops mid-job leaves it to be
+    retried after the visibility timeout, so handlers must be idempotent.
+    Raising marks the attempt failed; it is retried with backoff.
+    """
+
+    def register(func: Handler) -> Handler:
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+def every(kind: str, seconds: int) -> None:
+    """Run ``kind`` (with an empty payload) about every ``seconds``.
+
+    Idle workers queue the next run whenever none is queued or running, so
+    there is one at a time however many workers or processes there are.
+    """
+    _periodic[kind] = seconds
+
+
+def enqueue(db: Session, kind: str, payload: dict, *, owner_id: Optional[int] = None, delay_seconds: int = 0) -> Job:
+    """Add a job to ``db``'s transaction: it is queued when the caller commits, or not at all."""
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        owner_id=owner_id,
+        max_attempts=settings.job_max_attempts,
+        run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.add(job)
+    db.info["jobs_enqueued"] = True
+    return job
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session: Session) -> None:
+    # Local workers start on new jobs right away instead of at their next poll
+    if session.info.pop("jobs_enqueued", False):
+        _wakeup.set()
+
+
+def _claim(db: Session, worker_id: str, kinds: Optional[Sequence[str]]) -> Optional[Job]:
+    now = datetime.utcnow()
+    # Queued jobs that are due, and running ones whose worker let the claim lapse
+    query = db.query(Job.id, Job.status, Job.run_after).filter(
+        Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]), Job.run_after <= now
+    )
+    if kinds:
+        query = query.filter(Job.kind.in_(kinds))
+    for job_id, seen_status, seen_run_after in query.order_by(Job.run_after, Job.id).limit(CLAIM_BATCH).all():
+        # Compare-and-set: only one worker moves a job off the state it saw
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == job_id, Job.status == seen_status, Job.run_after == seen_run_after)
+            .update(
+                {
+                    Job.status: JobStatus.RUNNING,
+                    Job.locked_by: worker_id,
+                    Job.attempts: Job.attempts + 1,
+                    Job.run_after: now + timedelta(seconds=settings.job_visibility_timeout_seconds),
+                    Job.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def _finish(db: Session, job: Job, worker_id: str, error: Optional[str]) -> JobStatus:
+    now = datetime.utcnow()
+    if error is None:
+        values = {Job.status: JobStatus.DONE, Job.finished_at: now, Job.last_error: None}
+    elif job.attempts < job.max_attempts:
+        backoff = settings.job_retry_base_seconds * 2 ** (job.attempts - 1)
+        values = {Job.status: JobStatus.QUEUED, Job.run_after: now + timedelta(seconds=backoff), Job.last_error: error}
+    else:
+        values = {Job.status: JobStatus.FAILED, Job.finished_at: now, Job.last_error: error}
+    values.update({Job.locked_by: None, Job.updated_at: now})
+    # A worker whose claim lapsed must not overwrite the one now running the job
+    updated = (
+        db.query(Job)
+        .filter(Job.id == job.id, Job.status == JobStatus.RUNNING, Job.locked_by == worker_id)
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    if not updated:
+        logger.warning(f"Job {job.id} ({job.kind}) outlived its visibility timeout; result discarded")
+    return values[Job.status]
+
+
+def run_next(worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[JobStatus]:
+    """Claim and run one due job; returns how it ended, or None if nothing was due."""
+    with SessionLocal() as db:
+        job = _claim(db, worker_id, kinds)
+        if job is None:
+            return None
+        db.expunge(job)
+
+    error = None
+    func = _handlers.get(job.kind)
+    if func is None:
+        error = f"No handler for job kind '{job.kind}'"
+    else:
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                func(db, json.loads(job.payload))
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {getattr(exc, 'detail', None) or exc}"
+            logger.exception(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}")
+        else:
+            logger.info(f"Job {job.id} ({job.kind}) done in {time.perf_counter() - started:.2f} s")
+
+    with SessionLocal() as db:
+        return _finish(db, job, worker_id, error)
+
+
+def drain(*, worker_id: Optional[str] = None, kinds: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> Dict[str, int]:
+    """Run due jobs until none are left (or ``limit`` have run); returns how many ended each way."""
+    worker_id = worker_id or _worker_name("drain")
+    outcomes: Dict[str, int] = {}
+    while limit is None or sum(outcomes.values()) < limit:
+        outcome = run_next(worker_id, kinds)
+        if outcome is None:
+            break
+        outcomes[outcome.value] = outcomes.get(outcome.value, 0) + 1
+    return outcomes
+
+
+def _worker_name(suffix: str) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{suffix}"
+
+
+def _work(worker_id: str) -> None:
+    while not _stopping.is_set():
+        try:
+            outcome = run_next(worker_id)
+        except SQLAlchemyError as exc:
+            logger.warning(f"Job worker {worker_id} could not reach the database: {exc}")
+            outcome = None
+        if outcome is None:
+            schedule_periodic()
+            purge_finished()
+            _wakeup.wait(settings.job_poll_seconds)
+            _wakeup.clear()
+
+
+def start_workers(count: Optional[int] = None) -> None:
+    """Start worker threads in this process (settings.job_workers by default)."""
+    count = settings.job_workers if count is None else count
+    _stopping.clear()
+    for number in range(count):
+        thread = threading.Thread(target=_work, args=(_worker_name(f"w{number}"),), name=f"job-worker-{number}", daemon=True)
+        thread.start()
+        _workers.append(thread)
+    if count:
+        logger.info(f"Started {count} job workers")
+
+
+def stop_workers(timeout: float = 10.0) -> None:
+    """Let running jobs finish (up to ``timeout``); unfinished ones are retried after their visibility timeout."""
+    _stopping.set()
+    _wakeup.set()
+    for thread in _workers:
+        thread.join(timeout)
+    _workers.clear()
+
+
+def schedule_periodic(*, force: bool = False) -> int:
+    """Queue the next run of each ``every`` kind that has none queued or running; returns how many."""
+    global _last_scheduled
+    now = time.monotonic()
+    if not _periodic or (not force and _last_scheduled is not None and now - _last_scheduled < SCHEDULE_INTERVAL_SECONDS):
+        return 0
+    _last_scheduled = now
+
+    with SessionLocal() as db:
+        try:
+            pending = {
+                kind
+                for (kind,) in db.query(Job.kind)
+                .filter(Job.kind.in_(list(_periodic)), Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+                .distinct()
+            }
+            due = [kind for kind in _periodic if kind not in pending]
+            for kind in due:
+                enqueue(db, kind, {}, delay_seconds=_periodic[kind])
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning(f"Failed to schedule periodic jobs: {exc}")
+            return 0
+    return len(due)
+
+
+def purge_finished(*, force: bool = False) -> int:
+    """Delete jobs that ended more than job_retention_hours ago."""
+    global _last_purged
+    now = time.monotonic()
+    if not force and _last_purged is not None and now - _last_purged < PURGE_INTERVAL_SECONDS:
+        return 0
+    _last_purged = now
+
+    cutoff = datetime.utcnow() - timedelta(hours=settings.job_retention_hours)
+    with SessionLocal() as db:
+        try:
+            purged = (
+                db.query(Job)
+                .filter(Job.status.in_([JobStatus.DONE, JobStatus.FAILED]), Job.finished_at < cutoff)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning(f"Failed to purge finished jobs: {exc}")
+            return 0
+    if purged:
+        logger.info(f"Purged {purged} finished jobs")
+    return purged
+
+
+def requeue_failed(db: Session, kinds: Optional[Sequence[str]] = None) -> int:
+    """Give failed jobs a fresh set of attempts."""
+    query = db.query(Job).filter(Job.status == JobStatus.FAILED)
+    if kinds:
+        query = query.filter(Job.kind.in_(kinds))
+    requeued = query.update(
+        {Job.status: JobStatus.QUEUED, Job.attempts: 0, Job.run_after: datetime.utcnow(), Job.finished_at: None},
+        synchronize_session=False,
+    )
+    db.commit()
+    return requeued
+
+
+def list_jobs(db: Session, *, user: User, limit: int = 20) -> List[Job]:
+    return db.query(Job).filter(Job.owner_id == user.id).order_by(Job.created_at.desc()).limit(limit).all()
+
+
+def get_job(db: Session, job_id: int, user: User) -> Job:
+    job = db.get(Job, job_id)
+    # Users see the jobs their requests queued; admins see all of them
+    if job is None or (job.owner_id != user.id and user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+def queue_stats(db: Session) -> dict:
+    counts: Dict[str, Dict[str, int]] = {}
+    for kind, job_status, count in db.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status):
+        counts.setdefault(kind, {})[job_status.value] = count
+    oldest = db.query(func.min(Job.run_after)).filter(Job.status == JobStatus.QUEUED, Job.run_after <= datetime.utcnow()).scalar()
+    totals: Dict[str, int] = {}
+    for by_status in counts.values():
+        for job_status, count in by_status.items():
+            totals[job_status] = totals.get(job_status, 0) + count
+    return {
+        "totals": totals,
+        "by_kind": counts,
+        "oldest_due_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0,
+        "workers": len(_workers),
+    }
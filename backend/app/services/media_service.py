@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi.staticfiles import StaticFiles
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Receive, Scope, Send
+
+from app.services import job_service
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+# ASGI extension for sendfile(2)-style transfers, used when the server offers it
+ZEROCOPY_SEND = "http.response.zerocopysend"
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Everything else may be cached but is revalidated with its ETag on each use
+REVALIDATE_CACHE = "no-cache"
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+# Requests that read a file's old path just before it changed may still sign it
+REMOVAL_GRACE_SECONDS = 60
+
+
+def _signature(path: str, expires: int, name: Optional[str] = None) -> str:
+    key = (settings.media_url_secret or settings.secret_key).encode()
+    message = f"{path}\n{expires}" if name is None else f"{path}\n{expires}\n{name}"
+    digest = hmac.new(key, message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_url(path: Optional[str], *, download_name: Optional[str] = None) -> Optional[str]:
+    """``path`` (e.g. "/videos/x.webm" or "videos/x.webm") with an expiring signature appended.
+
+    Hand these out only after checking the caller may see the file. The
+    expiry is rounded up to the next ttl window, so the link stays valid
+    for one to two windows. With ``download_name`` the file is sent as an
+    attachment under that name (stored files are named by hash or id).
+    """
+    if not path:
+        return path
+    ttl = settings.media_url_ttl_seconds
+    expires = (int(time.time()) // ttl + 2) * ttl
+    url = f"{quote(path)}?expires={expires}&sig={_signature(path.lstrip('/'), expires, download_name or None)}"
+    if download_name:
+        url += f"&name={quote(download_name, safe='')}"
+    return url
+
+
+def verify_signature(path: str, expires: Optional[str], signature: Optional[str], name: Optional[str] = None) -> bool:
+    """Whether ``signature`` is valid and unexpired for ``path`` (no leading slash, unquoted) and ``name``."""
+    if not expires or not expires.isdigit() or not signature or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(path, int(expires), name or None))
+
+
+def remove_later(db: Session, path: str) -> None:
+    """Delete the replaced media file at ``path`` (e.g. "videos/x.webm") once every link to it has expired.
+
+    Queued in the caller's transaction, to commit with the change that
+    stopped referencing it. ``sign_url`` links live up to two ttl windows.
+    """
+    job_service.enqueue(
+        db,
+        "media.remove",
+        {"path": path.lstrip("/")},
+        delay_seconds=2 * settings.media_url_ttl_seconds + REMOVAL_GRACE_SECONDS,
+    )
+
+
+@job_service.handler("media.remove")
+def _remove_file(db: Session, payload: dict) -> None:
+    directories = {"videos": settings.videos_dir, "recordings": settings.recordings_dir}
+    mount, _, name = payload["path"].partition("/")
+    if mount not in directories or not name or name != Path(name).name or name.startswith("."):
+        logger.warning(f"Refusing to remove media file {payload['path']!r}")
+        return
+    (Path(directories[mount]) / name).unlink(missing_ok=True)
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The single byte range ``header`` asks for, as inclusive (start, end), or None for the whole file.
+
+    Malformed and multi-range headers are ignored (the whole file is sent,
+    which the RFC allows and no media player minds). Raises
+    RangeNotSatisfiable when the range lies entirely past the end.
+    """
+    if not header:
+        return None
+    match = _RANGE.fullmatch(header.replace(" ", ""))
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        raise RangeNotSatisfiable()
+    if not first:
+        # "bytes=-N": the last N bytes
+        if int(last) == 0:
+            raise RangeNotSatisfiable()
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class MediaFileResponse(FileResponse):
+    """A file, or one byte range of it, sent without loading it into memory.
+
+    With the zero-copy ASGI extension the server transfers the bytes from
+    the file itself; otherwise they are read in 1 MiB chunks off the event
+    loop. Only the bytes of the range are ever read.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        stat_result: os.stat_result,
+        byte_range: Optional[Tuple[int, int]],
+        cache_control: str,
+        filename: Optional[str] = None,
+    ):
+        super().__init__(
+            path,
+            stat_result=stat_result,
+            headers={"accept-ranges": "bytes", "cache-control": cache_control},
+            filename=filename,
+        )
+        size = stat_result.st_size
+        self.start, end = byte_range if byte_range is not None else (0, size - 1)
+        self.length = end - self.start + 1
+        if byte_range is not None:
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {self.start}-{end}/{size}"
+            self.headers["content-length"] = str(self.length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self.length <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            file = await run_in_threadpool(open, self.path, "rb")
+            try:
+                if ZEROCOPY_SEND in scope.get("extensions", {}):
+                    await send({"type": ZEROCOPY_SEND, "file": file, "offset": self.start, "count": self.length, "more_body": False})
+                else:
+                    await self._send_chunks(file, send)
+            finally:
+                file.close()
+        if self.background is not None:
+            await self.background()
+
+    async def _send_chunks(self, file: BinaryIO, send: Send) -> None:
+        # The file object is this response's own, so seek once and read on (os.pread is POSIX-only)
+        await run_in_threadpool(file.seek, self.start)
+        remaining = self.length
+        while remaining > 0:
+            chunk = await run_in_threadpool(file.read, min(CHUNK_BYTES, remaining))
+            if not chunk:
+                # Truncated under us; the client sees a short body rather than a hang
+                break
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class MediaFiles(StaticFiles):
+    """StaticFiles for uploaded media: byte ranges, conditional requests and cache headers.
+
+    ``immutable`` matches paths (relative to the mount) whose names are
+    generated once per upload and never rewritten; those are cached for a
+    year without revalidation once they have been unchanged for
+    ``settle_seconds``. Other files are revalidated with their ETag. Hidden
+    files, such as in-progress uploads, are never served.
+
+    With ``signed_prefix`` every request needs a link from ``sign_url`` for
+    "<signed_prefix>/<path>": checking it is pure CPU, with no session or
+    database lookup, and such responses are only cached privately.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        immutable: Optional[str] = None,
+        settle_seconds: float = 0,
+        signed_prefix: Optional[str] = None,
+    ):
+        super().__init__(directory=directory)
+        self.immutable = re.compile(immutable) if immutable else None
+        self.settle_seconds = settle_seconds
+        self.signed_prefix = signed_prefix
+        self.root = os.path.realpath(directory)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.signed_prefix is not None:
+            query = QueryParams(scope["query_string"])
+            signed_path = f"{self.signed_prefix}/{path.replace(os.sep, '/')}"
+            if not verify_signature(signed_path, query.get("expires"), query.get("sig"), query.get("name")):
+                raise HTTPException(status_code=403, detail="Invalid or expired media link")
+        return await super().get_response(path, scope)
+
+    def lookup_path(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        if any(part.startswith(".") for part in path.split(os.sep)):
+            return "", None
+        return super().lookup_path(path)
+
+    def cache_control(self, full_path: str, stat_result: os.stat_result) -> str:
+        cache_control = REVALIDATE_CACHE
+        if self.immutable is not None and time.time() - stat_result.st_mtime >= self.settle_seconds:
+            relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+            if self.immutable.fullmatch(relative):
+                cache_control = IMMUTABLE_CACHE
+        if self.signed_prefix is not None:
+            # Shared caches must not hand access-controlled bytes to others
+            cache_control = cache_control.replace("public, ", "")
+            cache_control = f"private, {cache_control}"
+        return cache_control
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        cache_control = self.cache_control(str(full_path), stat_result)
+        filename = None
+        if self.signed_prefix is not None:
+            # Only signed links can name the download (the name is part of the signature)
+            filename = QueryParams(scope["query_string"]).get("name") or None
+        response = MediaFileResponse(
+            str(full_path), stat_result=stat_result, byte_range=None, cache_control=cache_control, filename=filename
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range not in (response.headers["etag"], response.headers["last-modified"]):
+            # The client's copy is stale: send the whole current file
+            return response
+        try:
+            byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={"content-range": f"bytes */{stat_result.st_size}", "accept-ranges": "bytes"},
+            )
+        if byte_range is None:
+            return response
+        return MediaFileResponse(
+            str(full_path), stat_result=stat_result, byte_range=byte_range, cache_control=cache_control, filename=filename
+        )
@@ -1,14 +1,16 @@
+import os
 import secrets
-import shutil
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
-from fastapi import HTTPException, UploadFile, status
+from fastapi import HTTPException, Request, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.meeting_document import MeetingDocument
-from app.models.meeting_recording import MeetingRecording
+from app.models.meeting_recording import MeetingRecording, RecordingStatus
+from app.services import blob_service, job_service, media_service, upload_service, webm_service
 from config.config import settings
 
 def _build_filename(connection_id: int) -> str:
@@ -17,30 +19,71 @@ def _build_filename(connection_id: int) -> str:
     return f"{timestamp}_{connection_id}_{token}.webm"
 
 
-def save_video_file(upload: UploadFile, *, connection_id: int) -> str:
-    content_type = (upload.content_type or "").lower()
-    if not content_type.startswith("video/webm"):
+def new_video_path(connection_id: int) -> Path:
+    return Path(settings.videos_dir) / _build_filename(connection_id)
+
+
+def video_path(file_path: str) -> Path:
+    # file_path is relative to the static mounts, e.g. "videos/<name>.webm"
+    return Path(settings.videos_dir) / Path(file_path).name
+
+
+def apply_video_info(record: MeetingRecording, info: Optional[webm_service.WebmInfo]) -> None:
+    if info is None:
+        return
+    record.duration_seconds = info.duration_seconds
+    record.size_bytes = info.size_bytes
+    record.width = info.width
+    record.height = info.height
+
+
+def ensure_video_type(content_type: str) -> None:
+    if not content_type.lower().startswith("video/webm"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid meeting recording format")
 
-    filename = _build_filename(connection_id)
-    destination = Path(settings.videos_dir) / filename
 
+async def receive_video_file(request: Request, *, connection_id: int) -> str:
+    """Stream the uploaded meeting recording straight into videos_dir."""
+
+    def destination_for(_filename: str, content_type: str) -> Path:
+        ensure_video_type(content_type)
+        return new_video_path(connection_id)
+
+    stored = await upload_service.receive_file(
+        request,
+        destination_for=destination_for,
+        max_bytes=settings.max_recording_upload_mb * 1024 * 1024,
+        failure_detail="Failed to store meeting recording",
+    )
+
+    # Return relative path so it can be served via StaticFiles (e.g., /videos/<filename>)
+    return f"videos/{stored.path.name}"
+
+
+def adopt_video_file(source: Path, *, connection_id: int) -> str:
+    """Rename a finished recording (on the videos_dir filesystem) into videos_dir; returns its relative path."""
+    filename = _build_filename(connection_id)
     try:
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        upload.file.seek(0)
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(upload.file, buffer)
+        os.replace(source, Path(settings.videos_dir) / filename)
     except OSError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store meeting recording") from exc
-
-    # Return relative path so it can be served via StaticFiles (e.g., /videos/<filename>)
     return f"videos/{filename}"
 
 
-def create_record(db: Session, *, connection_id: int, file_path: str) -> MeetingRecording:
-    record = MeetingRecording(connection_id=connection_id, file_path=file_path)
+def create_record(
+    db: Session,
+    *,
+    connection_id: int,
+    file_path: str,
+    recording_status: RecordingStatus = RecordingStatus.COMPLETE,
+    owner_id: Optional[int] = None,
+) -> MeetingRecording:
+    record = MeetingRecording(connection_id=connection_id, file_path=file_path, status=recording_status)
     try:
         db.add(record)
+        if recording_status == RecordingStatus.COMPLETE:
+            db.flush()
+            enqueue_indexing(db, record, owner_id=owner_id)
         db.commit()
         db.refresh(record)
         return record
@@ -49,6 +92,34 @@ def create_record(db: Session, *, connection_id: int, file_path: str) -> Meeting
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to save meeting record") from exc
 
 
+def enqueue_indexing(db: Session, record: MeetingRecording, *, owner_id: Optional[int] = None) -> None:
+    """Queue a complete recording for its seek index; committed with the caller's transaction."""
+    job_service.enqueue(db, "recording.index", {"recording_id": record.id}, owner_id=owner_id)
+
+
+@job_service.handler("recording.index")
+def _index_recording(db: Session, payload: dict) -> None:
+    record = db.get(MeetingRecording, payload["recording_id"])
+    if record is None or record.status != RecordingStatus.COMPLETE or record.duration_seconds is not None:
+        return
+    source = video_path(record.file_path)
+    # Indexed copies get a new name: links to the old one may be cached as immutable
+    destination = new_video_path(record.connection_id)
+    info = webm_service.make_seekable(source, destination)
+    if info is None:
+        return
+    if destination.exists():
+        # Links already handed out for the original stay valid until they expire
+        media_service.remove_later(db, record.file_path)
+        record.file_path = f"videos/{destination.name}"
+    apply_video_info(record, info)
+    try:
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        destination.unlink(missing_ok=True)
+        raise
+
 
 def list_recordings(db: Session, *, connection_id: int):
     return (
@@ -59,40 +130,37 @@ def list_recordings(db: Session, *, connection_id: int):
     )
 
 
-def save_document_file(upload: UploadFile, *, connection_id: int) -> tuple[str, str]:
-    # No restriction on content type, but safer to check/sanitize if needed
-    # We will just verify it's not empty
-    
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    token = secrets.token_hex(4)
-    # Sanitize filename (simple replacement of spaces)
-    safe_filename = upload.filename.replace(" ", "_").replace("/", "_")
-    storage_filename = f"{timestamp}_{connection_id}_{token}_{safe_filename}"
-    
-    # Save to 'resources' directory to be consistent with other static files
-    # or create a new 'documents' directory. Let's use 'resources'.
-    destination = Path(settings.resources_dir) / storage_filename
+async def receive_document_file(
+    request: Request, *, connection_id: int
+) -> tuple[str, upload_service.StoredUpload, str]:
+    """Stream the uploaded document into the blob store's staging area.
 
-    try:
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        upload.file.seek(0)
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(upload.file, buffer)
-    except OSError as exc:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store document") from exc
+    Returns the client's filename, the staged file (filed under its hash by
+    ``create_document_record``) and the file's content type.
+    """
 
-    # Relative path for serving
-    return upload.filename, f"resources/{storage_filename}"
+    def destination_for(filename: str, _content_type: str) -> Path:
+        return blob_service.staging_path(filename)
+
+    stored = await upload_service.receive_file(
+        request,
+        destination_for=destination_for,
+        max_bytes=settings.max_document_upload_mb * 1024 * 1024,
+        failure_detail="Failed to store document",
+    )
+    return stored.filename, stored, stored.content_type
 
 
 def create_document_record(
     db: Session, *, 
     connection_id: int, 
     uploader_id: int,
-    file_path: str,
+    stored: upload_service.StoredUpload,
     file_name: str, 
     file_type: str
 ) -> MeetingDocument:
+    # The same document shared on many connections is stored once
+    file_path = "resources/" + blob_service.adopt(db, stored, failure_detail="Failed to store document")
     doc = MeetingDocument(
         connection_id=connection_id, 
         uploader_id=uploader_id,
@@ -130,16 +198,18 @@ def delete_document(db: Session, *, document_id: int, user_id: int):
         print("DEBUG: Permission denied")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this document")
 
+    removal = None
     try:
-        # Try to delete the file - file_path is stored as "resources/filename" in the example
-        # But let's check what it actually is. In save_document_file it returns f"resources/{storage_filename}"
-        # So we need to strip "resources/" to get the path relative to settings.resources_dir
-        relative_name = doc.file_path.replace("resources/", "")
-        file_path = Path(settings.resources_dir) / relative_name
-        
-        if file_path.exists():
-            file_path.unlink()
-        
+        if blob_service.sha256_of(doc.file_path) is not None:
+            # Shared blobs are only deleted with their last reference
+            removal = blob_service.release(db, doc.file_path)
+        else:
+            # Documents stored before the blob store have a file of their own
+            relative_name = doc.file_path.replace("resources/", "")
+            file_path = Path(settings.resources_dir) / relative_name
+            if file_path.exists():
+                file_path.unlink()
+
         db.delete(doc)
         db.commit()
     except OSError:
@@ -148,6 +218,8 @@ def delete_document(db: Session, *, document_id: int, user_id: int):
         db.commit()
     except SQLAlchemyError as exc:
         db.rollback()
+        if removal is not None:
+            removal.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete document") from exc
-
-
+    if removal is not None:
+        removal.commit()
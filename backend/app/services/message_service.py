@@ -1,10 +1,33 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.message import Message
+from app.services import realtime_service
+
+DEFAULT_MESSAGE_PAGE = 50
+MAX_MESSAGE_PAGE = 200
+
+
+def serialize_message(message: Message) -> Dict:
+    return {
+        "id": message.id,
+        "session_id": message.session_id,
+        "connection_id": message.connection_id,
+        "sender_id": message.sender_id,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+    }
+
+
+def _publish(message: Message) -> None:
+    if message.connection_id:
+        room = realtime_service.connection_room(message.connection_id)
+    else:
+        room = realtime_service.session_room(message.session_id)
+    realtime_service.hub.publish(room, serialize_message(message))
 
 
 def create_message(
@@ -26,13 +49,29 @@ def create_message(
         db.add(message)
         db.commit()
         db.refresh(message)
-        return message
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save message") from exc
+    _publish(message)
+    return message
+
 
+def list_messages(
+    db: Session,
+    session_id: int = None,
+    connection_id: int = None,
+    *,
+    since_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = DEFAULT_MESSAGE_PAGE,
+) -> List[Message]:
+    """Return one page of a conversation in ascending id order.
 
-def list_messages(db: Session, session_id: int = None, connection_id: int = None) -> List[Message]:
+    ``since_id`` pages forward (incremental refresh), ``before_id`` pages backward
+    (scroll-back); with neither, the most recent page is returned. Each page is a
+    range scan on the (connection_id, id) / (session_id, id) indexes.
+    """
+    limit = max(1, min(limit, MAX_MESSAGE_PAGE))
     try:
         query = db.query(Message)
         if session_id:
@@ -41,8 +80,16 @@ def list_messages(db: Session, session_id: int = None, connection_id: int = None
             query = query.filter(Message.connection_id == connection_id)
         else:
             return []
-            
-        return query.order_by(Message.timestamp.asc()).all()
+
+        if before_id is not None:
+            query = query.filter(Message.id < before_id)
+        if since_id is not None:
+            query = query.filter(Message.id > since_id)
+            return query.order_by(Message.id.asc()).limit(limit).all()
+
+        page = query.order_by(Message.id.desc()).limit(limit).all()
+        page.reverse()
+        return page
     except SQLAlchemyError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to load messages") from exc
 
@@ -1,12 +1,14 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.user_notification import NotificationType, UserNotification
+from app.services import job_service, snapshot_service
 
 
 def list_notifications(db: Session, *, user: User, limit: int = 10) -> List[UserNotification]:
@@ -29,6 +31,7 @@ def mark_all_read(db: Session, *, user: User) -> None:
             .update({"read_at": datetime.utcnow()}, synchronize_session=False)
         )
         db.commit()
+        snapshot_service.notifications_changed(user.id)
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(
@@ -48,6 +51,7 @@ def mark_notification_read(db: Session, *, user: User, notification_id: int) ->
     try:
         db.add(notification)
         db.commit()
+        snapshot_service.notifications_changed(user.id)
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(
@@ -63,6 +67,7 @@ def create_notification(
     body: str,
     type: NotificationType = NotificationType.GENERAL,
     extra_data: Optional[str] = None,
+    dedupe_key: Optional[str] = None,
 ) -> UserNotification:
     notification = UserNotification(
         user_id=user_id,
@@ -70,11 +75,13 @@ def create_notification(
         body=body,
         type=type,
         extra_data=extra_data,
+        dedupe_key=dedupe_key,
     )
     try:
         db.add(notification)
         db.commit()
         db.refresh(notification)
+        snapshot_service.notifications_changed(user_id)
         return notification
     except SQLAlchemyError as exc:
         db.rollback()
@@ -86,3 +93,51 @@ def create_notification(
         ) from exc
 
 
+def enqueue_notification(
+    db: Session,
+    *,
+    user_id: int,
+    title: str,
+    body: str,
+    type: NotificationType = NotificationType.GENERAL,
+    extra_data: Optional[str] = None,
+) -> None:
+    """Queue a notification in the caller's transaction; a worker creates it once that commits."""
+    job_service.enqueue(
+        db,
+        "notification.create",
+        {
+            "user_id": user_id,
+            "title": title,
+            "body": body,
+            "type": type.value,
+            "extra_data": extra_data,
+            "dedupe_key": uuid.uuid4().hex,
+        },
+    )
+
+
+def _exists(db: Session, dedupe_key: str) -> bool:
+    return db.query(UserNotification.id).filter(UserNotification.dedupe_key == dedupe_key).first() is not None
+
+
+@job_service.handler("notification.create")
+def _create_queued_notification(db: Session, payload: dict) -> None:
+    # Jobs can be delivered more than once; the key makes the insert happen once
+    dedupe_key = payload.get("dedupe_key")
+    if dedupe_key is not None and _exists(db, dedupe_key):
+        return
+    try:
+        create_notification(
+            db,
+            user_id=payload["user_id"],
+            title=payload["title"],
+            body=payload["body"],
+            type=NotificationType(payload["type"]),
+            extra_data=payload["extra_data"],
+            dedupe_key=dedupe_key,
+        )
+    except HTTPException as exc:
+        # Lost the unique key to a concurrent delivery of the same job
+        if not isinstance(exc.__cause__, IntegrityError) or not _exists(db, dedupe_key):
+            raise
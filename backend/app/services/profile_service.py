@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.user_profile import ProfileVisibility, UserProfile
+from app.services import auth_service, autocomplete_service, geo_index_service, search_index_service, snapshot_service
 
 
 def _ensure_profile(db: Session, user: User) -> UserProfile:
@@ -50,6 +51,7 @@ def update_profile_details(
     longitude: Optional[float] = None,
 ) -> tuple[User, UserProfile]:
     profile = _ensure_profile(db, user)
+    previous_name = user.name
 
     if name:
         user.name = name.strip()
@@ -67,8 +69,13 @@ def update_profile_details(
         db.add(user)
         db.add(profile)
         db.commit()
+        auth_service.invalidate_user_cache(user.id)
         db.refresh(user)
         db.refresh(profile)
+        geo_index_service.track_user(user)
+        search_index_service.track_user(user)
+        autocomplete_service.track_user(user.name, previous_name)
+        snapshot_service.profile_changed(user.id)
         return user, profile
     except SQLAlchemyError as exc:
         db.rollback()
@@ -92,6 +99,7 @@ def update_privacy_settings(
     try:
         db.add(profile)
         db.commit()
+        auth_service.invalidate_user_cache(user.id)
         db.refresh(profile)
         return profile
     except SQLAlchemyError as exc:
@@ -120,6 +128,7 @@ def update_notification_settings(
     try:
         db.add(profile)
         db.commit()
+        auth_service.invalidate_user_cache(user.id)
         db.refresh(profile)
         return profile
     except SQLAlchemyError as exc:
@@ -141,6 +150,7 @@ def update_appearance(
     try:
         db.add(profile)
         db.commit()
+        auth_service.invalidate_user_cache(user.id)
         db.refresh(profile)
         return profile
     except SQLAlchemyError as exc:
@@ -162,6 +172,8 @@ def update_avatar(
     try:
         db.add(profile)
         db.commit()
+        auth_service.invalidate_user_cache(user.id)
+        snapshot_service.profile_changed(user.id)
         db.refresh(profile)
         return profile
     except SQLAlchemyError as exc:
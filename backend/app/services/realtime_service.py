@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from fastapi import WebSocket
+
+from app.services import broker_service, signaling_service
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def session_room(session_id: int) -> str:
+    return f"session:{session_id}"
+
+
+def connection_room(connection_id: int) -> str:
+    return f"connection:{connection_id}"
+
+
+class ChatSubscriber:
+    def __init__(self, websocket: WebSocket, stats: signaling_service.SignalingStats):
+        # The meeting sockets' bounded queue: a client that falls behind is
+        # disconnected and catches up through since_id when it reconnects
+        self.peer = signaling_service.PeerSocket(
+            websocket,
+            max_frames=settings.signaling_queue_max_frames,
+            policy=signaling_service.DISCONNECT,
+            stats=stats,
+        )
+        # Highest message id delivered through a resync; live pushes at or below
+        # it were already part of that history.
+        self.floor_id = 0
+        # While a resync is in flight, live pushes are parked here so they are
+        # delivered after the missed history and never twice.
+        self.pending: Optional[List[signaling_service.Frame]] = []
+
+    def push(self, frame: signaling_service.Frame) -> None:
+        if frame.message["message"]["id"] <= self.floor_id:
+            return
+        self.peer.enqueue(frame)
+
+
+class ChatHub:
+    """Chat sockets held by this worker.
+
+    New messages are queued to the local sockets of their room and handed to
+    the room broker, which forwards them to workers holding the room's other
+    sockets; with the ``memory`` broker there is a single worker.
+    """
+
+    def __init__(self, broker: broker_service.RoomBroker):
+        # Maps room key -> List[ChatSubscriber]
+        self.rooms: Dict[str, List[ChatSubscriber]] = {}
+        self.broker = broker
+        self.stats = signaling_service.SignalingStats()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Bind to the running loop and join the broker; called at startup, and by the first socket."""
+        self.loop = asyncio.get_running_loop()
+        await self.broker.start(self.deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+    async def subscribe(self, websocket: WebSocket, room: str) -> ChatSubscriber:
+        if self.loop is None:
+            await self.start()
+        subscriber = ChatSubscriber(websocket, self.stats)
+        if room not in self.rooms:
+            self.rooms[room] = []
+            await self.broker.subscribe(room)
+        self.rooms[room].append(subscriber)
+        return subscriber
+
+    async def unsubscribe(self, subscriber: ChatSubscriber, room: str) -> None:
+        subscriber.peer.close()
+        subscribers = self.rooms.get(room)
+        if not subscribers:
+            return
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+        if not subscribers:
+            del self.rooms[room]
+            await self.broker.unsubscribe(room)
+
+    def resync(self, subscriber: ChatSubscriber, missed: List[dict], *, more: bool = False) -> None:
+        """Queue the messages a reconnecting client missed, then release parked pushes.
+
+        ``more`` tells the client that ``missed`` is only the first page of
+        what it missed; it should reload the conversation over REST.
+        """
+        subscriber.peer.enqueue(signaling_service.encode({"type": "history", "messages": missed, "more": more}))
+        if missed:
+            subscriber.floor_id = missed[-1]["id"]
+        pending, subscriber.pending = subscriber.pending or [], None
+        for frame in pending:
+            subscriber.push(frame)
+
+    def send_local(self, room: str, payload: dict) -> None:
+        """Queue ``payload`` to this worker's sockets in ``room``; never waits on a socket."""
+        subscribers = self.rooms.get(room)
+        if not subscribers:
+            return
+        frame = signaling_service.encode(payload)
+        for subscriber in subscribers:
+            if subscriber.pending is not None:
+                subscriber.pending.append(frame)
+            else:
+                subscriber.push(frame)
+
+    async def _fanout(self, room: str, payload: dict) -> None:
+        self.send_local(room, payload)
+        await self.broker.publish(room, payload)
+
+    async def deliver(self, room: str, payload: dict) -> None:
+        """Messages published on other workers."""
+        self.send_local(room, payload)
+
+    def publish(self, room: str, message: dict) -> None:
+        """Push a new message to every socket subscribed to ``room``, on any worker.
+
+        Safe to call from the event loop or from a threadpool worker (sync endpoints).
+        """
+        if self.loop is None:
+            return
+        payload = {"type": "message", "message": message}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.loop.create_task(self._fanout(room, payload))
+        elif not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._fanout(room, payload), self.loop)
+
+
+hub = ChatHub(broker_service.create_broker(settings.chat_bus_path))
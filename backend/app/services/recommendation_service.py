@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import math
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import numpy as np
 from geopy.distance import geodesic
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from app.models.user import User
+from app.services import geo_index_service, scoring_service, skill_index_service
 
 LOCATION_MAP: Dict[str, Tuple[float, float]] = {
     "Bengaluru": (12.9716, 77.5946),
@@ -41,15 +44,18 @@ def calculate_similarity(user_location: Optional[str], session_location: Optiona
 def recommend_sessions(
     user_location: Optional[str],
     sessions: Iterable[Dict[str, str]],
+    *,
+    limit: Optional[int] = None,
 ) -> List[Dict[str, object]]:
-    recommendations: List[Dict[str, object]] = []
-    for session in sessions:
-        location = session.get("location")
-        score = calculate_similarity(user_location, location)
-        recommendations.append({**session, "similarity_score": score})
+    sessions = list(sessions)
+    # Similarity only depends on the location, so score each distinct one once
+    # and broadcast to every session with it.
+    locations, inverse = scoring_service.unique_inverse([session.get("location") for session in sessions])
+    location_scores = np.array([calculate_similarity(user_location, location) for location in locations], dtype=np.float64)
+    scores = location_scores[inverse] if sessions else np.empty(0)
 
-    recommendations.sort(key=lambda item: item["similarity_score"], reverse=True)
-    return recommendations
+    order = scoring_service.rank_scores(scores, limit)
+    return [{**sessions[position], "similarity_score": float(scores[position])} for position in order]
 
 
 def haversine_km(lat1: Optional[float], lon1: Optional[float], lat2: Optional[float], lon2: Optional[float]) -> Optional[float]:
@@ -63,7 +69,9 @@ def haversine_km(lat1: Optional[float], lon1: Optional[float], lat2: Optional[fl
     return round(6371 * c, 2)
 
 
-def _serialize_user_recommendation(user: User, distance_km: Optional[float]) -> Dict[str, object]:
+def _serialize_user_recommendation(
+    user: User, distance_km: Optional[float], avatar_url: Optional[str] = None
+) -> Dict[str, object]:
     return {
         "id": user.id,
         "name": user.name,
@@ -74,21 +82,92 @@ def _serialize_user_recommendation(user: User, distance_km: Optional[float]) ->
         "state": user.state,
         "latitude": user.latitude,
         "longitude": user.longitude,
-        "avatar_url": user.avatar_url,
+        "avatar_url": avatar_url,
         "distance_km": None if distance_km is None else round(distance_km, 2),
     }
 
 
+def _same_place(current_user: User, city: Optional[str], location: Optional[str]) -> bool:
+    return (
+        (bool(current_user.city) and bool(city) and current_user.city.strip().lower() == city.strip().lower())
+        or
+        (bool(current_user.location) and bool(location) and current_user.location.strip().lower() == location.strip().lower())
+    )
+
+
+def _collect_candidates(
+    db: Session,
+    current_user: User,
+    skill_matches: Dict[int, set],
+    *,
+    local_radius_km: float,
+    limit: int,
+) -> Tuple[Set[int], Set[int]]:
+    """Collect the only users that can reach the top ``limit``.
+
+    Anyone outside this set ranks below ``limit`` users already in it, so the
+    recommender never has to look at the rest of the user table. Also returns
+    the candidates without a usable distance that are in the same city, which
+    count as 0 km away.
+    """
+    index = geo_index_service.ensure_fresh(db)
+    has_coords = current_user.latitude is not None and current_user.longitude is not None
+
+    # Users sharing a skill rank first whatever their distance
+    candidates: Set[int] = set(skill_matches)
+    same_place: Set[int] = set()
+    unlocated = [user_id for user_id in candidates if not has_coords or index.position(user_id) is None]
+    if unlocated:
+        rows = db.query(User.id, User.city, User.location).filter(User.id.in_(unlocated)).all()
+        same_place.update(user_id for user_id, city, location in rows if _same_place(current_user, city, location))
+
+    if has_coords:
+        # Nearby users next, then the nearest ones anywhere
+        for radius in (local_radius_km, None):
+            for _, user_id in index.nearest(
+                current_user.latitude,
+                current_user.longitude,
+                k=limit,
+                radius_km=radius,
+                exclude=[current_user.id],
+            ):
+                candidates.add(user_id)
+
+    city = (current_user.city or "").strip().lower()
+    location = (current_user.location or "").strip().lower()
+    place_filters = []
+    if city:
+        place_filters.append(func.lower(User.city) == city)
+    if location:
+        place_filters.append(func.lower(User.location) == location)
+    if place_filters:
+        query = db.query(User.id).filter(User.id != current_user.id, or_(*place_filters))
+        if has_coords:
+            query = query.filter(User.latitude.is_(None))
+        for (user_id,) in query.order_by(User.id.asc()).limit(limit).all():
+            candidates.add(user_id)
+            same_place.add(user_id)
+
+    if len(candidates) < limit:
+        # Too few located users: fall back to anyone, as the full scan used to
+        for (user_id,) in (
+            db.query(User.id).filter(User.id != current_user.id).order_by(User.id.asc()).limit(limit).all()
+        ):
+            candidates.add(user_id)
+    return candidates, same_place
+
+
 def recommend_users_by_location(
     db: Session,
     current_user: User,
-    users: Iterable[User],
     user_skills: List[str] = [],
     *,
     local_radius_km: float = 50.0,
+    limit: int = 20,
 ) -> Dict[str, List[Dict[str, object]]]:
     from app.models.connection import Connection, ConnectionStatus
-    
+    from app.models.user_profile import UserProfile
+
     # Pre-fetch all connections for current user to avoid N+1
     connections = db.query(Connection).filter(
         (Connection.sender_id == current_user.id) | (Connection.receiver_id == current_user.id)
@@ -111,36 +190,51 @@ def recommend_users_by_location(
                 "id": conn.id
             }
 
-    scored_items: List[Dict[str, object]] = []
-    
     # Normalize current user skills for comparison
     my_skills = {s.lower() for s in user_skills}
 
-    for user in users:
-        if user.id == current_user.id:
-            continue
-            
-        # 1. Location Score
-        distance_km = haversine_km(current_user.latitude, current_user.longitude, user.latitude, user.longitude)
-        same_city = (
-            (bool(current_user.city) and bool(user.city) and current_user.city.strip().lower() == user.city.strip().lower())
-            or
-            (bool(current_user.location) and bool(user.location) and current_user.location.strip().lower() == user.location.strip().lower())
+    # Users sharing a skill come straight from the inverted index
+    skill_matches = skill_index_service.ensure_fresh(db).matches(my_skills, exclude=[current_user.id])
+
+    candidate_ids, same_place = _collect_candidates(
+        db, current_user, skill_matches, local_radius_km=local_radius_km, limit=limit
+    )
+
+    # Score every candidate in one vectorized pass over contiguous arrays
+    ids = np.array(sorted(candidate_ids), dtype=np.int64)
+    coords = geo_index_service.user_locations.coordinates(ids)
+    if current_user.latitude is not None and current_user.longitude is not None:
+        distances = np.round(
+            scoring_service.haversine_km_many(current_user.latitude, current_user.longitude, coords[:, 0], coords[:, 1]),
+            2,
         )
+    else:
+        distances = np.full(ids.size, np.nan)
+    if same_place:
+        distances[np.isnan(distances) & np.isin(ids, list(same_place))] = 0.0
+
+    shared_counts = skill_index_service.user_skills.shared_counts(ids, my_skills)
 
-        if distance_km is None and same_city:
-            distance_km = 0.0
-        
-        is_nearby = distance_km is not None and distance_km <= local_radius_km
-        
-        # 2. Skill Score
-        # Assume user.skills is loaded.
-        target_skills = {s.name.lower() for s in user.skills}
-        shared_skills = my_skills.intersection(target_skills)
-        skill_match_count = len(shared_skills)
-
-        # 3. Connection Info
-        serialized = _serialize_user_recommendation(user, distance_km)
+    order = scoring_service.rank_users(distances, shared_counts, local_radius_km=local_radius_km, k=limit)
+    top_ids = [int(ids[position]) for position in order]
+    top_distances = {int(ids[position]): distances[position] for position in order}
+    users: Dict[int, User] = {}
+    avatars: Dict[int, Optional[str]] = {}
+    if top_ids:
+        users = {user.id: user for user in db.query(User).filter(User.id.in_(top_ids)).all()}
+        # One query for every avatar rather than a lazy profile load per user
+        avatars = dict(
+            db.query(UserProfile.user_id, UserProfile.avatar_url).filter(UserProfile.user_id.in_(top_ids)).all()
+        )
+
+    final_list: List[Dict[str, object]] = []
+    for user_id in top_ids:
+        user = users.get(user_id)
+        if user is None:
+            continue
+        distance_km = None if np.isnan(top_distances[user_id]) else float(top_distances[user_id])
+
+        serialized = _serialize_user_recommendation(user, distance_km, avatars.get(user.id))
         conn_info = conn_map.get(user.id)
         if conn_info:
             serialized["connection"] = {
@@ -150,39 +244,14 @@ def recommend_users_by_location(
             }
         else:
             serialized["connection"] = None
-            
+
+        shared_skills = skill_matches.get(user.id, set())
         serialized["skill_matches"] = list(shared_skills)
-        serialized["shared_count"] = skill_match_count
-
-        # Sorting tuple: 
-        # 1. (Primary) Have Shared Skill AND Is Nearby
-        # 2. (Secondary) Skill Match Count (High to Low)
-        # 3. (Tertiary) Is Nearby (True to False)
-        # 4. (Quaternary) Distance (Low to High)
-        
-        priority_group = 0
-        if skill_match_count > 0 and is_nearby:
-            priority_group = 3 # Highest
-        elif skill_match_count > 0:
-            priority_group = 2
-        elif is_nearby:
-            priority_group = 1
-        
-        # Store for sorting
-        scored_items.append({
-            "data": serialized,
-            "sort_key": (priority_group, skill_match_count, -(distance_km if distance_km is not None else 99999))
-        })
-
-    # Sort descending based on our tuple key
-    scored_items.sort(key=lambda x: x["sort_key"], reverse=True)
-    
-    # Extract sorted data
-    final_list = [item["data"] for item in scored_items]
+        serialized["shared_count"] = len(shared_skills)
+        final_list.append(serialized)
 
     return {
         "local": [x for x in final_list if (x["distance_km"] is not None and x["distance_km"] <= local_radius_km)], # Legacy support if needed
         "global": final_list, # We just use this sorted list as "combined" or main result
         "combined": final_list,
     }
-
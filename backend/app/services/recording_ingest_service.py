@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.meeting_recording import MeetingRecording, RecordingStatus
+from app.services import job_service, meeting_service
+from config.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Recordings being written, where flock is unavailable. Such platforms have no
+# cross-worker signaling broker either, so there is a single worker to track.
+_held: Set[str] = set()
+_held_lock = threading.Lock()
+
+
+def _hold(file: BinaryIO) -> bool:
+    """Take the single-writer lock on an open recording file; False if another writer has it."""
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    with _held_lock:
+        if file.name in _held:
+            return False
+        _held.add(file.name)
+        return True
+
+
+def _release(file: BinaryIO) -> None:
+    # flock locks go with the file descriptor
+    if fcntl is None:
+        with _held_lock:
+            _held.discard(file.name)
+
+
+class LiveRecording:
+    """The file of a recording in progress, appended to as MediaRecorder chunks arrive.
+
+    Blocking methods; the ingest socket calls them in the threadpool. Data is
+    fsynced every recording_ingest_fsync_seconds and on close, so a crash
+    loses at most that much of the meeting.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open("ab")
+        # One writer per recording, across workers too
+        if not _hold(self._file):
+            self._file.close()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Recording is already being streamed")
+        self.size = self._file.tell()
+        self._synced_at = time.monotonic()
+
+    def append(self, data: bytes) -> int:
+        self._file.write(data)
+        self.size += len(data)
+        if time.monotonic() - self._synced_at >= settings.recording_ingest_fsync_seconds:
+            self._sync()
+        return self.size
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced_at = time.monotonic()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self._sync()
+        finally:
+            self._file.close()
+            _release(self._file)
+
+
+def start_recording(db: Session, *, connection_id: int) -> MeetingRecording:
+    """Create an open recording with an empty file; it is listed while it grows."""
+    path = meeting_service.new_video_path(connection_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch(exist_ok=False)
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to start recording") from exc
+    return meeting_service.create_record(
+        db, connection_id=connection_id, file_path=f"videos/{path.name}", recording_status=RecordingStatus.RECORDING
+    )
+
+
+def resume_recording(db: Session, *, connection_id: int, recording_id: int) -> MeetingRecording:
+    """Reopen a recording whose socket dropped, so the page can send the chunks it still holds."""
+    record = db.get(MeetingRecording, recording_id)
+    if record is None or record.connection_id != connection_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not found")
+    if record.status != RecordingStatus.RECORDING:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Recording already complete")
+    return record
+
+
+def open_file(db: Session, record: MeetingRecording) -> LiveRecording:
+    try:
+        live = LiveRecording(meeting_service.video_path(record.file_path))
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to open recording") from exc
+    # The sweep may have closed the recording before we got the lock; it only
+    # does so while holding the lock, so this read settles it
+    db.refresh(record)
+    if record.status != RecordingStatus.RECORDING:
+        live.close()
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Recording already complete")
+    return live
+
+
+def _mark_complete(db: Session, record: MeetingRecording) -> bool:
+    """Compare-and-set the recording to complete and queue its indexing; False if it already was."""
+    closed = (
+        db.query(MeetingRecording)
+        .filter(MeetingRecording.id == record.id, MeetingRecording.status == RecordingStatus.RECORDING)
+        .update({MeetingRecording.status: RecordingStatus.COMPLETE}, synchronize_session=False)
+    )
+    if closed:
+        # The socket has closed its file, so a copy can be written with a seek index
+        meeting_service.enqueue_indexing(db, record)
+    return bool(closed)
+
+
+def complete_recording(db: Session, recording_id: int) -> MeetingRecording:
+    record = db.get(MeetingRecording, recording_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not found")
+    try:
+        _mark_complete(db, record)
+        db.commit()
+        db.refresh(record)
+        return record
+    except SQLAlchemyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to save meeting record") from exc
+
+
+job_service.every("recording.complete_abandoned", settings.recording_ingest_resume_seconds)
+
+
+@job_service.handler("recording.complete_abandoned")
+def complete_abandoned(db: Session, payload: Optional[dict] = None) -> int:
+    """Close recordings whose page never reconnected; what was received is kept.
+
+    Runs as a periodic job, every resume window. Each recording is closed
+    and committed while its file lock is held, so a socket resuming it
+    either keeps it open or sees it complete once it gets the lock.
+    """
+    cutoff = time.time() - settings.recording_ingest_resume_seconds
+    closed = 0
+    for record in db.query(MeetingRecording).filter(MeetingRecording.status == RecordingStatus.RECORDING).all():
+        path = meeting_service.video_path(record.file_path)
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            file = path.open("rb")
+        except FileNotFoundError:
+            file = None
+        # Skip files a socket still holds, even if nothing arrived lately
+        if file is not None and not _hold(file):
+            file.close()
+            continue
+        try:
+            closed += _mark_complete(db, record)
+            db.commit()
+        finally:
+            if file is not None:
+                file.close()
+                _release(file)
+    if closed:
+        logger.info(f"Closed {closed} abandoned live recordings")
+    return closed
+
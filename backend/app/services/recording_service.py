@@ -1,40 +1,72 @@
 import secrets
-import shutil
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
-from fastapi import HTTPException, UploadFile, status
+from fastapi import HTTPException, Request, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.models.session import Session as SessionModel
+from app.services import job_service, media_service, upload_service, webm_service
 from config.config import settings
 
 ALLOWED_RECORDING_TYPES = {"video/webm": ".webm", "video/mp4": ".mp4"}
 
 
-def save_recording_file(upload: UploadFile) -> Tuple[str, str]:
-    extension = ALLOWED_RECORDING_TYPES.get(upload.content_type or "")
+def _new_recording_path(extension: str) -> Path:
+    return Path(settings.recordings_dir) / f"rec_{secrets.token_hex(8)}{extension}"
+
+
+def _recording_destination(_filename: str, content_type: str) -> Path:
+    extension = ALLOWED_RECORDING_TYPES.get(content_type)
     if not extension:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported recording format")
+    return _new_recording_path(extension)
 
-    filename = f"rec_{secrets.token_hex(8)}{extension}"
-    destination = Path(settings.recordings_dir) / filename
-    try:
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        upload.file.seek(0)
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(upload.file, buffer)
-    except OSError as exc:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store recording") from exc
 
-    return filename, str(destination)
+async def receive_recording_file(request: Request) -> Tuple[str, upload_service.StoredUpload]:
+    """Stream the uploaded recording straight into recordings_dir; returns its filename."""
+    stored = await upload_service.receive_file(
+        request,
+        destination_for=_recording_destination,
+        max_bytes=settings.max_recording_upload_mb * 1024 * 1024,
+        failure_detail="Failed to store recording",
+    )
+    return stored.path.name, stored
 
 
-def attach_recording(db: Session, session, public_path: str) -> None:
+def attach_recording(db: Session, session, public_path: str, *, owner_id: Optional[int] = None) -> None:
     session.recording_url = public_path
+    if public_path.endswith(".webm"):
+        # Given a Duration and seek index off the request path
+        job_service.enqueue(
+            db, "session_recording.index", {"session_id": session.id, "recording_url": public_path}, owner_id=owner_id
+        )
     try:
         db.commit()
         db.refresh(session)
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to attach recording") from exc
+
+
+@job_service.handler("session_recording.index")
+def _index_recording(db: Session, payload: dict) -> None:
+    session = db.get(SessionModel, payload["session_id"])
+    # Skip recordings that have since been replaced
+    if session is None or session.recording_url != payload["recording_url"]:
+        return
+    source = Path(settings.recordings_dir) / Path(session.recording_url).name
+    # Indexed copies get a new name: links to the old one may be cached as immutable
+    destination = _new_recording_path(source.suffix)
+    if webm_service.make_seekable(source, destination) is None or not destination.exists():
+        return
+    # Links already handed out for the original stay valid until they expire
+    media_service.remove_later(db, f"recordings/{source.name}")
+    session.recording_url = f"/recordings/{destination.name}"
+    try:
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        destination.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,209 @@
+import logging
+import os
+import secrets
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.meeting_recording import MeetingRecording
+from app.models.recording_upload import RecordingUpload
+from app.models.user import User
+from app.services import job_service, meeting_service, upload_service
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# How often workers look for expired uploads
+COLLECT_INTERVAL_SECONDS = 600
+
+
+def _incoming_dir() -> Path:
+    # Inside videos_dir so finished uploads are renamed, not copied, into place
+    return Path(settings.videos_dir) / ".uploads"
+
+
+def part_path(upload: RecordingUpload) -> Path:
+    return _incoming_dir() / f"{upload.id}.part"
+
+
+def _max_bytes() -> int:
+    return settings.max_recording_upload_mb * 1024 * 1024
+
+
+def _conflict(upload: RecordingUpload, detail: str) -> HTTPException:
+    # The client resumes from these, as it would after a GET
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail,
+        headers={"Upload-Offset": str(upload.received_bytes), "Upload-Next-Chunk": str(upload.next_chunk)},
+    )
+
+
+def create_upload(
+    db: Session, *, connection_id: int, uploader: User, content_type: str, total_size: Optional[int]
+) -> RecordingUpload:
+    meeting_service.ensure_video_type(content_type)
+    if total_size is not None and total_size > _max_bytes():
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {settings.max_recording_upload_mb} MB upload limit",
+        )
+
+    upload = RecordingUpload(
+        id=secrets.token_hex(16),
+        connection_id=connection_id,
+        uploader_id=uploader.id,
+        content_type=content_type,
+        total_size=total_size,
+    )
+    try:
+        _incoming_dir().mkdir(parents=True, exist_ok=True)
+        part_path(upload).touch(exist_ok=False)
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to start upload") from exc
+    try:
+        db.add(upload)
+        db.commit()
+        db.refresh(upload)
+        return upload
+    except SQLAlchemyError as exc:
+        db.rollback()
+        part_path(upload).unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to start upload") from exc
+
+
+def get_upload(db: Session, upload_id: str, user: User) -> RecordingUpload:
+    upload = db.get(RecordingUpload, upload_id)
+    # Only the uploader can see or continue an upload
+    if upload is None or upload.uploader_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+async def receive_chunk(db: Session, upload: RecordingUpload, *, index: int, offset: int, request: Request) -> RecordingUpload:
+    """Write chunk ``index`` at ``offset``; chunks must arrive in order, at the received offset.
+
+    A chunk the server already has is acknowledged without rewriting it, so
+    a client unsure whether its last request landed can simply resend it.
+    Only the body is read on the event loop; database work runs in the
+    threadpool.
+    """
+    if index < upload.next_chunk and offset < upload.received_bytes:
+        return upload
+    if index != upload.next_chunk or offset != upload.received_bytes:
+        raise _conflict(upload, f"Expected chunk {upload.next_chunk} at offset {upload.received_bytes}")
+
+    written = await upload_service.receive_range(
+        request,
+        part_path(upload),
+        offset=offset,
+        max_bytes=upload.total_size if upload.total_size is not None else _max_bytes(),
+        failure_detail="Failed to store recording chunk",
+    )
+    return await run_in_threadpool(_advance, db, upload, index=index, offset=offset, written=written)
+
+
+def _advance(db: Session, upload: RecordingUpload, *, index: int, offset: int, written: int) -> RecordingUpload:
+    # Compare-and-set: a concurrent request for the same chunk may have won
+    advanced = (
+        db.query(RecordingUpload)
+        .filter(RecordingUpload.id == upload.id, RecordingUpload.received_bytes == offset)
+        .update(
+            {
+                RecordingUpload.received_bytes: offset + written,
+                RecordingUpload.next_chunk: index + 1,
+                RecordingUpload.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    try:
+        db.commit()
+        db.refresh(upload)
+    except SQLAlchemyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to update upload") from exc
+    if not advanced:
+        raise _conflict(upload, f"Expected chunk {upload.next_chunk} at offset {upload.received_bytes}")
+    return upload
+
+
+def finalize_upload(db: Session, upload: RecordingUpload) -> MeetingRecording:
+    if upload.received_bytes == 0:
+        raise _conflict(upload, "No data received")
+    if upload.total_size is not None and upload.received_bytes != upload.total_size:
+        raise _conflict(upload, f"Received {upload.received_bytes} of {upload.total_size} bytes")
+
+    path = part_path(upload)
+    try:
+        # Drop bytes past the acknowledged offset left by an interrupted chunk
+        with path.open("r+b") as part:
+            part.truncate(upload.received_bytes)
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store meeting recording") from exc
+    relative_path = meeting_service.adopt_video_file(path, connection_id=upload.connection_id)
+    # Committed with the record, so a failed finalize leaves the upload to retry
+    db.delete(upload)
+    try:
+        return meeting_service.create_record(
+            db, connection_id=upload.connection_id, file_path=relative_path, owner_id=upload.uploader_id
+        )
+    except HTTPException:
+        try:
+            os.replace(meeting_service.video_path(relative_path), path)
+        except OSError:
+            logger.exception(f"Failed to restore the part file of upload {upload.id}")
+        raise
+
+
+def abort_upload(db: Session, upload: RecordingUpload) -> None:
+    part_path(upload).unlink(missing_ok=True)
+    _delete(db, upload)
+
+
+def _delete(db: Session, upload: RecordingUpload) -> None:
+    try:
+        db.delete(upload)
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to update upload") from exc
+
+
+job_service.every("recording_uploads.collect", COLLECT_INTERVAL_SECONDS)
+
+
+@job_service.handler("recording_uploads.collect")
+def collect_expired(db: Session, payload: Optional[dict] = None) -> int:
+    """Discard uploads idle past recording_upload_expiry_hours, and part files nobody tracks."""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.recording_upload_expiry_hours)
+    expired = db.query(RecordingUpload).filter(RecordingUpload.updated_at < cutoff).all()
+    for upload in expired:
+        part_path(upload).unlink(missing_ok=True)
+        db.delete(upload)
+    try:
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        logger.warning(f"Failed to discard expired uploads: {exc}")
+        return 0
+
+    known = {upload_id for (upload_id,) in db.query(RecordingUpload.id).all()}
+    orphans = 0
+    cutoff_timestamp = time.time() - settings.recording_upload_expiry_hours * 3600
+    for path in _incoming_dir().glob("*.part"):
+        try:
+            if path.stem not in known and path.stat().st_mtime < cutoff_timestamp:
+                path.unlink()
+                orphans += 1
+        except OSError:
+            continue
+    if expired or orphans:
+        logger.info(f"Discarded {len(expired)} expired recording uploads and {orphans} orphaned part files")
+    return len(expired) + orphans
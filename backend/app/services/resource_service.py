@@ -1,37 +1,39 @@
-import secrets
-import shutil
 from pathlib import Path
-from typing import List, Tuple
+from typing import List
 
 from fastapi import HTTPException, UploadFile, status
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.resource import Resource
+from app.services import blob_service, upload_service
 from config.config import settings
 
 ALLOWED_RESOURCE_EXTENSIONS = {".pdf", ".ppt", ".pptx", ".png", ".jpg", ".jpeg"}
 
 
-def save_resource_file(upload: UploadFile) -> Tuple[str, str]:
+def save_resource_file(upload: UploadFile) -> upload_service.StoredUpload:
+    """Blocking: run it in the threadpool from async handlers.
+
+    The file is staged until ``create_resource`` files it in the blob store.
+    """
     extension = Path(upload.filename or "").suffix.lower()
     if extension not in ALLOWED_RESOURCE_EXTENSIONS:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported resource format")
 
-    filename = f"res_{secrets.token_hex(8)}{extension}"
-    destination = Path(settings.resources_dir) / filename
-    try:
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        upload.file.seek(0)
-        with destination.open("wb") as buffer:
-            shutil.copyfileobj(upload.file, buffer)
-    except OSError as exc:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to store resource") from exc
-
-    return filename, str(destination)
+    return upload_service.store_upload(
+        upload,
+        blob_service.staging_path(upload.filename),
+        max_bytes=settings.max_resource_upload_mb * 1024 * 1024,
+        failure_detail="Failed to store resource",
+    )
 
 
-def create_resource(db: Session, *, session_id: int, uploader_id: int, file_name: str, file_url: str) -> Resource:
+def create_resource(
+    db: Session, *, session_id: int, uploader_id: int, file_name: str, stored: upload_service.StoredUpload
+) -> Resource:
+    # Mentors re-upload the same decks to many sessions; they share one stored copy
+    file_url = "/resources/" + blob_service.adopt(db, stored, failure_detail="Failed to store resource")
     resource = Resource(
         session_id=session_id,
         uploader_id=uploader_id,
@@ -0,0 +1,95 @@
+"""Vectorized scoring for user and session recommendations.
+
+Candidates are gathered from contiguous NumPy arrays kept by the geo and skill
+indexes (coordinates, skill-membership bitsets) and scored in a single pass; the top K are selected with
+``argpartition`` so only K elements are ever fully sorted.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+MISSING_DISTANCE_KM = 99999.0
+
+# Bit widths used to pack the user ranking tuple into one int64 sort key
+_POSITION_BITS = 24
+_DISTANCE_BITS = 24
+_COUNT_BITS = 8
+
+
+def haversine_km_many(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, NaN where coordinates are missing."""
+    lat_rad = np.radians(lat)
+    lats_rad = np.radians(lats)
+    dlat = lats_rad - lat_rad
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_rad) * np.cos(lats_rad) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Number of set bits per row of a uint64 matrix."""
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1).sum(axis=1, dtype=np.int64)
+
+
+def top_k_desc(keys: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest keys, largest first. Keys must be unique."""
+    if k <= 0 or keys.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < keys.size:
+        candidates = np.argpartition(-keys, k - 1)[:k]
+    else:
+        candidates = np.arange(keys.size)
+    return candidates[np.argsort(-keys[candidates], kind="stable")]
+
+
+def rank_users(
+    distances_km: np.ndarray,
+    shared_counts: np.ndarray,
+    *,
+    local_radius_km: float,
+    k: int,
+) -> np.ndarray:
+    """Top-``k`` candidate indices ordered like the recommender's priority tuple.
+
+    Ordering: (shared skill and nearby) > shared skill > nearby > rest, then more
+    shared skills, then shorter distance, then earlier position in the input
+    (callers pass candidates sorted by user id). NaN distances count as unknown.
+    """
+    size = distances_km.size
+    known = ~np.isnan(distances_km)
+    nearby = known & (np.nan_to_num(distances_km, nan=np.inf) <= local_radius_km)
+    has_skill = shared_counts > 0
+    group = np.where(has_skill & nearby, 3, np.where(has_skill, 2, np.where(nearby, 1, 0))).astype(np.int64)
+
+    distance_centi = np.rint(np.where(known, distances_km, MISSING_DISTANCE_KM) * 100).astype(np.int64)
+    distance_centi = np.clip(distance_centi, 0, (1 << _DISTANCE_BITS) - 1)
+    counts = np.clip(shared_counts.astype(np.int64), 0, (1 << _COUNT_BITS) - 1)
+    position = (1 << _POSITION_BITS) - 1 - np.arange(size, dtype=np.int64)
+
+    keys = (
+        (group << (_COUNT_BITS + _DISTANCE_BITS + _POSITION_BITS))
+        | (counts << (_DISTANCE_BITS + _POSITION_BITS))
+        | (((1 << _DISTANCE_BITS) - 1 - distance_centi) << _POSITION_BITS)
+        | position
+    )
+    return top_k_desc(keys, k)
+
+
+def rank_scores(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """Indices ordered by descending score, ties kept in input order."""
+    size = scores.size
+    k = size if k is None else min(k, size)
+    scaled = np.rint(scores * 10000).astype(np.int64)
+    keys = (scaled << _POSITION_BITS) | ((1 << _POSITION_BITS) - 1 - np.arange(size, dtype=np.int64))
+    return top_k_desc(keys, k)
+
+
+def unique_inverse(values: List[Optional[str]]) -> tuple[List[Optional[str]], np.ndarray]:
+    """Distinct values (first-seen order) and, per input, the index of its distinct value."""
+    positions: Dict[Optional[str], int] = {}
+    inverse = np.fromiter(
+        (positions.setdefault(value, len(positions)) for value in values), dtype=np.int64, count=len(values)
+    )
+    return list(positions), inverse
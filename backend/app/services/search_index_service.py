@@ -0,0 +1,283 @@
+import bisect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.models.user_skill import UserSkill
+from app.services.cache_service import ChangeLog, RefreshGate
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+SKILLS = "skills"
+SESSIONS = "sessions"
+KINDS = (USERS, SKILLS, SESSIONS)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Term-frequency weight of a prefix expansion relative to an exact match
+PREFIX_WEIGHT = 0.7
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class BM25Index:
+    """Tokenized inverted index over one kind of document, ranked with BM25.
+
+    The last query term also matches indexed terms it is a prefix of, so
+    partially typed queries ("pyth") still find "python" like ``ILIKE`` did.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, Dict[str, int]] = {}
+        self._owners: Dict[int, Optional[int]] = {}
+        self._vocabulary: List[str] = []  # sorted, for prefix expansion
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _discard(self, doc_id: int) -> None:
+        terms = self._terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        self._owners.pop(doc_id, None)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[position]
+
+    def upsert(self, doc_id: int, text: str, owner_id: Optional[int] = None) -> None:
+        self._discard(doc_id)
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[doc_id] = count
+        self._terms[doc_id] = counts
+        self._lengths[doc_id] = len(tokens)
+        self._owners[doc_id] = owner_id
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: int) -> None:
+        self._discard(doc_id)
+
+    def owned_by(self, owner_id: int) -> List[int]:
+        return [doc_id for doc_id, owner in self._owners.items() if owner == owner_id]
+
+    def _expand(self, term: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> List[Tuple[float, int]]:
+        """All matching ``(score, doc_id)`` pairs, best first (ties by id)."""
+        terms = tokenize(query)
+        if not terms or not self._lengths:
+            return []
+        last = terms[-1]
+        query_terms = [(term, [term]) for term in dict.fromkeys(terms[:-1])]
+        if last not in terms[:-1]:
+            query_terms.append((last, self._expand(last) if len(last) >= 2 else [last]))
+
+        doc_count = len(self._lengths)
+        average_length = self._total_length / doc_count
+        scores: Dict[int, float] = {}
+        for query_term, alternatives in query_terms:
+            # A prefix and its expansions count as one term: idf from the documents
+            # matching any of them, best-weighted expansion per document
+            matches: Dict[int, float] = {}
+            for term in alternatives:
+                weight = 1.0 if term == query_term else PREFIX_WEIGHT
+                for doc_id, tf in self._postings.get(term, {}).items():
+                    matches[doc_id] = max(matches.get(doc_id, 0.0), weight * tf)
+            if not matches:
+                continue
+            idf = math.log(1 + (doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc_id, tf in matches.items():
+                norm = K1 * (1 - B + B * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        return sorted(((score, doc_id) for doc_id, score in scores.items()), key=lambda item: (-item[0], item[1]))
+
+    def documents(self) -> Iterable[Tuple[int, Dict[str, int], Optional[int]]]:
+        for doc_id, terms in self._terms.items():
+            yield doc_id, terms, self._owners.get(doc_id)
+
+
+class SearchIndex:
+    """One BM25 index per searchable kind (users, skills, sessions)."""
+
+    def __init__(self):
+        self.kinds: Dict[str, BM25Index] = {kind: BM25Index() for kind in KINDS}
+        self._lock = threading.Lock()
+        self._changes = ChangeLog(self._lock)
+
+    def upsert(self, kind: str, doc_id: int, text: str, owner_id: Optional[int] = None) -> None:
+        with self._lock:
+            self.kinds[kind].upsert(doc_id, text, owner_id)
+            self._changes.record(lambda: self.kinds[kind].upsert(doc_id, text, owner_id))
+
+    def remove(self, kind: str, doc_id: int) -> None:
+        with self._lock:
+            self.kinds[kind].remove(doc_id)
+            self._changes.record(lambda: self.kinds[kind].remove(doc_id))
+
+    def _remove_owner(self, owner_id: int) -> None:
+        self.kinds[USERS].remove(owner_id)
+        for kind in (SKILLS, SESSIONS):
+            for doc_id in self.kinds[kind].owned_by(owner_id):
+                self.kinds[kind].remove(doc_id)
+
+    def remove_owner(self, owner_id: int) -> None:
+        """Drop a deleted user together with the skills and sessions that cascade with them."""
+        with self._lock:
+            self._remove_owner(owner_id)
+            self._changes.record(lambda: self._remove_owner(owner_id))
+
+    def search(self, kind: str, query: str, *, offset: int, limit: int) -> Tuple[List[int], int]:
+        """One page of matching ids for ``kind`` and the total number of matches."""
+        with self._lock:
+            ranked = self.kinds[kind].search(query)
+        return [doc_id for _, doc_id in ranked[offset:offset + limit]], len(ranked)
+
+    def rebuild(self, load: Callable[[], Dict[str, BM25Index]]) -> None:
+        """Replace every kind's index with ``load()``'s, keeping writes made while it runs."""
+        self._changes.rebuild(load, self._swap)
+
+    def _swap(self, kinds: Dict[str, BM25Index]) -> None:
+        self.kinds = kinds
+
+
+search_index = SearchIndex()
+_refresh = RefreshGate()
+
+
+def _user_text(name: Optional[str], location: Optional[str]) -> str:
+    return f"{name or ''} {location or ''}"
+
+
+def _session_text(title: Optional[str], description: Optional[str]) -> str:
+    return f"{title or ''} {description or ''}"
+
+
+def build_from_db(db: Session) -> Dict[str, BM25Index]:
+    kinds = {kind: BM25Index() for kind in KINDS}
+    for user_id, name, location in db.query(User.id, User.name, User.location).yield_per(1000):
+        kinds[USERS].upsert(user_id, _user_text(name, location), user_id)
+    for skill_id, user_id, name in db.query(UserSkill.id, UserSkill.user_id, UserSkill.name).yield_per(1000):
+        kinds[SKILLS].upsert(skill_id, name, user_id)
+    for session_id, creator_id, title, description in db.query(
+        SessionModel.id, SessionModel.created_by, SessionModel.title, SessionModel.description
+    ).yield_per(1000):
+        kinds[SESSIONS].upsert(session_id, _session_text(title, description), creator_id)
+    return kinds
+
+
+def rebuild(db: Session) -> None:
+    search_index.rebuild(lambda: build_from_db(db))
+    _refresh.mark_built()
+    logger.info(
+        "Search index rebuilt: "
+        + ", ".join(f"{len(index)} {kind}" for kind, index in search_index.kinds.items())
+    )
+
+
+def save_snapshot(kinds: Dict[str, BM25Index], path: str) -> None:
+    """Write the index to ``path`` so workers can start without scanning the tables."""
+    payload = {
+        "built_at": time.time(),
+        "kinds": {
+            kind: [[doc_id, terms, owner] for doc_id, terms, owner in index.documents()]
+            for kind, index in kinds.items()
+        },
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: str) -> bool:
+    """Load a snapshot written by ``save_snapshot`` if it is younger than the refresh interval."""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return False
+    age = time.time() - payload.get("built_at", 0)
+    if age > settings.search_index_refresh_seconds:
+        return False
+
+    def load() -> Dict[str, BM25Index]:
+        kinds = {kind: BM25Index() for kind in KINDS}
+        for kind, documents in payload.get("kinds", {}).items():
+            for doc_id, terms, owner in documents:
+                # Re-expand the term counts; token order does not matter to BM25
+                kinds[kind].upsert(
+                    doc_id, " ".join(term for term, count in terms.items() for _ in range(count)), owner
+                )
+        return kinds
+
+    search_index.rebuild(load)
+    _refresh.mark_built(time.monotonic() - age)
+    logger.info(f"Search index loaded from snapshot {path}")
+    return True
+
+
+def warm(db: Session) -> None:
+    if not load_snapshot(settings.search_index_snapshot_path):
+        rebuild(db)
+
+
+def ensure_fresh(db: Session) -> SearchIndex:
+    """Build the index on first use and periodically re-sync it with other workers' writes."""
+    _refresh.refresh(settings.search_index_refresh_seconds, lambda: rebuild(db))
+    return search_index
+
+
+def track_user(user: User) -> None:
+    search_index.upsert(USERS, user.id, _user_text(user.name, user.location), user.id)
+
+
+def track_skill(skill: UserSkill) -> None:
+    search_index.upsert(SKILLS, skill.id, skill.name, skill.user_id)
+
+
+def forget_skill(skill_id: int) -> None:
+    search_index.remove(SKILLS, skill_id)
+
+
+def track_session(session: SessionModel) -> None:
+    search_index.upsert(SESSIONS, session.id, _session_text(session.title, session.description), session.created_by)
+
+
+def forget_user(user_id: int) -> None:
+    search_index.remove_owner(user_id)
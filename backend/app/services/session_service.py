@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.models.attendance import Attendance
 from app.models.session import Session as SessionModel
 from app.models.user import User
+from app.services import autocomplete_service, search_index_service, snapshot_service
 
 
 def _validate_session_payload(title: str, description: str, location: str) -> None:
@@ -46,6 +47,9 @@ def create_session(
         db.add(session)
         db.commit()
         db.refresh(session)
+        snapshot_service.sessions_changed(creator.id)
+        search_index_service.track_session(session)
+        autocomplete_service.track_session(session.title)
         return session
     except SQLAlchemyError as exc:
         db.rollback()
@@ -99,6 +103,8 @@ def join_session(db: Session, session: SessionModel, user: User) -> Attendance:
         db.add(attendance)
         db.commit()
         db.refresh(attendance)
+        snapshot_service.memberships_changed(user.id)
+        autocomplete_service.track_attendee(session.title)
         return attendance
     except SQLAlchemyError as exc:
         db.rollback()
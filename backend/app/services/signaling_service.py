@@ -0,0 +1,330 @@
+import asyncio
+import collections
+import json
+import logging
+import time
+from typing import Deque, Dict, List, NamedTuple, Optional, Union
+
+from fastapi import WebSocket, status
+
+from app.services import broker_service
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Slow consumer policies
+DISCONNECT = "disconnect"
+COALESCE = "coalesce"
+
+# A newer frame of these types from the same sender to the same target
+# supersedes a queued one, so it can replace it instead of queueing behind it.
+COALESCABLE_TYPES = {"join", "offer", "answer"}
+
+# Heartbeat frames between server and client; never relayed to the room
+PING = "ping"
+PONG = "pong"
+# Opaque frames are not parsed; a pong is recognised by how clients serialize it
+OPAQUE_PONG_PREFIX = '{"type":"pong"'
+
+# Relay modes a client can ask for in the handshake (``?relay=``)
+JSON_RELAY = "json"
+OPAQUE_RELAY = "opaque"
+
+# Text frames merged into one batch envelope at most
+MAX_BATCH_FRAMES = 64
+
+Payload = Union[dict, str, bytes]
+
+
+class Frame(NamedTuple):
+    """An outbound frame, encoded once and shared by every socket it is queued to.
+
+    ``message`` is the decoded form when the server has one (JSON relay, server
+    pings); opaque frames carry only their raw ``data``.
+    """
+
+    data: Union[str, bytes]
+    message: Optional[dict] = None
+
+
+def encode(payload: Payload) -> Frame:
+    if isinstance(payload, dict):
+        return Frame(json.dumps(payload, separators=(",", ":")), payload)
+    return Frame(payload)
+
+
+class SignalingStats:
+    def __init__(self):
+        self.frames_queued = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.frames_coalesced = 0
+        self.slow_peers_disconnected = 0
+        self.max_queue_depth = 0
+        self.frames_relayed_opaque = 0
+        self.batches_sent = 0
+        self.frames_batched = 0
+        self.pings_sent = 0
+        self.idle_peers_evicted = 0
+        self.rooms_swept = 0
+
+
+def _coalesce_key(frame: Frame):
+    message = frame.message
+    if message is None or message.get("type") not in COALESCABLE_TYPES:
+        return None
+    return message.get("type"), message.get("sender"), message.get("target")
+
+
+class PeerSocket:
+    """A meeting socket with a bounded outbound queue drained by its own writer task.
+
+    Relaying only enqueues, so one slow or half-dead client never stalls the
+    rest of its room, and its backlog can never grow past ``max_frames``.
+
+    With a ``batch_seconds`` window the writer waits that long after a frame
+    arrives and sends the text frames queued meanwhile (typically a burst of
+    ICE candidates) as one JSON array; only clients that asked for batching
+    get arrays.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        *,
+        max_frames: int,
+        policy: str,
+        stats: SignalingStats,
+        opaque: bool = False,
+        batch_seconds: float = 0.0,
+    ):
+        self.websocket = websocket
+        self.max_frames = max_frames
+        self.policy = policy
+        self.stats = stats
+        self.opaque = opaque
+        self.batch_seconds = batch_seconds
+        self.queue: Deque[Frame] = collections.deque()
+        self.closed = False
+        # Any frame from the client (a pong included) proves it is alive
+        self.last_seen = time.monotonic()
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._drain())
+
+    def enqueue(self, frame: Frame) -> None:
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_frames:
+            if self.policy != COALESCE:
+                self.stats.slow_peers_disconnected += 1
+                logger.warning("Disconnecting slow signaling peer")
+                self.close(status.WS_1013_TRY_AGAIN_LATER)
+                return
+            if not self._replace_superseded(frame):
+                self.queue.popleft()
+                self.stats.frames_dropped += 1
+        self.queue.append(frame)
+        self.stats.frames_queued += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self.queue))
+        self._ready.set()
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def _replace_superseded(self, frame: Frame) -> bool:
+        key = _coalesce_key(frame)
+        if key is None:
+            return False
+        for queued in self.queue:
+            if _coalesce_key(queued) == key:
+                self.queue.remove(queued)
+                self.stats.frames_coalesced += 1
+                return True
+        return False
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                if self.batch_seconds:
+                    await asyncio.sleep(self.batch_seconds)
+                    if self.closed:
+                        return
+                batch = self._take_batch()
+                if len(batch) > 1:
+                    await self._send("[" + ",".join(batch) + "]")
+                    self.stats.batches_sent += 1
+                    self.stats.frames_batched += len(batch)
+                else:
+                    await self._send(batch[0] if batch else self.queue.popleft().data)
+                self.stats.frames_sent += max(len(batch), 1)
+        except asyncio.CancelledError:
+            pass
+        except Exception as exc:
+            logger.warning(f"Signaling peer write failed: {exc}")
+            self.close(status.WS_1011_INTERNAL_ERROR)
+
+    def _take_batch(self) -> List[str]:
+        """Leading text frames of the queue when batching, else nothing; binary frames go alone."""
+        batch: List[str] = []
+        if not self.batch_seconds:
+            return batch
+        while self.queue and len(batch) < MAX_BATCH_FRAMES and isinstance(self.queue[0].data, str):
+            batch.append(self.queue.popleft().data)
+        return batch
+
+    async def _send(self, data: Union[str, bytes]) -> None:
+        send = self.websocket.send_text if isinstance(data, str) else self.websocket.send_bytes
+        await asyncio.wait_for(send(data), timeout=settings.signaling_send_timeout_seconds)
+
+    def close(self, code: int = status.WS_1000_NORMAL_CLOSURE) -> None:
+        """Stop writing; closing the socket ends the peer's receive loop, which disconnects it."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int) -> None:
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """Sockets of the meeting rooms held by this worker.
+
+    Messages are queued to the local sockets directly and handed to the room
+    broker, which forwards them to workers holding the room's other sockets.
+    """
+
+    def __init__(self, broker: broker_service.RoomBroker):
+        # Maps connection_id -> List[PeerSocket]
+        self.active_connections: Dict[str, List[PeerSocket]] = {}
+        self.broker = broker
+        self.stats = SignalingStats()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def connect(
+        self, websocket: WebSocket, connection_id: str, *, relay: str = JSON_RELAY, batch_ms: int = 0
+    ) -> PeerSocket:
+        """Accept a socket; ``relay`` and ``batch_ms`` are what the client negotiated.
+
+        Clients that send neither get the original behaviour: frames are parsed
+        as JSON and each relayed frame arrives on its own.
+        """
+        await websocket.accept()
+        await self.broker.start(self.deliver)
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+        peer = PeerSocket(
+            websocket,
+            max_frames=settings.signaling_queue_max_frames,
+            policy=settings.signaling_slow_peer_policy,
+            stats=self.stats,
+            opaque=relay == OPAQUE_RELAY,
+            batch_seconds=min(max(batch_ms, 0), settings.signaling_max_batch_ms) / 1000,
+        )
+        if connection_id not in self.active_connections:
+            self.active_connections[connection_id] = []
+            await self.broker.subscribe(connection_id)
+        self.active_connections[connection_id].append(peer)
+        return peer
+
+    async def disconnect(self, peer: PeerSocket, connection_id: str) -> None:
+        peer.close()
+        peers = self.active_connections.get(connection_id)
+        if peers is None:
+            return
+        if peer in peers:
+            peers.remove(peer)
+        if not peers:
+            del self.active_connections[connection_id]
+            await self.broker.unsubscribe(connection_id)
+
+    def send_local(self, frame: Frame, connection_id: str, sender: Optional[PeerSocket] = None) -> None:
+        for peer in self.active_connections.get(connection_id, []):
+            if peer is not sender:
+                peer.enqueue(frame)
+
+    async def receive(self, message: dict, connection_id: str, peer: PeerSocket) -> None:
+        peer.touch()
+        if message.get("type") in (PING, PONG):
+            return
+        await self.broadcast(message, connection_id, peer)
+
+    async def receive_opaque(self, data: Union[str, bytes], connection_id: str, peer: PeerSocket) -> None:
+        """Relay a frame from an opaque-mode client as-is: no JSON decode or re-encode."""
+        peer.touch()
+        if isinstance(data, str) and data.startswith(OPAQUE_PONG_PREFIX):
+            return
+        self.stats.frames_relayed_opaque += 1
+        await self.broadcast(data, connection_id, peer)
+
+    async def broadcast(self, payload: Payload, connection_id: str, sender: PeerSocket) -> None:
+        self.send_local(encode(payload), connection_id, sender)
+        await self.broker.publish(connection_id, payload)
+
+    async def deliver(self, connection_id: str, payload: Payload) -> None:
+        """Messages from peers on other workers."""
+        self.send_local(encode(payload), connection_id)
+
+    async def sweep(self) -> None:
+        """Ping quiet peers, evict the ones silent past the idle timeout, drop dead rooms.
+
+        Evicted peers are removed right away; a half-open socket might never
+        deliver the close that would end its receive loop.
+        """
+        now = time.monotonic()
+        for connection_id, peers in list(self.active_connections.items()):
+            for peer in list(peers):
+                idle = now - peer.last_seen
+                if peer.closed or idle > settings.signaling_idle_timeout_seconds:
+                    if not peer.closed:
+                        self.stats.idle_peers_evicted += 1
+                        peer.close(status.WS_1001_GOING_AWAY)
+                    await self.disconnect(peer, connection_id)
+                elif idle >= settings.signaling_heartbeat_interval_seconds:
+                    peer.enqueue(encode({"type": PING, "ts": int(time.time() * 1000)}))
+                    self.stats.pings_sent += 1
+            if connection_id in self.active_connections and not self.active_connections[connection_id]:
+                del self.active_connections[connection_id]
+                await self.broker.unsubscribe(connection_id)
+                self.stats.rooms_swept += 1
+
+    async def _sweep_forever(self) -> None:
+        while self.active_connections:
+            await asyncio.sleep(settings.signaling_heartbeat_interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.warning(f"Signaling sweep failed: {exc}")
+
+    def snapshot(self) -> Dict[str, int]:
+        depths = [len(peer.queue) for peers in self.active_connections.values() for peer in peers]
+        return {
+            "rooms": len(self.active_connections),
+            "peers": len(depths),
+            "queued_frames": sum(depths),
+            "deepest_queue": max(depths, default=0),
+            "max_queue_depth": self.stats.max_queue_depth,
+            "frames_queued": self.stats.frames_queued,
+            "frames_sent": self.stats.frames_sent,
+            "frames_dropped": self.stats.frames_dropped,
+            "frames_coalesced": self.stats.frames_coalesced,
+            "slow_peers_disconnected": self.stats.slow_peers_disconnected,
+            "pings_sent": self.stats.pings_sent,
+            "idle_peers_evicted": self.stats.idle_peers_evicted,
+            "rooms_swept": self.stats.rooms_swept,
+            "frames_relayed_opaque": self.stats.frames_relayed_opaque,
+            "batches_sent": self.stats.batches_sent,
+            "frames_batched": self.stats.frames_batched,
+        }
+
+
+manager = ConnectionManager(broker_service.create_broker())
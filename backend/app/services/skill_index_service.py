@@ -0,0 +1,158 @@
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.user_skill import UserSkill
+from app.services import scoring_service
+from app.services.cache_service import ChangeLog, RefreshGate
+from config.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower()
+
+
+class SkillIndex:
+    """Inverted index from lowercased skill name to the ids of users who have it.
+
+    Matching a user's skills against everyone else's is then one dict lookup
+    per skill of the requesting user, instead of loading ``user.skills`` for
+    every candidate. Scoring gets per-query bitsets over just the requesting
+    user's skills, built from sorted posting arrays that are kept between
+    requests (one int64 per user-skill pair queried).
+    """
+
+    def __init__(self):
+        self._users_by_skill: Dict[str, Set[int]] = {}
+        self._skills_by_user: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._changes = ChangeLog(self._lock)
+
+    def __len__(self) -> int:
+        return len(self._users_by_skill)
+
+    def _add(self, user_id: int, skill: str) -> None:
+        self._users_by_skill.setdefault(skill, set()).add(user_id)
+        self._skills_by_user.setdefault(user_id, set()).add(skill)
+        self._postings.pop(skill, None)
+
+    def add(self, user_id: int, name: str) -> None:
+        skill = _normalize(name)
+        with self._lock:
+            self._add(user_id, skill)
+            self._changes.record(lambda: self._add(user_id, skill))
+
+    def _discard(self, user_id: int, skill: str) -> None:
+        members = self._users_by_skill.get(skill)
+        if members is not None:
+            members.discard(user_id)
+            self._postings.pop(skill, None)
+            if not members:
+                del self._users_by_skill[skill]
+        owned = self._skills_by_user.get(user_id)
+        if owned is not None:
+            owned.discard(skill)
+            if not owned:
+                del self._skills_by_user[user_id]
+
+    def remove(self, user_id: int, name: str) -> None:
+        skill = _normalize(name)
+        with self._lock:
+            self._discard(user_id, skill)
+            self._changes.record(lambda: self._discard(user_id, skill))
+
+    def _remove_user(self, user_id: int) -> None:
+        for skill in list(self._skills_by_user.get(user_id, ())):
+            self._discard(user_id, skill)
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            self._remove_user(user_id)
+            self._changes.record(lambda: self._remove_user(user_id))
+
+    def rebuild(self, load: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        """Replace the contents with ``load()``'s (user id, skill name) rows, keeping writes made while it runs."""
+        self._changes.rebuild(lambda: self._build(load()), self._swap)
+
+    @staticmethod
+    def _build(rows: Iterable[Tuple[int, str]]):
+        users_by_skill: Dict[str, Set[int]] = {}
+        skills_by_user: Dict[int, Set[str]] = {}
+        for user_id, name in rows:
+            skill = _normalize(name)
+            users_by_skill.setdefault(skill, set()).add(user_id)
+            skills_by_user.setdefault(user_id, set()).add(skill)
+        return users_by_skill, skills_by_user
+
+    def _swap(self, built) -> None:
+        self._users_by_skill, self._skills_by_user = built
+        self._postings = {}
+
+    def matches(self, names: Iterable[str], *, exclude: Iterable[int] = ()) -> Dict[int, Set[str]]:
+        """Map each user sharing at least one of ``names`` to the shared (lowercased) skills."""
+        excluded = set(exclude)
+        found: Dict[int, Set[str]] = {}
+        with self._lock:
+            for skill in {_normalize(name) for name in names}:
+                for user_id in self._users_by_skill.get(skill, ()):
+                    if user_id not in excluded:
+                        found.setdefault(user_id, set()).add(skill)
+        return found
+
+    def _posting(self, skill: str) -> np.ndarray:
+        # Replaced, never modified, once built: callers may use it after releasing the lock
+        posting = self._postings.get(skill)
+        if posting is None:
+            members = self._users_by_skill.get(skill, ())
+            posting = np.sort(np.fromiter(members, dtype=np.int64, count=len(members)))
+            self._postings[skill] = posting
+        return posting
+
+    def skill_bitsets(self, user_ids: np.ndarray, names: Iterable[str]) -> np.ndarray:
+        """Rows of uint64 words per user id; bit ``i`` is set if it has the ``i``-th of sorted ``names``."""
+        skills = sorted({_normalize(name) for name in names})
+        with self._lock:
+            postings = [self._posting(skill) for skill in skills]
+        bits = np.zeros((user_ids.size, max(1, (len(skills) + 63) // 64)), dtype=np.uint64)
+        for position, posting in enumerate(postings):
+            has_skill = np.isin(user_ids, posting)
+            bits[has_skill, position // 64] |= np.uint64(1) << np.uint64(position % 64)
+        return bits
+
+    def shared_counts(self, user_ids: np.ndarray, names: Iterable[str]) -> np.ndarray:
+        """How many of ``names`` each of ``user_ids`` has."""
+        return scoring_service.popcount(self.skill_bitsets(user_ids, names))
+
+
+user_skills = SkillIndex()
+_refresh = RefreshGate()
+
+
+def rebuild(db: Session) -> None:
+    user_skills.rebuild(lambda: db.query(UserSkill.user_id, UserSkill.name).all())
+    _refresh.mark_built()
+    logger.info(f"Skill index rebuilt with {len(user_skills)} distinct skills")
+
+
+def ensure_fresh(db: Session) -> SkillIndex:
+    """Build the index on first use and periodically re-sync it with other workers' writes."""
+    _refresh.refresh(settings.skill_index_refresh_seconds, lambda: rebuild(db))
+    return user_skills
+
+
+def track_skill(skill: UserSkill) -> None:
+    user_skills.add(skill.user_id, skill.name)
+
+
+def forget_skill(skill: UserSkill) -> None:
+    user_skills.remove(skill.user_id, skill.name)
+
+
+def forget_user(user_id: int) -> None:
+    user_skills.remove_user(user_id)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.user_skill import UserSkill
+from app.services import autocomplete_service, search_index_service, skill_index_service, snapshot_service
 
 
 def list_skills(db: Session, *, user: User) -> List[UserSkill]:
@@ -43,6 +44,10 @@ def add_skill(db: Session, *, user: User, name: str, level: Optional[str] = None
         db.add(skill)
         db.commit()
         db.refresh(skill)
+        skill_index_service.track_skill(skill)
+        search_index_service.track_skill(skill)
+        autocomplete_service.track_skill(skill.name)
+        snapshot_service.skills_changed(user.id)
         return skill
     except SQLAlchemyError as exc:
         db.rollback()
@@ -63,6 +68,10 @@ def remove_skill(db: Session, *, user: User, skill_id: int) -> None:
     try:
         db.delete(skill)
         db.commit()
+        skill_index_service.forget_skill(skill)
+        search_index_service.forget_skill(skill_id)
+        autocomplete_service.forget_skill(skill.name)
+        snapshot_service.skills_changed(user.id)
     except SQLAlchemyError as exc:
         db.rollback()
         raise HTTPException(
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Iterable, Optional
+
+from app.services.cache_service import TTLCache
+from config.config import settings
+
+# Sections of the dashboard overview cached per user
+USER = "user"
+SKILLS = "skills"
+RECOMMENDATIONS = "recommendations"
+USERS_NEAR_YOU = "users_near_you"
+TRENDING_SKILLS = "trending_skills"
+UPCOMING_SESSIONS = "upcoming_sessions"
+COMMUNITIES = "communities"
+NOTIFICATIONS = "notifications"
+FEED = "feed"
+STATS = "stats"
+
+# Shared by every user: the session catalog the session-derived sections are built from
+CATALOG = "catalog"
+
+SECTIONS = (
+    USER,
+    SKILLS,
+    RECOMMENDATIONS,
+    USERS_NEAR_YOU,
+    TRENDING_SKILLS,
+    UPCOMING_SESSIONS,
+    COMMUNITIES,
+    NOTIFICATIONS,
+    FEED,
+    STATS,
+)
+
+
+class SnapshotStore:
+    """Per-user dashboard sections, invalidated section by section.
+
+    Entries are keyed ``(user_id, section)``; shared entries use ``user_id=None``.
+    Writes in this process invalidate exactly the sections they affect, and the
+    TTL bounds how stale a section can get from writes made by other workers
+    (or from other users' changes, e.g. their skills in ``users_near_you``).
+    """
+
+    def __init__(self, *, max_users: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries=max_users * (len(SECTIONS) + 1), ttl_seconds=ttl_seconds)
+
+    def get_or_build(self, user_id: Optional[int], section: str, build: Callable[[], Any]) -> Any:
+        value = self._cache.get((user_id, section))
+        if value is None:
+            value = build()
+            self._cache.set((user_id, section), value)
+        return value
+
+    def invalidate(self, user_id: Optional[int], *sections: str) -> None:
+        for section in sections:
+            self._cache.pop((user_id, section))
+
+    def invalidate_everyone(self, *sections: str) -> None:
+        dropped = set(sections)
+        self._cache.discard_where(lambda key, _: key[1] in dropped)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+snapshots = SnapshotStore(
+    max_users=settings.dashboard_snapshot_max_users,
+    ttl_seconds=settings.dashboard_snapshot_ttl_seconds,
+)
+
+
+def sessions_changed(creator_id: Optional[int] = None) -> None:
+    """A session was created: refresh the catalog and everything derived from it."""
+    snapshots.invalidate_everyone(CATALOG, RECOMMENDATIONS, UPCOMING_SESSIONS, TRENDING_SKILLS, SKILLS, STATS)
+    if creator_id is not None:
+        memberships_changed(creator_id)
+
+
+def memberships_changed(user_id: int) -> None:
+    """The user created or joined a session."""
+    snapshots.invalidate(user_id, COMMUNITIES, FEED, STATS)
+
+
+def notifications_changed(user_id: int) -> None:
+    snapshots.invalidate(user_id, NOTIFICATIONS)
+
+
+def skills_changed(user_id: int) -> None:
+    snapshots.invalidate(user_id, USER, SKILLS, TRENDING_SKILLS, USERS_NEAR_YOU, STATS)
+
+
+def profile_changed(user_id: int) -> None:
+    snapshots.invalidate(user_id, USER, RECOMMENDATIONS, USERS_NEAR_YOU, FEED)
+
+
+def connections_changed(user_ids: Iterable[int]) -> None:
+    for user_id in user_ids:
+        snapshots.invalidate(user_id, USERS_NEAR_YOU)
+
+
+def forget_user(user_id: int) -> None:
+    snapshots.invalidate(user_id, *SECTIONS)
@@ -0,0 +1,288 @@
+import hashlib
+import logging
+import os
+import secrets
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 1024 * 1024
+# Boundaries, part headers and small form fields around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Documents the body of endpoints that parse their multipart upload themselves
+FILE_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+class StoredUpload:
+    """Where an upload landed, with the size and SHA-256 measured while writing it."""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+class ReceivedFile(StoredUpload):
+    """A file streamed out of a multipart request, with the name and type the client sent."""
+
+    def __init__(self, filename: str, content_type: str, stored: StoredUpload):
+        super().__init__(stored.path, stored.size, stored.sha256)
+        self.filename = filename
+        self.content_type = content_type
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit",
+    )
+
+
+def copy_stream(source: BinaryIO, destination: Path, *, max_bytes: int, failure_detail: str) -> StoredUpload:
+    """Copy ``source`` to ``destination`` in chunks, hashing and counting as it goes.
+
+    Blocking: call it from a worker thread (``run_in_threadpool``), never on
+    the event loop. Stops as soon as ``max_bytes`` is exceeded, and never
+    leaves a partial file behind.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with destination.open("wb") as buffer:
+            while True:
+                chunk = source.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                buffer.write(chunk)
+    except HTTPException:
+        destination.unlink(missing_ok=True)
+        raise
+    except OSError as exc:
+        destination.unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=failure_detail) from exc
+
+    stored = StoredUpload(destination, size, digest.hexdigest())
+    logger.info(f"Stored upload {destination.name}: {size} bytes, sha256 {stored.sha256}")
+    return stored
+
+
+def store_upload(upload: UploadFile, destination: Path, *, max_bytes: int, failure_detail: str) -> StoredUpload:
+    """Write a parsed ``UploadFile`` to ``destination`` (blocking, see ``copy_stream``)."""
+    size: Optional[int] = upload.size
+    if size is not None and size > max_bytes:
+        raise _too_large(max_bytes)
+    upload.file.seek(0)
+    return copy_stream(upload.file, destination, max_bytes=max_bytes, failure_detail=failure_detail)
+
+
+def _write_at(fd: int, data: bytes, offset: int) -> None:
+    # lseek + write rather than os.pwrite, which Windows lacks; each request has its own fd
+    os.lseek(fd, offset, os.SEEK_SET)
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+async def receive_range(request: Request, path: Path, *, offset: int, max_bytes: int, failure_detail: str) -> int:
+    """Write the raw request body into the existing file ``path`` starting at ``offset``.
+
+    Positioned writes make a retried range idempotent: resending bytes the
+    server already has rewrites the same bytes in place. The data is fsynced
+    before returning the number of bytes written.
+    """
+    written = 0
+    pending = bytearray()
+    try:
+        fd = await run_in_threadpool(os.open, path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found") from exc
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=failure_detail) from exc
+    try:
+        async for chunk in request.stream():
+            if offset + written + len(pending) + len(chunk) > max_bytes:
+                raise _too_large(max_bytes)
+            pending += chunk
+            if len(pending) >= CHUNK_BYTES:
+                await run_in_threadpool(_write_at, fd, bytes(pending), offset + written)
+                written += len(pending)
+                pending.clear()
+        if pending:
+            await run_in_threadpool(_write_at, fd, bytes(pending), offset + written)
+            written += len(pending)
+        await run_in_threadpool(os.fsync, fd)
+    except OSError as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=failure_detail) from exc
+    finally:
+        os.close(fd)
+    return written
+
+
+class _AtomicFile:
+    """Writes under a temporary name next to ``destination`` and renames it into place on commit.
+
+    Blocking methods; the request streamer calls them in the threadpool.
+    """
+
+    def __init__(self, destination: Path):
+        self.destination = destination
+        self.temp_path = destination.with_name(f".{destination.name}.{secrets.token_hex(4)}.part")
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self._file: Optional[BinaryIO] = None
+
+    def open(self) -> None:
+        self.destination.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.temp_path.open("xb")
+
+    def write(self, data: bytes) -> None:
+        self.digest.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> StoredUpload:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, self.destination)
+        return StoredUpload(self.destination, self.size, self.digest.hexdigest())
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+async def receive_file(
+    request: Request,
+    *,
+    destination_for: Callable[[str, str], Path],
+    max_bytes: int,
+    failure_detail: str,
+    field: str = "file",
+) -> ReceivedFile:
+    """Stream the ``field`` file of a multipart request body straight into its final location.
+
+    Unlike ``UploadFile`` parameters, nothing is spooled to a temporary file
+    first: the body is parsed as it arrives and the file part is written once,
+    in 1 MiB chunks off the event loop, then atomically renamed into place.
+    ``destination_for(filename, content_type)`` picks the path (or raises to
+    reject the upload) as soon as the part headers arrive. Other form fields
+    are ignored.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data upload")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise _too_large(max_bytes)
+
+    events: List[Tuple[str, object]] = []
+    header: List[bytearray] = [bytearray(), bytearray()]
+    part_headers = {}
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header[0] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header[1] += data[start:end]
+
+    def on_header_end() -> None:
+        part_headers[bytes(header[0]).lower()] = bytes(header[1])
+        header[0].clear()
+        header[1].clear()
+
+    def on_headers_finished() -> None:
+        events.append(("headers", dict(part_headers)))
+        part_headers.clear()
+
+    callbacks = {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end", None)),
+    }
+    parser = MultipartParser(params[b"boundary"], callbacks)
+
+    writer: Optional[_AtomicFile] = None
+    pending = bytearray()
+    size = 0
+    part: Optional[Tuple[str, str]] = None  # (filename, content type) while inside the file part
+    received: Optional[ReceivedFile] = None
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except ValueError as exc:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed multipart upload") from exc
+            for kind, payload in events:
+                if kind == "headers":
+                    _, options = parse_options_header(payload.get(b"content-disposition", b""))
+                    is_file = options.get(b"name", b"").decode("utf-8", "replace") == field and b"filename" in options
+                    if is_file and received is None:
+                        filename = options[b"filename"].decode("utf-8", "replace")
+                        part_type = payload.get(b"content-type", b"application/octet-stream").decode("latin-1")
+                        part = (filename, part_type)
+                        writer = _AtomicFile(destination_for(filename, part_type))
+                        await run_in_threadpool(writer.open)
+                elif kind == "data" and part is not None:
+                    size += len(payload)
+                    if size > max_bytes:
+                        raise _too_large(max_bytes)
+                    pending += payload
+                    if len(pending) >= CHUNK_BYTES:
+                        await run_in_threadpool(writer.write, bytes(pending))
+                        pending.clear()
+                elif kind == "end" and part is not None:
+                    await run_in_threadpool(writer.write, bytes(pending))
+                    pending.clear()
+                    stored = await run_in_threadpool(writer.commit)
+                    writer = None
+                    received = ReceivedFile(part[0], part[1], stored)
+                    part = None
+            events.clear()
+    except OSError as exc:
+        if writer is not None:
+            await run_in_threadpool(writer.abort)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=failure_detail) from exc
+    except BaseException:
+        if writer is not None:
+            await run_in_threadpool(writer.abort)
+        raise
+
+    if received is None:
+        if writer is not None:
+            await run_in_threadpool(writer.abort)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Missing file field '{field}'")
+    logger.info(f"Stored upload {received.path.name}: {received.size} bytes, sha256 {received.sha256}")
+    return received
@@ -0,0 +1,420 @@
+"""Make MediaRecorder WebM files seekable: add Duration and a Cues index.
+
+Browsers write WebM as they record, so the Segment and often the Clusters
+have "unknown" sizes, Info has no Duration and there are no Cues. Players
+then have to scan the whole file to seek. ``make_seekable`` scans the EBML
+structure (element headers only, a few bytes per block) and writes a copy
+laid out as SeekHead, Info (with Duration), Tracks, Cues, Clusters, with
+every size filled in. Cue positions are known before the clusters are
+copied, so a player can seek with a single range request.
+"""
+import io
+import logging
+import os
+import secrets
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+EBML = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_NUMBER = 0xD7
+TRACK_TYPE = 0x83
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+BLOCK_DURATION = 0x9B
+REFERENCE_BLOCK = 0xFB
+CUES = 0x1C53BB6B
+CUE_POINT = 0xBB
+CUE_TIME = 0xB3
+CUE_TRACK_POSITIONS = 0xB7
+CUE_TRACK = 0xF7
+CUE_CLUSTER_POSITION = 0xF1
+ATTACHMENTS = 0x1941A469
+CHAPTERS = 0x1043A770
+TAGS = 0x1254C367
+VOID = 0xEC
+CRC32 = 0xBF
+
+# Level 1 elements: one of these ends a Cluster of unknown size
+TOP_LEVEL = {EBML, SEEK_HEAD, INFO, TRACKS, CLUSTER, CUES, ATTACHMENTS, CHAPTERS, TAGS}
+
+VIDEO_TRACK = 1
+DEFAULT_TIMECODE_SCALE = 1_000_000  # nanoseconds per tick, i.e. millisecond timestamps
+# Positions are written 8 bytes wide so the Cues and SeekHead sizes do not depend on them
+POSITION_WIDTH = 8
+
+
+class WebmError(ValueError):
+    pass
+
+
+class WebmInfo:
+    """What a recording contains: length, size on disk and picture size (None for audio only)."""
+
+    def __init__(self, duration_seconds: float, size_bytes: int, width: Optional[int], height: Optional[int]):
+        self.duration_seconds = duration_seconds
+        self.size_bytes = size_bytes
+        self.width = width
+        self.height = height
+
+
+class _Cluster:
+    def __init__(self, start: int, data_start: int):
+        self.start = start
+        self.data_start = data_start
+        self.data_end = data_start
+        self.timecode = 0
+        self.cue_time: Optional[int] = None
+        self.intact = False  # known size and nothing cut off
+
+
+# EBML primitives
+
+
+def _read_vint(source: BinaryIO, keep_marker: bool) -> Optional[Tuple[int, int, bool]]:
+    """(value, length, all value bits set) of the variable-length integer at the current position."""
+    first = source.read(1)
+    if not first:
+        return None
+    length = 9 - first[0].bit_length()
+    if length > 8:
+        raise WebmError("Invalid EBML variable-length integer")
+    rest = source.read(length - 1)
+    if len(rest) < length - 1:
+        return None
+    value = int.from_bytes(first + rest, "big")
+    marker = 1 << (7 * length)
+    all_ones = value == (marker << 1) - 1
+    return (value if keep_marker else value - marker), length, all_ones
+
+
+def _read_header(source: BinaryIO) -> Optional[Tuple[int, Optional[int], int]]:
+    """(element id, payload size or None if unknown, header length), or None at end of data."""
+    element = _read_vint(source, keep_marker=True)
+    if element is None:
+        return None
+    size = _read_vint(source, keep_marker=False)
+    if size is None:
+        return None
+    return element[0], (None if size[2] else size[0]), element[1] + size[1]
+
+
+def _children(payload: bytes) -> Iterator[Tuple[int, bytes]]:
+    source = io.BytesIO(payload)
+    while True:
+        header = _read_header(source)
+        if header is None or header[1] is None:
+            return
+        data = source.read(header[1])
+        if len(data) < header[1]:
+            return
+        yield header[0], data
+
+
+def _uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+
+def _encode_size(size: int, width: Optional[int] = None) -> bytes:
+    if width is None:
+        width = next(length for length in range(1, 9) if size < (1 << (7 * length)) - 1)
+    return (size | (1 << (7 * width))).to_bytes(width, "big")
+
+
+def _element(element_id: int, payload: bytes) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + _encode_size(len(payload)) + payload
+
+
+def _uint_element(element_id: int, value: int, width: Optional[int] = None) -> bytes:
+    return _element(element_id, value.to_bytes(width or max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def _cluster_header(size: int) -> bytes:
+    return CLUSTER.to_bytes(4, "big") + _encode_size(size, POSITION_WIDTH)
+
+
+# Scanning
+
+
+class _Scan:
+    def __init__(self):
+        self.ebml_header = b""
+        self.segment_sized = False
+        self.info = b""
+        self.tracks = b""
+        self.others: List[Tuple[int, int]] = []
+        self.clusters: List[_Cluster] = []
+        self.has_cues = False
+        self.timecode_scale = DEFAULT_TIMECODE_SCALE
+        self.duration: Optional[float] = None
+        self.end_tick = 0
+        self.cue_track: Optional[int] = None
+        self.width: Optional[int] = None
+        self.height: Optional[int] = None
+
+    def read_info(self, payload: bytes) -> None:
+        self.info = payload
+        for element_id, data in _children(payload):
+            if element_id == TIMECODE_SCALE:
+                self.timecode_scale = _uint(data) or DEFAULT_TIMECODE_SCALE
+            elif element_id == DURATION:
+                self.duration = struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+
+    def read_tracks(self, payload: bytes) -> None:
+        first_track = None
+        for element_id, entry in _children(payload):
+            if element_id != TRACK_ENTRY:
+                continue
+            fields = dict(_children(entry))
+            number = _uint(fields.get(TRACK_NUMBER, b"\x00"))
+            first_track = first_track or number
+            if _uint(fields.get(TRACK_TYPE, b"\x00")) == VIDEO_TRACK and self.cue_track is None:
+                self.cue_track = number
+                video = dict(_children(fields.get(VIDEO, b"")))
+                self.width = _uint(video[PIXEL_WIDTH]) if PIXEL_WIDTH in video else None
+                self.height = _uint(video[PIXEL_HEIGHT]) if PIXEL_HEIGHT in video else None
+        # Audio only: every frame is a keyframe, index the first track
+        self.cue_track = self.cue_track or first_track
+
+    def block(self, cluster: _Cluster, header: bytes, keyframe: bool, duration: int = 0) -> None:
+        source = io.BytesIO(header)
+        track = _read_vint(source, keep_marker=False)
+        relative = source.read(2)
+        if track is None or len(relative) < 2:
+            return
+        tick = cluster.timecode + struct.unpack(">h", relative)[0]
+        self.end_tick = max(self.end_tick, tick + duration)
+        if keyframe and track[0] == self.cue_track and cluster.cue_time is None:
+            cluster.cue_time = max(tick, 0)
+
+
+def _scan_cluster(source: BinaryIO, scan: _Scan, cluster: _Cluster, size: Optional[int], limit: int) -> None:
+    end = limit if size is None else min(cluster.data_start + size, limit)
+    position = cluster.data_start
+    while position < end:
+        source.seek(position)
+        header = _read_header(source)
+        if header is None:
+            break
+        element_id, child_size, header_length = header
+        if size is None and element_id in TOP_LEVEL:
+            break
+        if child_size is None or position + header_length + child_size > end:
+            # A block cut off by the end of the file: keep what precedes it
+            break
+        if element_id == CLUSTER_TIMECODE:
+            cluster.timecode = _uint(source.read(child_size))
+        elif element_id == SIMPLE_BLOCK:
+            head = source.read(min(child_size, 12))
+            scan.block(cluster, head, keyframe=_simple_block_flags(head) & 0x80 != 0)
+        elif element_id == BLOCK_GROUP:
+            fields = dict(_children(source.read(child_size)))
+            if BLOCK in fields:
+                duration = _uint(fields[BLOCK_DURATION]) if BLOCK_DURATION in fields else 0
+                scan.block(cluster, fields[BLOCK][:12], keyframe=REFERENCE_BLOCK not in fields, duration=duration)
+        position += header_length + child_size
+    cluster.data_end = position
+    cluster.intact = size is not None and position == cluster.data_start + size
+
+
+def _simple_block_flags(head: bytes) -> int:
+    # Track number (1 to 8 bytes), then a 2-byte timecode, then the flags
+    if not head:
+        return 0
+    track_length = 9 - head[0].bit_length()
+    return head[track_length + 2] if len(head) > track_length + 2 else 0
+
+
+def _scan(source: BinaryIO, file_size: int) -> _Scan:
+    scan = _Scan()
+    header = _read_header(source)
+    if header is None or header[0] != EBML or header[1] is None:
+        raise WebmError("Not an EBML file")
+    ebml_end = header[2] + header[1]
+    source.seek(0)
+    scan.ebml_header = source.read(ebml_end)
+
+    header = _read_header(source)
+    if header is None or header[0] != SEGMENT:
+        raise WebmError("No Segment")
+    segment_start = ebml_end + header[2]
+    segment_end = file_size if header[1] is None else min(segment_start + header[1], file_size)
+    scan.segment_sized = header[1] is not None and segment_start + header[1] == file_size
+
+    position = segment_start
+    while position < segment_end:
+        source.seek(position)
+        header = _read_header(source)
+        if header is None:
+            break
+        element_id, size, header_length = header
+        if element_id == CLUSTER:
+            cluster = _Cluster(position, position + header_length)
+            _scan_cluster(source, scan, cluster, size, segment_end)
+            if cluster.data_end > cluster.data_start:
+                scan.clusters.append(cluster)
+            if size is None or cluster.intact:
+                # An unknown-size Cluster ends where the next level 1 element starts
+                position = cluster.data_end
+            elif cluster.data_start + size <= segment_end:
+                position = cluster.data_start + size
+            else:
+                break
+            continue
+        if size is None or position + header_length + size > segment_end:
+            break
+        if element_id == INFO:
+            scan.read_info(source.read(size))
+        elif element_id == TRACKS:
+            scan.tracks = source.read(size)
+            scan.read_tracks(scan.tracks)
+        elif element_id == CUES:
+            scan.has_cues = True
+        elif element_id in (ATTACHMENTS, CHAPTERS, TAGS):
+            scan.others.append((position, position + header_length + size))
+        position += header_length + size
+
+    if not scan.info or not scan.tracks:
+        raise WebmError("Missing Info or Tracks")
+    return scan
+
+
+# Writing
+
+
+def _info_with_duration(scan: _Scan) -> bytes:
+    kept = b"".join(
+        _element(element_id, data)
+        for element_id, data in _children(scan.info)
+        if element_id not in (DURATION, CRC32, VOID)
+    )
+    return _element(INFO, kept + _element(DURATION, struct.pack(">d", float(scan.end_tick))))
+
+
+def _cues(scan: _Scan, cluster_positions: List[int]) -> bytes:
+    if all(cluster.cue_time is None for cluster in scan.clusters):
+        return b""
+    points = b"".join(
+        _element(
+            CUE_POINT,
+            _uint_element(CUE_TIME, cluster.cue_time)
+            + _element(
+                CUE_TRACK_POSITIONS,
+                _uint_element(CUE_TRACK, scan.cue_track) + _uint_element(CUE_CLUSTER_POSITION, position, POSITION_WIDTH),
+            ),
+        )
+        for cluster, position in zip(scan.clusters, cluster_positions)
+        if cluster.cue_time is not None
+    )
+    return _element(CUES, points)
+
+
+def _seek_head(entries: List[Tuple[int, int]]) -> bytes:
+    return _element(
+        SEEK_HEAD,
+        b"".join(
+            _element(SEEK, _element(SEEK_ID, element_id.to_bytes(4, "big")) + _uint_element(SEEK_POSITION, position, POSITION_WIDTH))
+            for element_id, position in entries
+        ),
+    )
+
+
+def _copy(source: BinaryIO, destination: BinaryIO, start: int, length: int) -> None:
+    source.seek(start)
+    while length > 0:
+        chunk = source.read(min(COPY_CHUNK_BYTES, length))
+        if not chunk:
+            raise WebmError("File shrank while it was being indexed")
+        destination.write(chunk)
+        length -= len(chunk)
+
+
+def _write(source: BinaryIO, destination: BinaryIO, scan: _Scan) -> None:
+    info = _info_with_duration(scan)
+    tracks = _element(TRACKS, scan.tracks)
+    others_size = sum(end - start for start, end in scan.others)
+    # Sizes first (positions are fixed width), then the real positions
+    cues_size = len(_cues(scan, [0] * len(scan.clusters)))
+    seek_head_size = len(_seek_head([(INFO, 0), (TRACKS, 0)] + ([(CUES, 0)] if cues_size else [])))
+    cues_start = seek_head_size + len(info) + len(tracks) + others_size
+
+    positions = []
+    position = cues_start + cues_size
+    for cluster in scan.clusters:
+        positions.append(position)
+        position += len(_cluster_header(0)) + cluster.data_end - cluster.data_start
+    segment_size = position
+
+    destination.write(scan.ebml_header)
+    destination.write(SEGMENT.to_bytes(4, "big") + _encode_size(segment_size, POSITION_WIDTH))
+    entries = [(INFO, seek_head_size), (TRACKS, seek_head_size + len(info))]
+    destination.write(_seek_head(entries + ([(CUES, cues_start)] if cues_size else [])))
+    destination.write(info)
+    destination.write(tracks)
+    for start, end in scan.others:
+        _copy(source, destination, start, end - start)
+    destination.write(_cues(scan, positions))
+    for cluster in scan.clusters:
+        destination.write(_cluster_header(cluster.data_end - cluster.data_start))
+        _copy(source, destination, cluster.data_start, cluster.data_end - cluster.data_start)
+
+
+def make_seekable(path: Path, destination: Optional[Path] = None) -> Optional[WebmInfo]:
+    """Rewrite the WebM file at ``path`` with Duration and Cues; returns what it contains.
+
+    Blocking: call it from a worker thread. The new file is written next to
+    its ``destination`` (``path`` itself by default) and renamed onto it,
+    so readers see one or the other; with a separate destination ``path``
+    is left as it was. Files that already have both are left alone and
+    nothing is written. Returns None (and writes nothing) for anything that
+    is not a readable WebM file.
+    """
+    destination = destination or path
+    temp_path = destination.with_name(f".{destination.name}.{secrets.token_hex(4)}.part")
+    try:
+        with path.open("rb") as source:
+            scan = _scan(source, os.fstat(source.fileno()).st_size)
+            if scan.has_cues and scan.duration is not None and scan.segment_sized and all(c.intact for c in scan.clusters):
+                duration_ticks = scan.duration
+                size_bytes = os.fstat(source.fileno()).st_size
+            else:
+                with temp_path.open("xb") as output:
+                    _write(source, output, scan)
+                    output.flush()
+                    os.fsync(output.fileno())
+                    size_bytes = output.tell()
+                os.replace(temp_path, destination)
+                duration_ticks = scan.end_tick
+    except (OSError, WebmError) as exc:
+        temp_path.unlink(missing_ok=True)
+        logger.warning(f"Could not index recording {path.name}: {exc}")
+        return None
+
+    info = WebmInfo(
+        duration_seconds=duration_ticks * scan.timecode_scale / 1e9,
+        size_bytes=size_bytes,
+        width=scan.width,
+        height=scan.height,
+    )
+    logger.info(f"Indexed recording {path.name}: {info.duration_seconds:.1f} s, {len(scan.clusters)} clusters")
+    return info
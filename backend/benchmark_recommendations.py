@@ -0,0 +1,110 @@
+"""Compare per-row Python scoring with the vectorized NumPy scoring path.
+
+The vectorized side is the recommender's own: coordinates gathered from a
+GeoGridIndex, shared-skill counts from SkillIndex bitsets, then rank_users.
+Runs on synthetic in-memory users (no database needed):
+
+    python benchmark_recommendations.py
+    python benchmark_recommendations.py --sizes 10000 100000 --top 5
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.services import recommendation_service, scoring_service
+from app.services.geo_index_service import GeoGridIndex
+from app.services.skill_index_service import SkillIndex
+
+SKILLS = [f"skill-{i}" for i in range(200)]
+
+
+def make_users(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    users = []
+    for user_id in range(1, count + 1):
+        located = rng.random() < 0.9
+        users.append(
+            {
+                "id": user_id,
+                "latitude": rng.uniform(8.0, 32.0) if located else None,
+                "longitude": rng.uniform(68.0, 90.0) if located else None,
+                "skills": {rng.choice(SKILLS) for _ in range(rng.randint(0, 5))},
+            }
+        )
+    return users
+
+
+def legacy_rank(me, users, my_skills, *, radius_km, top):
+    """The per-row loop the recommender used before vectorization."""
+    scored = []
+    for user in users:
+        distance_km = recommendation_service.haversine_km(me["latitude"], me["longitude"], user["latitude"], user["longitude"])
+        is_nearby = distance_km is not None and distance_km <= radius_km
+        shared = len(my_skills.intersection(user["skills"]))
+        group = 3 if shared and is_nearby else 2 if shared else 1 if is_nearby else 0
+        scored.append(((group, shared, -(distance_km if distance_km is not None else 99999)), user["id"]))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [user_id for _, user_id in scored[:top]]
+
+
+def build_indexes(users):
+    locations = GeoGridIndex()
+    locations.rebuild(lambda: [(user["id"], user["latitude"], user["longitude"]) for user in users])
+    skills = SkillIndex()
+    skills.rebuild(lambda: [(user["id"], name) for user in users for name in user["skills"]])
+    return locations, skills
+
+
+def vectorized_rank(me, ids, indexes, *, radius_km, top):
+    """Gather and rank like recommend_users_by_location does for its candidates."""
+    locations, skills = indexes
+    coords = locations.coordinates(ids)
+    distances = np.round(
+        scoring_service.haversine_km_many(me["latitude"], me["longitude"], coords[:, 0], coords[:, 1]), 2
+    )
+    shared = skills.shared_counts(ids, me["skills"])
+    order = scoring_service.rank_users(distances, shared, local_radius_km=radius_km, k=top)
+    return ids[order].tolist()
+
+
+def timed(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--radius", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'legacy ms':>12} {'vectorized ms':>14} {'speedup':>8}  same top-{args.top}")
+    for size in args.sizes:
+        users = make_users(size)
+        me = {"latitude": 12.9716, "longitude": 77.5946, "skills": {"skill-1", "skill-7", "skill-42"}}
+        ids = np.array([user["id"] for user in users], dtype=np.int64)
+        indexes = build_indexes(users)
+
+        legacy_time, legacy = timed(
+            lambda: legacy_rank(me, users, me["skills"], radius_km=args.radius, top=args.top), args.repeat
+        )
+        fast_time, fast = timed(
+            lambda: vectorized_rank(me, ids, indexes, radius_km=args.radius, top=args.top), args.repeat
+        )
+        print(
+            f"{size:>10} {legacy_time * 1000:>12.1f} {fast_time * 1000:>14.1f} "
+            f"{legacy_time / fast_time:>7.1f}x  {legacy == fast}"
+        )
+
+
+if __name__ == "__main__":
+    main()
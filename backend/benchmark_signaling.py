@@ -0,0 +1,290 @@
+"""Load-test meeting signaling: N rooms x M simulated peers against /ws/meeting/{id}.
+
+Drives the real app in-process over ASGI (no network, no server) with a
+throwaway SQLite database, replays join/offer/answer/candidate traffic and
+reports relay latency, throughput, memory per socket and CPU per message:
+
+    python benchmark_signaling.py
+    python benchmark_signaling.py --rooms 200 --peers 4 --relay opaque --batch-ms 20
+    python benchmark_signaling.py --broker unix
+
+Each room is an accepted connection; its peers alternate between the two
+participants' tokens (several tabs per user), so M may exceed two. Every
+frame is relayed to the other M - 1 sockets of the room, as in a mesh call.
+With ``--broker unix`` a second in-process broker subscribes to every room,
+standing in for another worker, so the cost of the bus hop is included.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+OFFER_SDP = "v=0\r\n" + "a=candidate-and-codec-lines\r\n" * 120
+CANDIDATE = "candidate:842163049 1 udp 1677729535 192.0.2.10 51234 typ srflx raddr 10.0.0.5 rport 51234 generation 0"
+
+
+def _frame(message: dict) -> str:
+    # Compact separators, like JSON.stringify in the browser
+    return json.dumps(message, separators=(",", ":"))
+
+
+class Recorder:
+    """Delivery latencies and client-side time, shared by all simulated peers."""
+
+    def __init__(self):
+        self.latencies_ns = []
+        self.wire_frames = 0
+        self.client_seconds = 0.0
+        self.expected = 0
+        self.done = asyncio.Event()
+
+    def delivered(self, sent_ns: int) -> None:
+        self.latencies_ns.append(time.perf_counter_ns() - sent_ns)
+        if len(self.latencies_ns) >= self.expected:
+            self.done.set()
+
+
+class SimulatedPeer:
+    """One meeting socket talking to the ASGI app through in-memory queues."""
+
+    def __init__(self, app, room_id: int, query: str, name: str, recorder: Recorder):
+        self.app = app
+        self.name = name
+        self.recorder = recorder
+        self.scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": f"/ws/meeting/{room_id}",
+            "raw_path": f"/ws/meeting/{room_id}".encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [],
+            "client": ("127.0.0.1", 0),
+            "server": ("benchmark", 80),
+            "subprotocols": [],
+        }
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.close_code = None
+        self.task = None
+
+    async def connect(self) -> None:
+        self.inbox.put_nowait({"type": "websocket.connect"})
+        self.task = asyncio.create_task(self.app(self.scope, self.inbox.get, self._from_server))
+        await self.accepted.wait()
+        if self.close_code is not None:
+            raise RuntimeError(f"{self.name} rejected with close code {self.close_code}")
+
+    def send(self, message: dict) -> None:
+        message["ts"] = time.perf_counter_ns()
+        self.inbox.put_nowait({"type": "websocket.receive", "text": _frame(message)})
+
+    async def close(self) -> None:
+        self.inbox.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        if self.task is not None:
+            await self.task
+
+    async def _from_server(self, event: dict) -> None:
+        kind = event["type"]
+        if kind == "websocket.accept":
+            self.accepted.set()
+        elif kind == "websocket.close":
+            self.close_code = event.get("code", 1000)
+            self.accepted.set()
+        elif kind == "websocket.send":
+            started = time.perf_counter()
+            self._on_frame(event.get("text") or event.get("bytes").decode())
+            self.recorder.client_seconds += time.perf_counter() - started
+
+    def _on_frame(self, data: str) -> None:
+        self.recorder.wire_frames += 1
+        decoded = json.loads(data)
+        for message in decoded if isinstance(decoded, list) else [decoded]:
+            if message.get("type") == "ping":
+                self.inbox.put_nowait({"type": "websocket.receive", "text": _frame({"type": "pong"})})
+            else:
+                self.recorder.delivered(message["ts"])
+
+
+async def negotiate(peers, *, rounds: int, candidates: int, gap: float, rng: random.Random) -> None:
+    """Mesh negotiation: every pair trades an offer, an answer and a trickle of candidates."""
+    await asyncio.sleep(rng.uniform(0, 0.1))
+    for peer in peers:
+        peer.send({"type": "join", "sender": peer.name})
+    for _ in range(rounds):
+        for position, caller in enumerate(peers):
+            for callee in peers[position + 1:]:
+                caller.send({"type": "offer", "offer": {"type": "offer", "sdp": OFFER_SDP}, "sender": caller.name, "target": callee.name})
+                callee.send({"type": "answer", "answer": {"type": "answer", "sdp": OFFER_SDP}, "sender": callee.name, "target": caller.name})
+                for _ in range(candidates):
+                    for source, target in ((caller, callee), (callee, caller)):
+                        source.send({"type": "ice-candidate", "candidate": {"candidate": CANDIDATE, "sdpMid": "0", "sdpMLineIndex": 0}, "sender": source.name, "target": target.name})
+                    await asyncio.sleep(gap)
+
+
+def frames_per_room(peers: int, rounds: int, candidates: int) -> int:
+    pairs = peers * (peers - 1) // 2
+    return peers + rounds * pairs * (2 + 2 * candidates)
+
+
+def seed_rooms(count: int):
+    """Users and accepted connections for ``count`` rooms; returns (room id, (token, token)) pairs."""
+    from app import Base, SessionLocal, engine
+    from app.models.connection import Connection, ConnectionStatus
+    from app.models.user import User
+    from app.services import auth_service
+
+    Base.metadata.create_all(bind=engine)
+    rooms = []
+    with SessionLocal() as db:
+        for number in range(count):
+            pair = [User(name=f"Peer {number}-{side}", email=f"peer{number}-{side}@bench.local", password="-", location="Bench") for side in "ab"]
+            db.add_all(pair)
+            db.flush()
+            connection = Connection(sender_id=pair[0].id, receiver_id=pair[1].id, status=ConnectionStatus.ACCEPTED)
+            db.add(connection)
+            db.flush()
+            tokens = tuple(auth_service.create_access_token({"sub": str(user.id)}) for user in pair)
+            rooms.append((connection.id, tokens))
+        db.commit()
+    return rooms
+
+
+async def mirror_worker(rooms):
+    """A second broker on the bus, subscribed to every room like another worker would be."""
+    from app.services import broker_service
+    from config.config import settings
+
+    received = 0
+
+    async def deliver(room, payload):
+        nonlocal received
+        received += 1
+
+    broker = broker_service.UnixSocketBroker(settings.signaling_bus_path)
+    await broker.start(deliver)
+    await asyncio.sleep(0.2)
+    for room_id, _ in rooms:
+        await broker.subscribe(str(room_id))
+    return broker, lambda: received
+
+
+def percentile(ordered, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args) -> None:
+    from app.api.signaling_api import manager
+    from app.main import app
+    from app.services import broker_service
+    from config.config import settings
+
+    logging.getLogger().setLevel(logging.WARNING)
+    settings.signaling_broker = args.broker
+    settings.signaling_slow_peer_policy = args.policy
+    settings.signaling_bus_path = os.path.join(args.workdir, "signaling.sock")
+    manager.broker = broker_service.create_broker()
+
+    rng = random.Random(args.seed)
+    rooms = seed_rooms(args.rooms)
+    mirror, mirrored = (await mirror_worker(rooms)) if args.broker == "unix" else (None, None)
+    recorder = Recorder()
+    query = f"relay={args.relay}&batch_ms={args.batch_ms}"
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    by_room = []
+    for room_id, tokens in rooms:
+        peers = [
+            SimulatedPeer(app, room_id, f"token={tokens[number % 2]}&{query}", f"r{room_id}p{number}", recorder)
+            for number in range(args.peers)
+        ]
+        for peer in peers:
+            await peer.connect()
+        by_room.append(peers)
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(0.1)  # let writer tasks settle before measuring
+    socket_bytes = (tracemalloc.get_traced_memory()[0] - baseline) / (args.rooms * args.peers)
+    tracemalloc.stop()
+
+    sent = args.rooms * frames_per_room(args.peers, args.rounds, args.candidates)
+    recorder.expected = sent * (args.peers - 1)
+    before = manager.snapshot()
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    await asyncio.gather(
+        *(negotiate(peers, rounds=args.rounds, candidates=args.candidates, gap=args.gap_ms / 1000, rng=rng) for peers in by_room)
+    )
+    try:
+        await asyncio.wait_for(recorder.done.wait(), timeout=args.timeout)
+    except asyncio.TimeoutError:
+        print(f"Timed out waiting for deliveries ({len(recorder.latencies_ns)}/{recorder.expected})")
+    wall = time.perf_counter() - wall_started
+    server_cpu = time.process_time() - cpu_started - recorder.client_seconds
+    after = manager.snapshot()
+
+    for peers in by_room:
+        for peer in peers:
+            await peer.close()
+    await manager.broker.stop()
+    if mirror is not None:
+        await asyncio.sleep(0.1)  # let the bus see this worker hang up
+        await mirror.stop()
+
+    delivered = len(recorder.latencies_ns)
+    ordered = sorted(recorder.latencies_ns)
+    print(
+        f"{args.rooms} rooms x {args.peers} peers = {args.rooms * args.peers} sockets | "
+        f"broker {args.broker} | relay {args.relay} | batch {args.batch_ms} ms | policy {args.policy}"
+    )
+    print(f"connect          {connect_seconds:.2f} s, {socket_bytes / 1024:.1f} KiB per socket")
+    print(f"frames           {sent} sent, {delivered}/{recorder.expected} delivered in {recorder.wire_frames} websocket frames")
+    print(f"throughput       {sent / wall:,.0f} sent/s, {delivered / wall:,.0f} delivered/s over {wall:.2f} s")
+    if ordered:
+        print(
+            "relay latency ms "
+            + "  ".join(f"p{int(fraction * 100)} {percentile(ordered, fraction) / 1e6:.2f}" for fraction in (0.5, 0.9, 0.99))
+            + f"  max {ordered[-1] / 1e6:.2f}  mean {statistics.fmean(ordered) / 1e6:.2f}"
+        )
+    print(f"server CPU       {server_cpu / sent * 1e6:.1f} us per sent frame, {server_cpu / max(delivered, 1) * 1e6:.1f} us per delivery")
+    print(
+        f"queues           dropped {after['frames_dropped'] - before['frames_dropped']}, "
+        f"coalesced {after['frames_coalesced'] - before['frames_coalesced']}, "
+        f"slow peers disconnected {after['slow_peers_disconnected'] - before['slow_peers_disconnected']}, "
+        f"deepest {after['max_queue_depth']}"
+    )
+    if mirrored is not None:
+        print(f"bus              {mirrored()} frames reached the mirror worker")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--peers", type=int, default=4, help="sockets per room")
+    parser.add_argument("--rounds", type=int, default=2, help="negotiations per pair of peers")
+    parser.add_argument("--candidates", type=int, default=8, help="ICE candidates per peer per negotiation")
+    parser.add_argument("--gap-ms", type=float, default=2.0, help="pause between candidates")
+    parser.add_argument("--broker", choices=["memory", "unix"], default="memory")
+    parser.add_argument("--relay", choices=["json", "opaque"], default="json")
+    parser.add_argument("--batch-ms", type=int, default=0)
+    parser.add_argument("--policy", choices=["disconnect", "coalesce"], default="disconnect")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the last deliveries")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app reads DATABASE_URL on import; never touch the configured database
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'signaling-bench.db')}"
+        args.workdir = workdir
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
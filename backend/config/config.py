@@ -12,6 +12,55 @@ class Settings(BaseSettings):
     secret_key: str = "CHANGE_ME"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+
+    # In-process cache of decoded tokens and user rows used by get_current_user
+    auth_cache_ttl_seconds: int = 60
+    auth_cache_max_entries: int = 10000
+
+    # Argon2 cost parameters; existing hashes are upgraded on the next successful login
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    # Dedicated pool for password hashing so login bursts cannot exhaust the request threadpool
+    password_hash_workers: int = 4
+    password_hash_queue_depth: int = 8
+    password_hash_retry_after_seconds: int = 2
+
+    # Grid index over user coordinates used by location recommendations
+    geo_index_cell_degrees: float = 0.5
+    geo_index_refresh_seconds: int = 300
+
+    # Skill name -> user ids index used for skill matching
+    skill_index_refresh_seconds: int = 300
+
+    # Per-user dashboard sections; writes invalidate sections, the TTL bounds cross-worker staleness
+    dashboard_snapshot_ttl_seconds: int = 120
+    dashboard_snapshot_max_users: int = 5000
+
+    # BM25 search index behind /dashboard/search; rebuild_search_index.py writes the snapshot
+    search_index_refresh_seconds: int = 600
+    search_index_snapshot_path: str = str(BASE_DIR / "search_index.json")
+
+    # Typeahead over skills, user names and session titles
+    autocomplete_refresh_seconds: int = 600
+
+    # Room broker for signaling and chat: "memory" for a single worker, "unix" to share rooms across workers
+    signaling_broker: str = "memory"
+    signaling_bus_path: str = "/tmp/knownet-signaling.sock"
+    chat_bus_path: str = "/tmp/knownet-chat.sock"
+    # Per-socket outbound queue; a full queue disconnects the peer or ("coalesce") replaces/drops queued frames
+    signaling_queue_max_frames: int = 256
+    signaling_slow_peer_policy: str = "disconnect"
+    signaling_send_timeout_seconds: float = 10.0
+    # Server pings sockets quiet for an interval and evicts ones silent past the idle timeout
+    signaling_heartbeat_interval_seconds: float = 15.0
+    signaling_idle_timeout_seconds: float = 45.0
+    # Upper bound on the candidate batching window a client may negotiate (``?batch_ms=``)
+    signaling_max_batch_ms: int = 100
+
+    # Accepted-connection membership checks (REST and the signaling handshake)
+    membership_cache_ttl_seconds: int = 600
+    membership_cache_max_entries: int = 50000
     
     database_url: str = "mysql+pymysql://root:@localhost/knownet"
     
@@ -25,6 +74,30 @@ class Settings(BaseSettings):
     resources_dir: str = str(BASE_DIR / "resources")
     videos_dir: str = str(BASE_DIR / "videos")
     uploads_dir: str = str(BASE_DIR / "uploads")
+    # Upload size limits in MB, enforced while the file is written
+    max_recording_upload_mb: int = 2048
+    max_document_upload_mb: int = 100
+    max_resource_upload_mb: int = 100
+    max_avatar_upload_mb: int = 5
+    # Resumable recording uploads: suggested chunk size, and idle time before an unfinished one is discarded
+    recording_upload_chunk_mb: int = 8
+    recording_upload_expiry_hours: int = 24
+    # Live recording ingest: how often appended chunks are fsynced, and how long
+    # a dropped recording socket may reconnect before the recording is closed
+    recording_ingest_fsync_seconds: float = 5.0
+    recording_ingest_resume_seconds: int = 300
+    # Signed media links: key (defaults to secret_key) and lifetime. Links are issued
+    # per time window, so repeated listings reuse the same URL and browser cache
+    media_url_secret: str = ""
+    media_url_ttl_seconds: int = 6 * 3600
+    # Background jobs: worker threads per process (0 leaves the queue to drain_jobs.py),
+    # idle poll interval, how long a claimed job is hidden from other workers, and retries
+    job_workers: int = 2
+    job_poll_seconds: float = 2.0
+    job_visibility_timeout_seconds: int = 900
+    job_max_attempts: int = 5
+    job_retry_base_seconds: int = 30
+    job_retention_hours: int = 72
 
     class Config:
         env_file = ".env"
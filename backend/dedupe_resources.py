@@ -0,0 +1,78 @@
+"""Move resources and meeting documents stored before the blob store into it.
+
+Hashes each file that still has a copy of its own, files it under its
+SHA-256 (identical copies collapse into one blob) and repoints the record,
+then deletes blobs nothing points at. Records whose file is missing are
+left as they are. A record's old file is only deleted once the record
+points at its blob; on any failure both stay as they were. Safe to
+re-run: records already in the store are skipped.
+"""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+
+import app.models  # noqa: F401  (register every mapper)
+from app import SessionLocal
+from app.models.meeting_document import MeetingDocument
+from app.models.resource import Resource
+from app.services import blob_service, upload_service
+from config.config import settings
+
+
+def _source(file_path: str) -> Path:
+    return Path(settings.resources_dir) / Path(file_path).name
+
+
+def _stage(source: Path):
+    """Put a second link to (or a copy of) ``source`` in staging for ``adopt``, which consumes it."""
+    digest = hashlib.sha256()
+    with source.open("rb") as file:
+        for chunk in iter(lambda: file.read(upload_service.CHUNK_BYTES), b""):
+            digest.update(chunk)
+    staged = blob_service.staging_path(source.name)
+    staged.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, staged)
+    except OSError:
+        # Filesystems without hard links
+        shutil.copyfile(source, staged)
+    return upload_service.StoredUpload(staged, staged.stat().st_size, digest.hexdigest())
+
+
+def dedupe_resources():
+    with SessionLocal() as db:
+        for model, column, prefix in ((Resource, "file_url", "/resources/"), (MeetingDocument, "file_path", "resources/")):
+            moved = missing = failed = 0
+            for record in db.query(model).all():
+                file_path = getattr(record, column)
+                if blob_service.sha256_of(file_path) is not None:
+                    continue
+                source = _source(file_path)
+                if not source.is_file():
+                    missing += 1
+                    continue
+                try:
+                    stored = _stage(source)
+                    # adopt removes the staged link itself if it fails
+                    setattr(record, column, prefix + blob_service.adopt(db, stored, failure_detail="Failed to store blob"))
+                    db.commit()
+                except (OSError, HTTPException, SQLAlchemyError) as exc:
+                    db.rollback()
+                    failed += 1
+                    print(f"Skipped {model.__tablename__} {record.id}: {getattr(exc, 'detail', None) or exc}")
+                    continue
+                source.unlink(missing_ok=True)
+                moved += 1
+            print(
+                f"{model.__tablename__}: moved {moved} files into the blob store, {missing} missing, {failed} failed."
+            )
+        deleted = blob_service.collect_garbage(db)
+        print(f"Deleted {deleted} unreferenced blobs.")
+
+
+if __name__ == "__main__":
+    dedupe_resources()
@@ -0,0 +1,48 @@
+"""Run queued background jobs from the command line.
+
+Runs due jobs until the queue is empty, then exits; with --forever it keeps
+polling like a server worker does, periodic jobs included (set JOB_WORKERS=0
+on the web processes to leave all jobs to such dedicated workers). Jobs
+claimed by a worker that died are picked up again once their visibility
+timeout lapses.
+Run from the backend directory.
+"""
+import argparse
+import logging
+import time
+
+import app.models  # noqa: F401  (register every mapper)
+import app.services  # noqa: F401  (register every job handler)
+from app import SessionLocal
+from app.services import job_service
+from config.config import settings
+
+
+def drain_jobs(kinds=None, limit=None, forever=False, retry_failed=False):
+    if retry_failed:
+        with SessionLocal() as db:
+            print(f"Requeued {job_service.requeue_failed(db, kinds)} failed jobs.")
+    while True:
+        outcomes = job_service.drain(kinds=kinds, limit=limit)
+        if outcomes:
+            print(", ".join(f"{count} {outcome}" for outcome, count in sorted(outcomes.items())))
+        if not forever:
+            break
+        if not outcomes:
+            job_service.schedule_periodic()
+            time.sleep(settings.job_poll_seconds)
+    job_service.purge_finished(force=True)
+    with SessionLocal() as db:
+        totals = job_service.queue_stats(db)["totals"]
+    print(f"Queue: {totals or 'empty'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kind", action="append", dest="kinds", help="only run jobs of this kind (repeatable)")
+    parser.add_argument("--limit", type=int, help="stop after this many jobs")
+    parser.add_argument("--forever", action="store_true", help="keep polling for new jobs")
+    parser.add_argument("--retry-failed", action="store_true", help="give failed jobs a fresh set of attempts first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    drain_jobs(kinds=args.kinds, limit=args.limit, forever=args.forever, retry_failed=args.retry_failed)
@@ -0,0 +1,36 @@
+"""Queue seek indexing for recordings stored before it existed.
+
+Queues a recording.index job for each complete meeting recording that has
+no duration yet, and a session_recording.index job for each session whose
+recording is WebM. Workers (or drain_jobs.py) then write indexed copies and
+store duration, size and resolution. Files that are already indexed are
+left alone, so it is safe to re-run. Run add_recording_columns.py first.
+"""
+import app.models  # noqa: F401  (register every mapper)
+from app import SessionLocal
+from app.models.meeting_recording import MeetingRecording, RecordingStatus
+from app.models.session import Session as SessionModel
+from app.services import job_service, meeting_service
+
+
+def index_recordings():
+    with SessionLocal() as db:
+        records = (
+            db.query(MeetingRecording)
+            .filter(MeetingRecording.status == RecordingStatus.COMPLETE, MeetingRecording.duration_seconds.is_(None))
+            .all()
+        )
+        for record in records:
+            meeting_service.enqueue_indexing(db, record)
+        sessions = db.query(SessionModel).filter(SessionModel.recording_url.like("%.webm")).all()
+        for session in sessions:
+            job_service.enqueue(
+                db, "session_recording.index", {"session_id": session.id, "recording_url": session.recording_url}
+            )
+        db.commit()
+    print(f"Queued {len(records)} meeting recordings and {len(sessions)} session recordings.")
+    print("Run drain_jobs.py (or start the server) to index them.")
+
+
+if __name__ == "__main__":
+    index_recordings()
@@ -0,0 +1,23 @@
+"""Rebuild the /dashboard/search index from the database and write its snapshot.
+
+Workers load the snapshot on startup instead of scanning users, skills and
+sessions themselves (as long as it is younger than search_index_refresh_seconds).
+Run from the backend directory, e.g. before starting the server after a deploy.
+"""
+import app.models  # noqa: F401  (register every mapper)
+from app import SessionLocal
+from app.services import search_index_service
+from config.config import settings
+
+
+def rebuild_search_index():
+    with SessionLocal() as db:
+        kinds = search_index_service.build_from_db(db)
+    for kind, index in kinds.items():
+        print(f"Indexed {len(index)} {kind}.")
+    search_index_service.save_snapshot(kinds, settings.search_index_snapshot_path)
+    print(f"Snapshot written to {settings.search_index_snapshot_path}")
+
+
+if __name__ == "__main__":
+    rebuild_search_index()
@@ -43,6 +43,8 @@ document.addEventListener('DOMContentLoaded', function () {
 
     let currentContext = { type: null, id: null }; // { type: 'connection'|'session', id: int }
     let messagesPollInterval = null;
+    // Messages per page when no cursor is given (the server's default); fewer means the start was reached
+    const MESSAGE_PAGE_SIZE = 50;
     let allConnections = [];
     let allSessions = []; // To store joined sessions for the list
 
@@ -280,15 +282,84 @@ document.addEventListener('DOMContentLoaded', function () {
         messagesPollInterval = setInterval(() => loadMessages(true), 3000);
     }
 
+    function messagesEndpoint() {
+        if (currentContext.type === 'connection') {
+            return `/messages/connection/${currentContext.id}`;
+        }
+        return `/messages/${currentContext.id}/messages`;
+    }
+
+    // Renders messages into ``target`` with a divider before each new day
+    function renderWithDividers(messages, currentUserId, target) {
+        let lastDate = null;
+        messages.forEach(msg => {
+            const msgDate = new Date(msg.timestamp);
+            const dateStr = msgDate.toDateString();
+
+            if (lastDate !== dateStr) {
+                const divider = document.createElement('div');
+                divider.className = 'date-divider';
+                divider.dataset.date = dateStr;
+                divider.innerHTML = `<span>${getDateLabel(msgDate)}</span>`;
+                target.appendChild(divider);
+                lastDate = dateStr;
+            }
+
+            renderMessage(msg, currentUserId, target);
+        });
+    }
+
+    function renderLoadOlder() {
+        const control = document.createElement('div');
+        control.className = 'msg msg--system load-older';
+        control.innerHTML = '<button type="button" class="bubble">Load earlier messages</button>';
+        control.querySelector('button').addEventListener('click', loadOlderMessages);
+        messagesContainer.prepend(control);
+    }
+
+    // Scroll-back: the page before the oldest rendered message, kept in place on screen
+    async function loadOlderMessages() {
+        const control = messagesContainer.querySelector('.load-older');
+        const oldest = messagesContainer.querySelector('.msg[data-message-id]');
+        const currentUser = window.KN.auth.getUser();
+        if (!control || !oldest || !currentUser) return;
+
+        const button = control.querySelector('button');
+        button.disabled = true;
+        try {
+            const messages = await window.KN.api.get(`${messagesEndpoint()}?before_id=${oldest.dataset.messageId}`);
+            if (!Array.isArray(messages)) return;
+
+            const fragment = document.createDocumentFragment();
+            renderWithDividers(messages, currentUser.id, fragment);
+            const lastDivider = Array.from(fragment.querySelectorAll('.date-divider')).pop();
+            const firstDivider = control.nextElementSibling;
+            if (lastDivider && firstDivider?.classList.contains('date-divider') && firstDivider.dataset.date === lastDivider.dataset.date) {
+                firstDivider.remove();
+            }
+
+            const previousHeight = messagesContainer.scrollHeight;
+            control.after(fragment);
+            messagesContainer.scrollTop += messagesContainer.scrollHeight - previousHeight;
+            if (messages.length < MESSAGE_PAGE_SIZE) control.remove();
+        } catch (error) {
+            console.error('[Chat] Error loading earlier messages:', error);
+        } finally {
+            button.disabled = false;
+        }
+    }
+
     async function loadMessages(silent = false) {
         if (!currentContext.id) return;
 
         try {
-            let endpoint;
-            if (currentContext.type === 'connection') {
-                endpoint = `/messages/connection/${currentContext.id}`;
-            } else {
-                endpoint = `/messages/${currentContext.id}/messages`;
+            let endpoint = messagesEndpoint();
+
+            // Background refreshes only ask for messages newer than the last one rendered
+            const rendered = messagesContainer.querySelectorAll('.msg[data-message-id]');
+            const lastRenderedId = rendered[rendered.length - 1]?.dataset?.messageId;
+            if (silent && lastRenderedId) {
+                endpoint += `?since_id=${lastRenderedId}`;
             }
 
             const messages = await window.KN.api.get(endpoint);
@@ -325,21 +396,9 @@ document.addEventListener('DOMContentLoaded', function () {
                 });
             } else {
                 messagesContainer.innerHTML = '';
-                let lastDate = null;
-                messages.forEach(msg => {
-                    const msgDate = new Date(msg.timestamp);
-                    const dateStr = msgDate.toDateString();
-
-                    if (lastDate !== dateStr) {
-                        const divider = document.createElement('div');
-                        divider.className = 'date-divider';
-                        divider.innerHTML = `<span>${getDateLabel(msgDate)}</span>`;
-                        messagesContainer.appendChild(divider);
-                        lastDate = dateStr;
-                    }
-
-                    renderMessage(msg, currentUser.id);
-                });
+                renderWithDividers(messages, currentUser.id, messagesContainer);
+                // A full first page means older messages may exist
+                if (messages.length >= MESSAGE_PAGE_SIZE) renderLoadOlder();
                 messagesContainer.scrollTop = messagesContainer.scrollHeight;
             }
 
@@ -352,7 +411,7 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
-    function renderMessage(msg, currentUserId) {
+    function renderMessage(msg, currentUserId, target = messagesContainer) {
         const isMe = msg.sender_id === currentUserId;
         const messageDiv = document.createElement('div');
         messageDiv.className = `msg msg--${isMe ? 'me' : 'peer'}`;
@@ -367,7 +426,7 @@ document.addEventListener('DOMContentLoaded', function () {
             </div>
             <span class="time" title="${window.KN.util.formatDate(msg.timestamp)} ${timeString}">${timeString}</span>
         `;
-        messagesContainer.appendChild(messageDiv);
+        target.appendChild(messageDiv);
     }
 
     // Global delete handler
@@ -29,6 +29,10 @@ document.addEventListener('DOMContentLoaded', function () {
         filterSkill: null,
     };
 
+    const AUTOCOMPLETE_LIMIT = 8;
+    // Search responses can arrive out of order; only the latest request may render
+    let searchSeq = 0;
+
     init();
 
     async function init() {
@@ -54,16 +58,17 @@ document.addEventListener('DOMContentLoaded', function () {
         const searchBtn = document.getElementById('search-btn');
         if (searchInput) {
             let debounceTimer;
+            // Typing only asks for completions; the full search runs on Enter, the button, or a picked suggestion
             searchInput.addEventListener('input', (e) => {
                 clearTimeout(debounceTimer);
                 debounceTimer = setTimeout(() => {
                     const query = e.target.value.trim();
                     if (query.length > 0) {
-                        performSearch(query);
+                        performAutocomplete(query);
                     } else {
                         hideSearchResults();
                     }
-                }, 300);
+                }, 150);
             });
 
             // Allow 'Enter' to search immediately
@@ -578,18 +583,67 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    async function performAutocomplete(prefix) {
+        const resultsContainer = document.getElementById('search-results');
+        if (!resultsContainer) return;
+        const seq = ++searchSeq;
+
+        try {
+            const data = await window.KN.api.get(`/dashboard/autocomplete?q=${encodeURIComponent(prefix)}&limit=${AUTOCOMPLETE_LIMIT}`);
+            if (seq !== searchSeq) return;
+            renderSuggestions(data);
+        } catch (error) {
+            // Suggestions are best-effort; Enter still runs the full search
+            console.error('Autocomplete failed:', error);
+        }
+    }
+
+    function renderSuggestions(data) {
+        const resultsContainer = document.getElementById('search-results');
+        if (!resultsContainer) return;
+
+        resultsContainer.innerHTML = '';
+        const groups = [['Skills', data.skills, '★'], ['People', data.users, '👤'], ['Sessions', data.sessions, '🎥']];
+        if (groups.every(([, items]) => !items || !items.length)) {
+            hideSearchResults();
+            return;
+        }
+
+        groups.forEach(([title, items, icon]) => {
+            if (!items || !items.length) return;
+            appendSearchGroup(resultsContainer, title, items, (item) => {
+                const div = document.createElement('div');
+                div.className = 'search-result-item';
+                div.innerHTML = `
+                    <div class="search-avatar">${icon}</div>
+                    <div style="font-weight:600; color:#333;">${escapeHtml(item.label)}</div>
+                `;
+                div.addEventListener('click', () => {
+                    const searchInput = document.getElementById('search-input');
+                    if (searchInput) searchInput.value = item.label;
+                    performSearch(item.label);
+                });
+                return div;
+            });
+        });
+        resultsContainer.style.display = 'block';
+    }
+
     async function performSearch(query) {
         if (!query) return;
         const resultsContainer = document.getElementById('search-results');
         if (!resultsContainer) return;
+        const seq = ++searchSeq;
 
         resultsContainer.innerHTML = '<div style="padding:1rem; text-align:center; color:#666;">Searching...</div>';
         resultsContainer.style.display = 'block';
 
         try {
             const data = await window.KN.api.get(`/dashboard/search?q=${encodeURIComponent(query)}`);
+            if (seq !== searchSeq) return;
             renderSearchResults(data);
         } catch (error) {
+            if (seq !== searchSeq) return;
             console.error('Search failed:', error);
             resultsContainer.innerHTML = '<div style="padding:1rem; text-align:center; color:red;">Search failed. Try again.</div>';
         }
@@ -651,7 +651,16 @@ document.addEventListener('DOMContentLoaded', function () {
         const wsUrl = `${protocol}//${host}/ws/meeting/${currentContext.id}`;
         console.log('Connecting to WS:', wsUrl);
 
-        ws = new WebSocket(wsUrl);
+        // The handshake checks the token and room membership once for the socket's lifetime
+        // relay=opaque: the server forwards our frames without parsing them;
+        // batch_ms: bursts of frames for us (ICE candidates) arrive as one JSON array
+        const params = new URLSearchParams({
+            token: window.KN.auth.getToken() || '',
+            kind: currentContext.type || 'connection',
+            relay: 'opaque',
+            batch_ms: '20',
+        });
+        ws = new WebSocket(`${wsUrl}?${params}`);
 
         ws.onopen = () => {
             console.log('WS Connected');
@@ -660,7 +669,18 @@ document.addEventListener('DOMContentLoaded', function () {
         };
 
         ws.onmessage = async (event) => {
-            const msg = JSON.parse(event.data);
+            const data = JSON.parse(event.data);
+            for (const msg of Array.isArray(data) ? data : [data]) {
+                await handleSignal(msg);
+            }
+        };
+
+        async function handleSignal(msg) {
+            // Server heartbeat: answer so the socket is not evicted as idle
+            if (msg.type === 'ping') {
+                ws.send(JSON.stringify({ type: 'pong', ts: msg.ts }));
+                return;
+            }
             if (msg.sender === myId) return;
 
             console.log(`RX: ${msg.type} from ${msg.sender.substr(0, 4)}`);
@@ -681,7 +701,7 @@ document.addEventListener('DOMContentLoaded', function () {
             } catch (e) {
                 console.error(`Error: ${e.message}`, e);
             }
-        };
+        }
 
         ws.onerror = (e) => {
             console.error('WS Error');
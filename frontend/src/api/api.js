@@ -92,16 +92,16 @@ export const attendanceApi = {
 };
 
 export const messageApi = {
-  async list(sessionId) {
-    const { data } = await api.get(`/messages/${sessionId}/messages`);
+  async list(sessionId, params = {}) {
+    const { data } = await api.get(`/messages/${sessionId}/messages`, { params });
     return data;
   },
   async send(sessionId, payload) {
     const { data } = await api.post(`/messages/${sessionId}/messages`, payload);
     return data;
   },
-  async listConnection(connectionId) {
-    const { data } = await api.get(`/messages/connection/${connectionId}`);
+  async listConnection(connectionId, params = {}) {
+    const { data } = await api.get(`/messages/connection/${connectionId}`, { params });
     return data;
   },
   async sendConnection(connectionId, payload) {
@@ -110,6 +110,31 @@ export const messageApi = {
   },
 };
 
+export const chatSocketUrl = (kind, id, sinceId) => {
+  const base = BASE_URL.startsWith("/") ? `${window.location.origin}${BASE_URL}` : BASE_URL;
+  const url = new URL(`${base.replace(/\/$/, "")}/ws/chat/${kind}/${id}`);
+  url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+  url.searchParams.set("token", localStorage.getItem(TOKEN_KEY) || "");
+  if (sinceId != null) {
+    url.searchParams.set("since_id", sinceId);
+  }
+  return url.toString();
+};
+
+// Sent by the server when a resumed recording was already completed
+const RECORDING_COMPLETE_CLOSE_CODE = 4410;
+
+export const recordingSocketUrl = (connectionId, recordingId) => {
+  const base = BASE_URL.startsWith("/") ? `${window.location.origin}${BASE_URL}` : BASE_URL;
+  const url = new URL(`${base.replace(/\/$/, "")}/ws/meeting/${connectionId}/recording`);
+  url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+  url.searchParams.set("token", localStorage.getItem(TOKEN_KEY) || "");
+  if (recordingId != null) {
+    url.searchParams.set("recording_id", recordingId);
+  }
+  return url.toString();
+};
+
 export const resourceApi = {
   async list(sessionId) {
     const { data } = await api.get(`/resources/${sessionId}/resources`);
@@ -160,6 +185,83 @@ export const meetingApi = {
     });
     return data;
   },
+  // Streams MediaRecorder chunks while the meeting runs. Chunks are kept until the server
+  // acknowledges them; after a dropped socket it reconnects and resends from the server's offset.
+  streamRecording(connectionId) {
+    const pending = [];
+    let pushed = 0;
+    let recordingId = null;
+    let socket = null;
+    let ready = false;
+    let done = false;
+    let failure = null;
+    let finishing = null;
+
+    const acknowledge = (offset) => {
+      while (pending.length && pending[0].start + pending[0].blob.size <= offset) pending.shift();
+    };
+    const fail = (error) => {
+      done = true;
+      failure = error;
+      finishing?.reject(error);
+    };
+    const connect = () => {
+      ready = false;
+      socket = new WebSocket(recordingSocketUrl(connectionId, recordingId));
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === "ready") {
+          recordingId = message.recording_id;
+          ready = true;
+          acknowledge(message.offset);
+          pending.forEach(({ blob, start }) =>
+            socket.send(start < message.offset ? blob.slice(message.offset - start) : blob)
+          );
+          if (finishing) socket.send(JSON.stringify({ type: "stop" }));
+        } else if (message.type === "ack") {
+          acknowledge(message.offset);
+        } else if (message.type === "saved") {
+          done = true;
+          finishing?.resolve(message);
+        }
+      };
+      socket.onclose = (event) => {
+        if (done) return;
+        // Completed while we were away: the stop (or the server's sweep) already saved it
+        if (event.code === RECORDING_COMPLETE_CLOSE_CODE) {
+          if (!finishing) {
+            fail(new Error("Recording was closed by the server"));
+            return;
+          }
+          done = true;
+          finishing.resolve({ type: "saved", id: recordingId });
+          return;
+        }
+        // Rejected or over the size limit: retrying cannot help
+        if (event.code === 1008 || event.code === 1009) {
+          fail(new Error(event.reason || "Recording was rejected"));
+          return;
+        }
+        setTimeout(connect, 2000);
+      };
+    };
+    connect();
+
+    return {
+      push(blob) {
+        pending.push({ blob, start: pushed });
+        pushed += blob.size;
+        if (ready) socket.send(blob);
+      },
+      finish() {
+        if (failure) return Promise.reject(failure);
+        return new Promise((resolve, reject) => {
+          finishing = { resolve, reject };
+          if (ready) socket.send(JSON.stringify({ type: "stop" }));
+        });
+      },
+    };
+  },
   async listRecordings(connectionId) {
     const { data } = await api.get(`/meeting/recordings/${connectionId}`);
     return data;
@@ -182,6 +284,10 @@ export const dashboardApi = {
     const { data } = await api.get(`/dashboard/search?q=${encodeURIComponent(query)}`);
     return data;
   },
+  async autocomplete(prefix, limit = 8) {
+    const { data } = await api.get("/dashboard/autocomplete", { params: { q: prefix, limit } });
+    return data;
+  },
 };
 
 export const profileApi = {
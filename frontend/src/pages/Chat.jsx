@@ -1,8 +1,18 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { api, connectionApi, meetingApi, messageApi, sessionApi } from "../api/api";
+import { api, chatSocketUrl, connectionApi, meetingApi, messageApi, sessionApi } from "../api/api";
 import { useAuth } from "../context/AuthContext";
 
+// Messages per page when no cursor is given (the server's default); fewer means the start was reached
+const MESSAGE_PAGE_SIZE = 50;
+
+const mergeMessages = (current, incoming) => {
+  const known = new Set(current.map((message) => message.id));
+  const fresh = incoming.filter((message) => !known.has(message.id));
+  if (!fresh.length) return current;
+  return [...current, ...fresh].sort((a, b) => a.id - b.id);
+};
+
 const VideoCameraIcon = ({ className = "", ...props }) => (
   <svg
     xmlns="http://www.w3.org/2000/svg"
@@ -24,6 +34,8 @@ export const Chat = () => {
   const [sessions, setSessions] = useState([]);
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState("");
+  const [hasOlder, setHasOlder] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   // Connection / Sidebar State
   const [connections, setConnections] = useState([]);
@@ -42,35 +54,100 @@ export const Chat = () => {
     connectionApi.listActive().then(setConnections).catch(console.error);
   }, []);
 
-  // Polling for Messages
+  const lastIdRef = useRef(null);
+
+  // Live messages: one history load, then server push over WebSocket
   useEffect(() => {
     if (!connectionId) {
       setMessages([]);
       return;
     }
 
-    const loadMessages = () => {
+    let socket = null;
+    let retryTimer = null;
+    let closed = false;
+    lastIdRef.current = null;
+
+    const applyMessages = (incoming) => {
+      setMessages((current) => {
+        const next = mergeMessages(current, incoming);
+        if (next.length) lastIdRef.current = next[next.length - 1].id;
+        return next;
+      });
+    };
+
+    // After a long disconnect: show the newest page again and leave the rest to scroll-back
+    const reloadLatest = () => {
       messageApi.listConnection(connectionId)
-        .then(setMessages)
+        .then((latest) => {
+          if (closed || !latest.length) return;
+          const newest = latest[latest.length - 1].id;
+          setMessages((current) => {
+            const next = mergeMessages(latest, current.filter((message) => message.id > newest));
+            lastIdRef.current = next[next.length - 1].id;
+            return next;
+          });
+          setHasOlder(latest.length >= MESSAGE_PAGE_SIZE);
+        })
         .catch(console.error);
     };
 
-    // Initial load
-    loadMessages();
+    const openSocket = () => {
+      // since_id makes the server replay only what arrived after our last known message
+      socket = new WebSocket(chatSocketUrl("connection", connectionId, lastIdRef.current ?? 0));
+      socket.onmessage = (event) => {
+        const payload = JSON.parse(event.data);
+        if (payload.type === "history") {
+          applyMessages(payload.messages);
+          if (payload.more) reloadLatest();
+        }
+        if (payload.type === "message") applyMessages([payload.message]);
+      };
+      socket.onclose = () => {
+        if (!closed) retryTimer = setTimeout(openSocket, 3000);
+      };
+    };
 
-    // Poll every 3 seconds
-    const interval = setInterval(loadMessages, 3000);
-    return () => clearInterval(interval);
+    setMessages([]);
+    setHasOlder(false);
+    messageApi.listConnection(connectionId)
+      .then((initial) => {
+        if (closed) return;
+        applyMessages(initial);
+        setHasOlder(initial.length >= MESSAGE_PAGE_SIZE);
+        openSocket();
+      })
+      .catch(console.error);
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    };
   }, [connectionId]);
 
+  // Scroll-back: the page before the oldest message shown
+  const handleLoadOlder = async () => {
+    if (!messages.length || loadingOlder) return;
+    setLoadingOlder(true);
+    try {
+      const older = await messageApi.listConnection(connectionId, { before_id: messages[0].id });
+      setMessages((current) => mergeMessages(current, older));
+      setHasOlder(older.length >= MESSAGE_PAGE_SIZE);
+    } catch (err) {
+      console.error("Failed to load earlier messages", err);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleSend = async (event) => {
     event.preventDefault();
     if (!input.trim() || !connectionId) return;
 
     try {
-      await messageApi.sendConnection(connectionId, { content: input.trim() });
-      const refreshed = await messageApi.listConnection(connectionId);
-      setMessages(refreshed);
+      const sent = await messageApi.sendConnection(connectionId, { content: input.trim() });
+      setMessages((current) => mergeMessages(current, [sent]));
       setInput("");
     } catch (err) {
       console.error("Failed to send message", err);
@@ -175,6 +252,17 @@ export const Chat = () => {
             {/* Messages */}
             <div className="chat-thread" style={{ flex: 1, padding: '20px', overflowY: 'auto', background: '#e5ddd5', display: 'flex', flexDirection: 'column', gap: '8px' }}>
               {messages.length === 0 && <p style={{ textAlign: 'center', color: '#888', marginTop: '20px' }}>No messages yet. Say hello!</p>}
+              {hasOlder && (
+                <button
+                  type="button"
+                  className="btn btn-secondary btn-sm"
+                  onClick={handleLoadOlder}
+                  disabled={loadingOlder}
+                  style={{ alignSelf: 'center' }}
+                >
+                  {loadingOlder ? "Loading..." : "Load earlier messages"}
+                </button>
+              )}
               {messages.map((message) => {
                 const isMe = message.sender_id === user?.id;
                 return (
@@ -9,7 +9,6 @@ export const MeetingPage = () => {
   const remoteVideoRef = useRef(null);
   const localStreamRef = useRef(null);
   const recorderRef = useRef(null);
-  const chunksRef = useRef([]);
   const peerOneRef = useRef(null);
   const peerTwoRef = useRef(null);
 
@@ -118,21 +117,18 @@ export const MeetingPage = () => {
     try {
       const recorder = new MediaRecorder(localStreamRef.current, { mimeType: "video/webm;codecs=vp9" });
       recorderRef.current = recorder;
-      chunksRef.current = [];
+      // Chunks go to the server as they are recorded, so nothing waits in memory for the end
+      const ingest = meetingApi.streamRecording(connectionId);
 
       recorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
-          chunksRef.current.push(event.data);
+          ingest.push(event.data);
         }
       };
 
       recorder.onstop = async () => {
-        if (!chunksRef.current.length) return;
-        const blob = new Blob(chunksRef.current, { type: "video/webm" });
-        chunksRef.current = [];
         try {
-          const file = new File([blob], "meeting.webm", { type: "video/webm" });
-          await meetingApi.upload(connectionId, file);
+          await ingest.finish();
           alert("Recording saved");
         } catch (uploadError) {
           console.error(uploadError);
@@ -143,7 +139,7 @@ export const MeetingPage = () => {
         }
       };
 
-      recorder.start();
+      recorder.start(1000);
       setIsRecording(true);
     } catch (err) {
       console.error(err);
@@ -3,6 +3,16 @@ import { useParams } from "react-router-dom";
 import { attendanceApi, messageApi, recordingApi, resourceApi, sessionApi } from "../api/api";
 import { useAuth } from "../context/AuthContext";
 
+// Messages per page when no cursor is given (the server's default); fewer means the start was reached
+const MESSAGE_PAGE_SIZE = 50;
+
+const mergeMessages = (current, incoming) => {
+  const known = new Set(current.map((message) => message.id));
+  const fresh = incoming.filter((message) => !known.has(message.id));
+  if (!fresh.length) return current;
+  return [...current, ...fresh].sort((a, b) => a.id - b.id);
+};
+
 export const SessionView = () => {
   const { sessionId } = useParams();
   const { user } = useAuth();
@@ -12,6 +22,7 @@ export const SessionView = () => {
   const [attendance, setAttendance] = useState([]);
   const [resources, setResources] = useState([]);
   const [chatInput, setChatInput] = useState("");
+  const [hasOlder, setHasOlder] = useState(false);
   const [uploading, setUploading] = useState(false);
 
   const isMentor = session?.created_by === user?.id;
@@ -28,6 +39,26 @@ export const SessionView = () => {
   const loadChat = async () => {
     const data = await messageApi.list(sessionId);
     setMessages(data);
+    setHasOlder(data.length >= MESSAGE_PAGE_SIZE);
+  };
+
+  // Scroll-back: the page before the oldest message shown
+  const loadOlderChat = async () => {
+    if (!messages.length) return;
+    const older = await messageApi.list(sessionId, { before_id: messages[0].id });
+    setMessages((current) => mergeMessages(current, older));
+    setHasOlder(older.length >= MESSAGE_PAGE_SIZE);
+  };
+
+  // Only what arrived after the newest message shown, so scrolled-back pages stay
+  const loadNewChat = async () => {
+    const newest = messages[messages.length - 1];
+    if (!newest) {
+      await loadChat();
+      return;
+    }
+    const data = await messageApi.list(sessionId, { since_id: newest.id });
+    setMessages((current) => mergeMessages(current, data));
   };
 
   const loadAttendance = async () => {
@@ -71,7 +102,7 @@ export const SessionView = () => {
     if (!chatInput.trim()) return;
     await messageApi.send(sessionId, { content: chatInput.trim() });
     setChatInput("");
-    await loadChat();
+    await loadNewChat();
   };
 
   if (!session) {
@@ -148,6 +179,11 @@ export const SessionView = () => {
       <div className="card">
         <h3>Live chat</h3>
         <div className="chat-thread">
+          {hasOlder && (
+            <button className="btn btn-secondary" type="button" onClick={loadOlderChat}>
+              Load earlier messages
+            </button>
+          )}
           {messages.map((message) => (
             <div key={message.id} className="chat-message">
               <strong>{message.sender_id === user?.id ? "You" : `User ${message.sender_id}`}</strong>